@@ -0,0 +1,399 @@
+import os
+import sys
+import json
+import random
+import argparse
+from html import escape
+
+# Tambahkan root repo ke sys.path agar modul bersama di common/ dapat diimpor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Jumlah item per fixture, mendekati jumlah item per halaman di situs aslinya
+LISTING_CARDS = {'tokopedia': 30, 'lazada': 40, 'shopee': 30}
+STORE_CARDS = 80
+REVIEWS_PER_PAGE = 10
+REVIEW_API_PAGES = 5
+
+PRODUCT_WORDS = ['Moringa', 'Daun Kelor', 'Teh Kelor', 'Bubuk Kelor', 'Kapsul Kelor',
+                 'Organik', 'Premium', 'Herbal', 'Oleifera', 'Original', '100gr', '250gr',
+                 'Isi 60', 'Isi 100', 'Celup', 'Murni', 'Asli', 'Super Food']
+CITIES = ['Jakarta Barat', 'Kab. Bogor', 'Surabaya', 'Bandung', 'Kab. Sleman',
+          'Tangerang Selatan', 'Medan', 'Kab. Blora', 'Denpasar', 'Semarang']
+REVIEW_WORDS = ['barang', 'sesuai', 'pesanan', 'pengiriman', 'cepat', 'packing', 'rapi',
+                'rasa', 'enak', 'mantap', 'recommended', 'seller', 'ramah', 'original',
+                'kualitas', 'bagus', 'harga', 'terjangkau', 'akan', 'order', 'lagi']
+
+# Bintang rating Lazada (base64 dari gambar bintang penuh, lihat BASE64_TO_STAR)
+LAZADA_FULL_STAR = 'data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAA0AAAAMCAYAAAC5tzfZBJRU5ErkJggg=='
+
+# Script yang merender deskripsi dari __cache setelah halaman dimuat (fixture
+# tokopedia_detail_js), menggantikan render client-side Tokopedia
+TOKOPEDIA_RENDER_DESCRIPTION = """<script>setTimeout(function () {
+  var content = window.__cache['$ROOT_QUERY.pdpGetLayout.components.3.data.0.content.0'];
+  var span = document.createElement('span');
+  span.className = 'css-11oczh8 eytdjj00';
+  content.subtitle.split('\\n').forEach(function (line, i) {
+    if (i) { span.appendChild(document.createElement('br')); }
+    span.appendChild(document.createTextNode(line));
+  });
+  document.querySelector('div.css-1wa8o67').appendChild(span);
+}, 300);</script>"""
+
+
+def product_name(rng):
+    return ' '.join(rng.sample(PRODUCT_WORDS, rng.randint(4, 8)))
+
+
+def rupiah(value):
+    return 'Rp' + f'{value:,}'.replace(',', '.')
+
+
+def description_text(rng, paragraphs=6):
+    lines = []
+    for _ in range(paragraphs):
+        lines.append(' '.join(rng.choice(REVIEW_WORDS + PRODUCT_WORDS) for _ in range(rng.randint(20, 40))))
+    return lines
+
+
+def page_shell(title, body, rng):
+    """
+    Membungkus isi halaman dengan header, script state dan footer supaya ukuran
+    dan struktur dokumen mendekati halaman asli (bukan hanya daftar kartu).
+    """
+    nav = ''.join(
+        f'<li class="nav-item"><a href="/kategori/{i}">{escape(product_name(rng))}</a></li>'
+        for i in range(120)
+    )
+    state = json.dumps({
+        'items': [{'id': i, 'name': product_name(rng), 'price': rng.randint(10, 500) * 1000}
+                  for i in range(300)]
+    })
+    footer = ''.join(f'<a class="footer-link" href="/info/{i}">Info {i}</a>' for i in range(80))
+    return (
+        '<!DOCTYPE html><html lang="id"><head><meta charset="utf-8">'
+        f'<title>{escape(title)}</title>'
+        '<style>body{font-family:sans-serif} .hidden-state{display:none}</style></head><body>'
+        f'<header><nav><ul>{nav}</ul></nav></header>'
+        f'<main>{body}</main>'
+        f'<script type="application/json" class="hidden-state">{state}</script>'
+        f'<footer>{footer}</footer></body></html>'
+    )
+
+
+def state_script(name, value, declare='window.'):
+    # State JSON halaman sebagai script inline, seperti yang dibaca common/page_state.py
+    return f'<script>{declare}{name} = {json.dumps(value)};</script>'
+
+
+def tokopedia_listing(rng):
+    cards = []
+    cache = {'ROOT_QUERY': {'searchProductV5': {'type': 'id', 'id': '$ROOT_QUERY.searchProductV5'}}}
+    products = []
+    for i in range(LISTING_CARDS['tokopedia']):
+        price = rng.randint(15, 300) * 1000
+        if i % 2 == 0:
+            discount = rng.randint(5, 60)
+            prices = (
+                f'<div class="_67d6E1xDKIzw+i2D2L0tjw== t4jWW3NandT5hvCFAiotYg==">'
+                f'{rupiah(price * (100 - discount) // 100)}</div>'
+                f'<span class="q6wH9+Ht7LxnxrEgD22BCQ==">{rupiah(price)}</span>'
+                f'<span class="vRrrC5GSv6FRRkbCqM7QcQ==">{discount}%</span>'
+            )
+            price_state = {'text': rupiah(price * (100 - discount) // 100), 'original': rupiah(price),
+                           'discountPercentage': discount}
+        else:
+            prices = f'<div class="_67d6E1xDKIzw+i2D2L0tjw== ">{rupiah(price)}</div>'
+            price_state = {'text': rupiah(price), 'original': '', 'discountPercentage': 0}
+        sold_text = f'{rng.randint(1, 999)} terjual' if i % 3 else None
+        sold = f'<span class="se8WAnkjbVXZNA8mT+Veuw==">{sold_text}</span>' if sold_text else ''
+        name = product_name(rng)
+        city = rng.choice(CITIES)
+        url = f'https://www.tokopedia.com/toko{i % 7}/produk-{i}'
+        cards.append(
+            f'<div class="css-5wh65g"><a href="{url}">'
+            f'<img src="https://images.tokopedia.net/img/{i}.jpg" alt="">'
+            f'<span class="_0T8-iGxMpV6NEsYEhwkqEg==">{escape(name)}</span>'
+            f'{prices}'
+            f'<span class="T0rpy-LEwYNQifsgB-3SQw== flip">Toko Kelor {i % 7}</span>'
+            f'<span class="pC8DMVkBZGW7-egObcWMFQ== flip">{city}</span>'
+            f'{sold}</a></div>'
+        )
+
+        # Entri cache Apollo (window.__cache) untuk kartu yang sama
+        key = f'$ROOT_QUERY.searchProductV5.data.products.{i}'
+        cache[f'{key}.shop'] = {'id': str(100 + i % 7), 'name': f'Toko Kelor {i % 7}', 'city': city}
+        cache[f'{key}.price'] = price_state
+        labels = []
+        if sold_text:
+            cache[f'{key}.labelGroups.0'] = {'position': 'ri_product_credibility', 'title': sold_text}
+            labels.append({'type': 'id', 'id': f'{key}.labelGroups.0'})
+        cache[key] = {
+            'id': str(2000000 + i), 'name': name, 'url': url,
+            'shop': {'type': 'id', 'id': f'{key}.shop'},
+            'price': {'type': 'id', 'id': f'{key}.price'},
+            'labelGroups': labels,
+        }
+        products.append({'type': 'id', 'id': key})
+    cache['$ROOT_QUERY.searchProductV5'] = {'data': {'products': products}}
+    body = '<div class="css-rjanld">' + ''.join(cards) + '</div>' + state_script('__cache', cache)
+    return page_shell('Jual Moringa | Tokopedia', body, rng)
+
+
+def lazada_listing(rng):
+    cards = []
+    items = []
+    for i in range(LISTING_CARDS['lazada']):
+        sold_text = f'{rng.randint(1, 999)} Terjual' if i % 2 else None
+        sold = f'<span class="_1cEkb">{sold_text}</span>' if sold_text else ''
+        name = product_name(rng)
+        price = rupiah(rng.randint(15, 300) * 1000)
+        city = rng.choice(CITIES)
+        cards.append(
+            f'<div class="Bm3ON" data-qa-locator="product-item">'
+            f'<a href="https://www.lazada.co.id/products/moringa-i{1000000 + i}.html">'
+            f'<img src="https://img.lazcdn.com/g/p/{i}.jpg" alt=""></a>'
+            f'<div class="RfADt">{escape(name)}</div>'
+            f'<span class="ooOxS">{price}</span>'
+            f'<span class="oa6ri ">{city}</span>{sold}</div>'
+        )
+        # Item window.pageData.mods.listItems untuk kartu yang sama
+        item = {
+            'itemId': str(1000000 + i), 'name': name, 'priceShow': price, 'location': city,
+            'itemUrl': f'//www.lazada.co.id/products/moringa-i{1000000 + i}.html',
+            'sellerName': f'Kelor Store {i % 5}', 'brandName': 'No Brand',
+            'ratingScore': str(4 + (i % 10) / 10),
+        }
+        if sold_text:
+            item['itemSoldCntShow'] = sold_text
+        items.append(item)
+    body = ('<div class="_17mcb">' + ''.join(cards) + '</div>'
+            + state_script('pageData', {'mods': {'listItems': items}}))
+    return page_shell('Moringa - Beli Moringa | Lazada', body, rng)
+
+
+def shopee_listing(rng):
+    cards = []
+    for i in range(LISTING_CARDS['shopee']):
+        cards.append(
+            f'<li class="col-xs-2-4 shopee-search-item-result__item">'
+            f'<a href="https://shopee.co.id/Moringa-i.{100 + i % 9}.{2000000 + i}">'
+            f'<div class="line-clamp-2 break-words min-w-0 min-h-[2.5rem] text-sm">{escape(product_name(rng))}</div>'
+            f'<span class="font-medium text-base/5 truncate">{rupiah(rng.randint(15, 300) * 1000)[2:]}</span>'
+            f'<div class="text-shopee-primary font-medium bg-shopee-pink py-0.5 px-1 text-sp10/3 h-4 rounded-[2px] shrink-0 mr-1">-{rng.randint(5, 60)}%</div>'
+            f'<div class="text-shopee-black87 text-xs/sp14 flex-none">{rng.choice(["4.7", "4.8", "4.9", "5.0"])}</div>'
+            f'<span class="se8WAnkjbVXZNA8mT+Veuw==">{rng.randint(1, 99)}RB+ terjual</span>'
+            f'<span class="ml-[3px] align-middle">{rng.choice(CITIES)}</span></a></li>'
+        )
+    return page_shell('Moringa | Shopee Indonesia',
+                      '<ul class="row shopee-search-item-result__items">' + ''.join(cards) + '</ul>', rng)
+
+
+def tokopedia_detail(rng):
+    lines = description_text(rng)
+    description = '<br>'.join(escape(line) for line in lines)
+    cache = {
+        '$ROOT_QUERY.pdpGetLayout.components.3.data.0.content.0': {'title': 'Deskripsi', 'subtitle': '\n'.join(lines)},
+        '$ROOT_QUERY.pdpGetLayout.basicInfo.stats': {'rating': 4.9, 'countReview': 120, 'countTalk': 4},
+    }
+    body = (
+        '<h1 class="css-j63za0" data-testid="lblPDPDetailProductName">Daun Kelor Bubuk Organik 250gr</h1>'
+        '<span class="main" data-testid="lblPDPDetailProductRatingNumber">4.9</span>'
+        f'<div class="css-1wa8o67"><span class="css-11oczh8 eytdjj00">{description}</span></div>'
+        + state_script('__cache', cache)
+    )
+    return page_shell('Daun Kelor Bubuk Organik | Tokopedia', body, rng)
+
+
+def tokopedia_detail_js(rng):
+    """
+    Halaman detail yang deskripsinya baru dirender oleh JavaScript: selector
+    deskripsi tidak ada di HTML mentah (parse_description gagal, harus fallback
+    ke browser), tetapi teksnya tetap ada di state __cache.
+    """
+    lines = description_text(rng)
+    cache = {
+        '$ROOT_QUERY.pdpGetLayout.components.3.data.0.content.0': {'title': 'Deskripsi', 'subtitle': '\n'.join(lines)},
+        '$ROOT_QUERY.pdpGetLayout.basicInfo.stats': {'rating': 4.8, 'countReview': 64, 'countTalk': 2},
+    }
+    body = (
+        '<h1 class="css-j63za0" data-testid="lblPDPDetailProductName">Teh Kelor Celup Isi 25</h1>'
+        '<div class="css-1wa8o67"></div>'
+        + state_script('__cache', cache)
+        + TOKOPEDIA_RENDER_DESCRIPTION
+    )
+    return page_shell('Teh Kelor Celup | Tokopedia', body, rng)
+
+
+def lazada_detail(rng):
+    description = ''.join(f'<p>{escape(line)}</p>' for line in description_text(rng))
+    stars = ''.join(f'<img class="star" src="{LAZADA_FULL_STAR}">' for _ in range(5))
+    body = (
+        f'<div class="pdp-product-brand"><a class="pdp-product-brand__brand-link" href="#">No Brand</a></div>'
+        f'<div class="pdp-review-summary">{stars}</div>'
+        f'<div class="seller-name__detail"><a class="seller-name__detail-name" href="#">Kelor Official Store</a></div>'
+        f'<div class="pdp-product-detail">{description}</div>'
+    )
+    fields = {
+        'product': {'desc': description, 'brand': {'name': 'No Brand'}},
+        'seller': {'name': 'Kelor Official Store'},
+        'review': {'ratings': {'average': 5.0, 'rateCount': 87}},
+    }
+    body += state_script('__moduleData__', {'data': {'root': {'fields': fields}}}, declare='var ')
+    return page_shell('Moringa Kapsul | Lazada', body, rng)
+
+
+def shopee_detail(rng):
+    description = '\n'.join(description_text(rng))
+    body = (
+        '<div class="FV3T1n">Kelor Sehat Official</div>'
+        f'<section><p class="QN2lPu" style="white-space:pre-wrap">{escape(description)}</p></section>'
+    )
+    return page_shell('Moringa Kapsul | Shopee Indonesia', body, rng)
+
+
+def tokopedia_reviews(rng):
+    articles = []
+    for i in range(REVIEWS_PER_PAGE):
+        text = ' '.join(rng.choice(REVIEW_WORDS) for _ in range(rng.randint(8, 40)))
+        articles.append(
+            f'<article class="css-15m2bcr">'
+            f'<div data-testid="icnStarRating" aria-label="bintang {rng.randint(3, 5)}"></div>'
+            f'<p class="css-vqrjg4-unf-heading e1qvo2ff8">{rng.randint(1, 11)} bulan lalu</p>'
+            f'<p class="css-cvmev1-unf-heading e1qvo2ff8">{escape(text)}</p></article>'
+        )
+    pagination = ''.join(
+        f'<li class="unf-pagination-item"><button class="css-5p3bh2-unf-pagination-item" aria-label="Laman {n}">{n}</button></li>'
+        for n in range(1, 6)
+    )
+    body = (
+        '<h1 class="css-j63za0" data-testid="lblPDPDetailProductName">Daun Kelor Bubuk Organik 250gr</h1>'
+        f'<section id="review-feed">{"".join(articles)}</section><ul>{pagination}</ul>'
+    )
+    return page_shell('Ulasan Daun Kelor Bubuk Organik | Tokopedia', body, rng)
+
+
+def tokopedia_reviews_api(rng):
+    """
+    Response GraphQL productReviewList per halaman (list berisi satu body per
+    halaman), dipakai oleh jalur review 'network' dan stand-in review_standin.py.
+    """
+    pages = []
+    for page in range(1, REVIEW_API_PAGES + 1):
+        items = []
+        for i in range(REVIEWS_PER_PAGE):
+            feedback_id = 900000 + page * 100 + i
+            items.append({
+                'id': str(feedback_id),
+                'feedbackID': str(feedback_id),
+                'variantName': '',
+                'message': ' '.join(rng.choice(REVIEW_WORDS) for _ in range(rng.randint(8, 40))),
+                'productRating': rng.randint(3, 5),
+                'reviewCreateTime': f'{rng.randint(1, 11)} bulan lalu',
+                'reviewCreateTimestamp': f'2025-0{rng.randint(1, 9)}-1{rng.randint(0, 9)} 10:00:00',
+                'isAnonymous': False,
+                'user': {'userID': str(rng.randint(10 ** 6, 10 ** 7)), 'fullName': 'P***i'},
+                'imageAttachments': [],
+                'likeDislike': {'totalLike': rng.randint(0, 5), 'likeStatus': 3},
+                '__typename': 'ProductrevReviewDetail',
+            })
+        pages.append([{'data': {'productrevGetProductReviewList': {
+            'productID': '1730770885693507367',
+            'list': items,
+            'hasNext': page < REVIEW_API_PAGES,
+            'totalReviews': REVIEW_API_PAGES * REVIEWS_PER_PAGE,
+            '__typename': 'ProductrevGetProductReviewList',
+        }}}])
+    return json.dumps(pages, ensure_ascii=False)
+
+
+def tokopedia_store_listing(rng):
+    cards = []
+    for i in range(STORE_CARDS):
+        rating = f'<span class="prd_rating-average-text">{rng.choice(["4.8", "4.9", "5.0"])}</span>' if i % 4 else ''
+        sales = f'<span class="prd_label-integrity">{rng.choice(["10+", "100+", "1rb+", "250+"])} terjual</span>' if i % 3 else ''
+        cards.append(
+            f'<div class="css-1sn1xa2"><div class="css-1f2quy8">'
+            f'<img class="css-1q90pod" src="https://images.tokopedia.net/img/cache/200-square/{i}.png" alt="">'
+            f'<a class="pcv3__info-content" href="https://www.tokopedia.com/kelorina/produk-{i}?extParam=src%3Dshop">'
+            f'<div class="prd_link-product-name">{escape(product_name(rng))}</div>'
+            f'<div class="prd_link-product-price">{rupiah(rng.randint(15, 300) * 1000)}</div></a>'
+            f'{rating}{sales}</div></div>'
+        )
+    return page_shell('Kelorina | Tokopedia', '<div class="css-tjjb18">' + ''.join(cards) + '</div>', rng)
+
+
+FIXTURES = {
+    'tokopedia_listing': tokopedia_listing,
+    'lazada_listing': lazada_listing,
+    'shopee_listing': shopee_listing,
+    'tokopedia_detail': tokopedia_detail,
+    'tokopedia_detail_js': tokopedia_detail_js,
+    'lazada_detail': lazada_detail,
+    'shopee_detail': shopee_detail,
+    'tokopedia_reviews': tokopedia_reviews,
+    'tokopedia_store_listing': tokopedia_store_listing,
+}
+
+# Fixture JSON (response API yang direkam/disintesis), disimpan sebagai .json
+JSON_FIXTURES = {
+    'tokopedia_reviews_api': tokopedia_reviews_api,
+}
+
+
+def fixture_path(name):
+    extension = 'json' if name in JSON_FIXTURES else 'html'
+    return os.path.join(FIXTURE_DIR, f'{name}.{extension}')
+
+
+def build_all(seed=42):
+    """
+    Menulis ulang seluruh fixture sintetis. Selector di dalamnya sama dengan
+    selector yang dipakai scraper, jadi setiap jalur ekstraksi bisa diukur offline.
+    """
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    for name, builder in {**FIXTURES, **JSON_FIXTURES}.items():
+        html = builder(random.Random(f'{seed}-{name}'))
+        with open(fixture_path(name), 'w', encoding='utf-8') as file:
+            file.write(html)
+        print(f"{name}: {len(html) / 1024:.1f} KB")
+
+
+def record(name, url, browser='headless'):
+    """
+    Menyimpan halaman asli (page_source setelah render) sebagai fixture.
+    """
+    from common.browser import build_driver
+    from common.scrolling import adaptive_scroll
+    from selenium.webdriver.common.by import By
+
+    driver = build_driver(browser)
+    try:
+        driver.get(url)
+        adaptive_scroll(driver, (By.TAG_NAME, 'a'), max_time=10)
+        with open(fixture_path(name), 'w', encoding='utf-8') as file:
+            file.write(driver.page_source)
+    finally:
+        driver.quit()
+    print(f"{name} direkam dari {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Membuat/merekam fixture HTML untuk benchmark parser.")
+    parser.add_argument('--seed', type=int, default=42, help="Seed data sintetis.")
+    parser.add_argument('--record', nargs=2, metavar=('NAMA', 'URL'),
+                        help="Rekam halaman asli sebagai fixture NAMA (butuh Chrome).")
+    args = parser.parse_args()
+
+    if args.record:
+        name, url = args.record
+        if name not in FIXTURES:
+            sys.exit(f"Nama fixture tidak dikenal: {name} (pilihan: {', '.join(FIXTURES)})")
+        record(name, url)
+    else:
+        build_all(args.seed)
+
+
+if __name__ == "__main__":
+    main()
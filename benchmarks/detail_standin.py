@@ -0,0 +1,248 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, os.path.join(ROOT_DIR, 'store_scrapper'))
+sys.path.append(ROOT_DIR)
+
+from build_fixtures import fixture_path, build_all
+
+DEFAULT_PORT = 8766
+SHOP_NAME = 'kelorina'
+STORE_PATH = f'/{SHOP_NAME}/product'
+LIVE_URL = f'https://www.tokopedia.com/{SHOP_NAME}/'
+
+# Setiap produk ke-JS_EVERY disajikan dengan deskripsi yang dirender JavaScript
+# (fixture tokopedia_detail_js), sisanya dengan deskripsi di HTML mentah
+JS_EVERY = 4
+
+# Jumlah produk dari halaman toko yang diperiksa oleh --check
+CHECK_PRODUCTS = 12
+
+
+def load_fixture(name):
+    path = fixture_path(name)
+    if not os.path.exists(path):
+        build_all()
+    with open(path, 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def expected_description(html):
+    """
+    Teks deskripsi yang benar untuk satu halaman detail, diambil dari state
+    __cache (bukan dari selector yang sedang diuji).
+    """
+    from common.page_state import parse_page_state
+
+    cache = parse_page_state(html, ('__cache',))['__cache']
+    for value in cache.values():
+        if value.get('title') == 'Deskripsi':
+            return value['subtitle']
+    return None
+
+
+def is_js_product(path):
+    # produk-0, produk-4, ... memakai halaman dengan deskripsi hasil render JS
+    try:
+        index = int(path.split('?')[0].rstrip('/').rsplit('-', 1)[1])
+    except (IndexError, ValueError):
+        return False
+    return index % JS_EVERY == 0
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """
+    Menyajikan halaman toko tiruan (link produk diarahkan ke stand-in) dan
+    halaman detail produk dari fixture tersimpan. Path selain keduanya 404.
+    """
+    pages = {}
+
+    def _send(self, status, content_type, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == STORE_PATH:
+            base_url = f'http://{self.headers.get("Host")}/{SHOP_NAME}/'
+            body = self.pages['store'].replace(LIVE_URL, base_url)
+        elif path.startswith(f'/{SHOP_NAME}/produk-'):
+            body = self.pages['detail_js' if is_js_product(path) else 'detail']
+        else:
+            self._send(404, 'text/plain', 'not found')
+            return
+        self._send(200, 'text/html; charset=utf-8', body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=DEFAULT_PORT):
+    """
+    Menjalankan stand-in di thread latar. Return: (server, URL halaman toko).
+    """
+    StandinHandler.pages = {
+        'store': load_fixture('tokopedia_store_listing'),
+        'detail': load_fixture('tokopedia_detail'),
+        'detail_js': load_fixture('tokopedia_detail_js'),
+    }
+    server = ThreadingHTTPServer(('127.0.0.1', port), StandinHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}{STORE_PATH}'
+
+
+def store_product_urls(store_url):
+    """
+    Mengambil halaman toko dari stand-in dan URL produknya lewat parse_product_cards.
+    """
+    import scrapper_store_tokopedia as store
+
+    with urllib.request.urlopen(store_url, timeout=5) as response:
+        html = response.read().decode('utf-8')
+    return [product['url'] for product in store.parse_product_cards(html, SHOP_NAME)]
+
+
+class RecordingBrowser:
+    """
+    Pengganti browser untuk fetch_descriptions saat Chrome tidak dipakai: mencatat
+    URL yang jatuh ke jalur browser (sebagai tab engine satu tab) dan
+    mengembalikan None untuk setiap URL, sehingga deskripsinya "TIMEOUT".
+    """
+    tabs = 1
+
+    def __init__(self):
+        self.urls = []
+
+    def __call__(self, count):
+        return None, self
+
+    def fetch_many(self, urls):
+        self.urls += urls
+        return {url: None for url in urls}
+
+
+def check_http(urls):
+    """
+    Jalur HTTP: setiap halaman HTML mentah harus menghasilkan deskripsi yang
+    sama dengan state-nya, setiap halaman render JS harus None (parse miss).
+    Return: list pesan kegagalan.
+    """
+    import scrapper_store_tokopedia as store
+
+    expected = expected_description(StandinHandler.pages['detail'])
+    fetcher = store.create_http_fetcher()
+    try:
+        results = fetcher.fetch_many(urls)
+    finally:
+        fetcher.close()
+    failures = []
+    for url, description in results.items():
+        want = None if is_js_product(url) else expected
+        if description != want:
+            failures.append(f"{url}: deskripsi HTTP {description!r:.40} (seharusnya {want!r:.40})")
+    return failures
+
+
+def check_fallback(urls, browser_profile=None):
+    """
+    Jalur fetch_descriptions lengkap: hanya URL yang gagal di-parse dari HTTP
+    yang boleh dibuka di browser. Dengan browser_profile, fallback memakai
+    Chrome + TabEngine sungguhan dan deskripsi hasil render JS ikut dicek;
+    tanpa browser, URL fallback dicatat oleh RecordingBrowser.
+    Return: list pesan kegagalan.
+    """
+    import scrapper_store_tokopedia as store
+
+    js_urls = [url for url in urls if is_js_product(url)]
+    fetcher = store.create_http_fetcher()
+    driver = tab_engine = None
+    recorder = RecordingBrowser()
+    opened = []
+
+    def open_browser(count):
+        nonlocal driver, tab_engine
+        from common.browser import build_driver
+
+        opened.append(count)
+        driver = build_driver(browser_profile)
+        tab_engine = store.create_tab_engine(driver, browser_profile)
+        return driver, tab_engine
+
+    try:
+        descriptions = store.fetch_descriptions(
+            None, urls, SHOP_NAME, fetcher=fetcher,
+            browser=open_browser if browser_profile else recorder
+        )
+    finally:
+        fetcher.close()
+        if tab_engine is not None:
+            tab_engine.close()
+        if driver is not None:
+            driver.quit()
+
+    failures = []
+    if browser_profile is None and sorted(recorder.urls) != sorted(js_urls):
+        failures.append(f"fallback browser menerima {len(recorder.urls)} URL (seharusnya {len(js_urls)})")
+    if browser_profile is not None:
+        if opened != [len(js_urls)]:
+            failures.append(f"browser dibuka untuk {opened} URL (seharusnya [{len(js_urls)}])")
+        want = expected_description(StandinHandler.pages['detail_js'])
+        for url in js_urls:
+            if descriptions.get(url) != want:
+                failures.append(f"{url}: deskripsi browser {descriptions.get(url)!r:.40}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stand-in lokal halaman toko + halaman detail produk Tokopedia dari fixture."
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--check', action='store_true',
+                        help="Cek ekstraksi deskripsi HTTP dan fallback ke browser, lalu keluar.")
+    parser.add_argument('--browser', default=None,
+                        help="Profil browser untuk fallback sungguhan (tanpa opsi ini, fallback hanya dicatat).")
+    args = parser.parse_args()
+
+    server, store_url = start_server(0 if args.check else args.port)
+    if not args.check:
+        print(f"Stand-in berjalan di {store_url} (Ctrl+C untuk berhenti)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    try:
+        urls = store_product_urls(store_url)[:CHECK_PRODUCTS]
+        failures = []
+        for name, check in (('parse_description (HTTP)', lambda: check_http(urls)),
+                            ('fallback browser', lambda: check_fallback(urls, args.browser))):
+            start = time.perf_counter()
+            result = check()
+            status = 'OK' if not result else 'GAGAL'
+            print(f"{name}: {len(urls)} produk dalam {time.perf_counter() - start:.2f} detik [{status}]")
+            for message in result:
+                print(f"  {message}")
+            failures += result
+    finally:
+        server.shutdown()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import threading
+import urllib.request
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+# Folder review_scraper/ lebih dulu dari root repo (namanya sama dengan folder)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'review_scraper'))
+sys.path.append(ROOT_DIR)
+
+from build_fixtures import fixture_path, build_all
+
+DEFAULT_PORT = 8765
+PRODUCT_PATH = '/kelorina/daun-kelor-bubuk-organik-250gr/review'
+API_PATH = '/graphql/productReviewList'
+
+# Halaman review tiruan: review dimuat lewat fetch() ke endpoint GraphQL lokal
+# setelah halaman di-scroll (seperti lazy-load komponen review Tokopedia), lalu
+# dirender sebagai article dengan selector yang sama seperti situs aslinya.
+PAGE_TEMPLATE = """<!DOCTYPE html><html lang="id"><head><meta charset="utf-8">
+<title>Ulasan Daun Kelor Bubuk Organik | Tokopedia</title></head><body>
+<h1 class="css-j63za0" data-testid="lblPDPDetailProductName">Daun Kelor Bubuk Organik 250gr</h1>
+<div style="height:2500px">Deskripsi produk</div>
+<section id="review-feed"></section>
+<ul>__PAGINATION__</ul>
+<script>
+var loaded = false;
+function render(body) {
+  var data = body[0].data.productrevGetProductReviewList;
+  var feed = document.getElementById('review-feed');
+  feed.innerHTML = '';
+  data.list.forEach(function (r) {
+    var article = document.createElement('article');
+    article.className = 'css-15m2bcr';
+    article.innerHTML =
+      '<div data-testid="icnStarRating" aria-label="bintang ' + r.productRating + '"></div>' +
+      '<p class="css-vqrjg4-unf-heading e1qvo2ff8"></p><p class="css-cvmev1-unf-heading e1qvo2ff8"></p>';
+    article.children[1].textContent = r.reviewCreateTime;
+    article.children[2].textContent = r.message;
+    feed.appendChild(article);
+  });
+}
+function loadPage(page) {
+  fetch('__API_PATH__', {
+    method: 'POST',
+    headers: {'Content-Type': 'application/json'},
+    body: JSON.stringify([{operationName: 'productReviewList', variables: {page: page, limit: 10}}])
+  }).then(function (r) { return r.json(); }).then(render);
+}
+window.addEventListener('scroll', function () {
+  if (!loaded && window.scrollY > 0) { loaded = true; loadPage(1); }
+});
+document.querySelectorAll('.unf-pagination-item button').forEach(function (button) {
+  button.addEventListener('click', function () { loadPage(parseInt(button.textContent, 10)); });
+});
+</script></body></html>"""
+
+
+def load_pages():
+    path = fixture_path('tokopedia_reviews_api')
+    if not os.path.exists(path):
+        build_all()
+    with open(path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+
+def review_page_html(page_count):
+    pagination = ''.join(
+        f'<li class="unf-pagination-item"><button aria-label="Laman {n}">{n}</button></li>'
+        for n in range(1, page_count + 1)
+    )
+    return PAGE_TEMPLATE.replace('__PAGINATION__', pagination).replace('__API_PATH__', API_PATH)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    """
+    Menyajikan halaman review tiruan (GET) dan response GraphQL productReviewList
+    hasil rekaman per halaman (POST, halaman dari variables.page).
+    """
+    pages = []
+
+    def _send(self, status, content_type, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._send(200, 'text/html; charset=utf-8', review_page_html(len(self.pages)))
+
+    def do_POST(self):
+        if self.path != API_PATH:
+            self._send(404, 'text/plain', 'not found')
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        query = json.loads(self.rfile.read(length) or b'[{}]')
+        page = (query[0].get('variables') or {}).get('page', 1)
+        if not 1 <= page <= len(self.pages):
+            self._send(404, 'text/plain', 'not found')
+            return
+        self._send(200, 'application/json', json.dumps(self.pages[page - 1], ensure_ascii=False))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port=DEFAULT_PORT):
+    """
+    Menjalankan stand-in di thread latar. Return: (server, URL halaman produk).
+    """
+    StandinHandler.pages = load_pages()
+    server = ThreadingHTTPServer(('127.0.0.1', port), StandinHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}{PRODUCT_PATH}'
+
+
+def fetch_api_page(base_url, page):
+    request = urllib.request.Request(
+        base_url + API_PATH,
+        data=json.dumps([{'operationName': 'productReviewList', 'variables': {'page': page}}]).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.read().decode('utf-8')
+
+
+def check_parser(product_url):
+    """
+    Jalur tanpa browser: ambil setiap halaman JSON dari stand-in lewat HTTP dan
+    parse dengan parse_review_payload.
+    """
+    import review_scraper2
+
+    base_url = product_url.split(PRODUCT_PATH)[0]
+    reviews = []
+    page = 1
+    while True:
+        page_reviews, has_next = review_scraper2.parse_review_payload(
+            fetch_api_page(base_url, page), product_url, page
+        )
+        reviews += page_reviews
+        if not has_next:
+            return reviews
+        page += 1
+
+
+def check_browser(product_url, browser):
+    """
+    Jalur browser: scraping stand-in dengan sumber 'network', 'dom' (paginasi
+    cepat) dan 'dom_scroll' (scroll ulang setiap halaman, FAST_PAGINATION=False).
+    """
+    import review_scraper2
+    from common.browser import build_driver
+    from common.network_capture import NetworkCapture
+
+    results = {}
+    driver = build_driver(browser, performance_log=True)
+    try:
+        capture = NetworkCapture(driver, review_scraper2.REVIEW_API_PATTERN)
+        for source in ('network', 'dom', 'dom_scroll'):
+            review_scraper2.FAST_PAGINATION = source != 'dom_scroll'
+            start = time.perf_counter()
+            if source == 'network':
+                reviews = review_scraper2.scrape_product_reviews_network(driver, product_url, capture)
+            else:
+                reviews = review_scraper2.scrape_product_reviews(driver, product_url)
+            results[source] = (len(reviews), time.perf_counter() - start)
+    finally:
+        review_scraper2.FAST_PAGINATION = True
+        driver.quit()
+    return results
+
+
+def save_results(results, pages, browser):
+    """
+    Menyimpan waktu per sumber (termasuk detik/halaman review) ke
+    benchmarks/results/, seperti run_benchmarks.py.
+    """
+    from run_benchmarks import RESULTS_DIR, git_commit
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'browser': browser,
+            'review_pages': pages,
+        },
+        'results': {
+            source: {'reviews': count, 'seconds': seconds, 'seconds_per_page': seconds / pages}
+            for source, (count, seconds) in results.items()
+        },
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = os.path.join(RESULTS_DIR, f"review_standin_{time.strftime('%Y%m%d-%H%M%S')}_{commit}.json")
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Hasil disimpan ke {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Stand-in lokal halaman review + endpoint GraphQL productReviewList dari fixture."
+    )
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--check', action='store_true',
+                        help="Jalankan pengecekan parser (dan browser jika tersedia) lalu keluar.")
+    parser.add_argument('--no-browser', action='store_true', help="Lewati pengecekan dengan browser.")
+    parser.add_argument('--browser', default='headless', help="Profil browser untuk pengecekan.")
+    args = parser.parse_args()
+
+    server, product_url = start_server(0 if args.check else args.port)
+    if not args.check:
+        print(f"Stand-in berjalan di {product_url} (Ctrl+C untuk berhenti)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    expected = sum(
+        len(page[0]['data']['productrevGetProductReviewList']['list']) for page in StandinHandler.pages
+    )
+    try:
+        reviews = check_parser(product_url)
+        status = 'OK' if len(reviews) == expected else 'GAGAL'
+        print(f"parse_review_payload: {len(reviews)}/{expected} review [{status}]")
+        if args.no_browser:
+            return
+        try:
+            results = check_browser(product_url, args.browser)
+        except Exception as e:
+            print(f"Pengecekan browser dilewati: {e.__class__.__name__}")
+            return
+        pages = len(StandinHandler.pages)
+        for source, (count, seconds) in results.items():
+            print(f"scrape ({source}): {count}/{expected} review dalam {seconds:.2f} detik "
+                  f"({seconds / pages:.2f} detik/halaman review)")
+        print(f"Paginasi DOM sebelum/sesudah (dom_scroll -> dom): {results['dom_scroll'][1] / pages:.2f} -> "
+              f"{results['dom'][1] / pages:.2f} detik/halaman review")
+        save_results(results, pages, args.browser)
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
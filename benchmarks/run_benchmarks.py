@@ -0,0 +1,308 @@
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+from collections import namedtuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+# Folder scraper di depan sys.path agar modulnya bisa diimpor langsung
+# (review_scraper/ juga nama folder, jadi foldernya harus lebih dulu dari root repo)
+for folder in ('keyword_scrapper', 'store_scrapper', 'review_scraper'):
+    sys.path.insert(0, os.path.join(ROOT_DIR, folder))
+sys.path.append(ROOT_DIR)
+
+from build_fixtures import FIXTURES, JSON_FIXTURES, fixture_path, build_all
+
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Jumlah pengulangan default per kasus (jalur browser jauh lebih lambat)
+DEFAULT_REPEAT = 5
+DEFAULT_BROWSER_REPEAT = 3
+
+# Satu kasus benchmark: fixture yang dipakai, apakah butuh browser, dan fungsi
+# run(ctx) yang mengembalikan list item hasil ekstraksi
+Case = namedtuple('Case', ['name', 'fixture', 'browser', 'run'])
+
+
+def read_fixture(name):
+    with open(fixture_path(name), 'r', encoding='utf-8') as file:
+        return file.read()
+
+
+def _zero_wait(driver, fn):
+    from common.fields import implicit_wait
+    with implicit_wait(driver, 0):
+        return fn()
+
+
+def keyword_cases():
+    from selenium.webdriver.common.by import By
+    import scrapper_tokopedia as tokopedia
+    import scrapper_lazada as lazada
+    import scrapper_shopee as shopee
+
+    cases = []
+    for site, module in (('tokopedia', tokopedia), ('lazada', lazada), ('shopee', shopee)):
+        def run_element(ctx, module=module, site=site):
+            def extract():
+                items = ctx.driver.find_elements(By.XPATH, module.CARD_XPATH)
+                if site == 'tokopedia':
+                    return list(module.iter_cards_element(ctx.driver, items))
+                return list(module.iter_cards_element(items))
+            return _zero_wait(ctx.driver, extract)
+
+        def run_script(ctx, module=module):
+            return list(module.iter_cards_script(ctx.driver))
+
+        def run_detail(ctx, module=module):
+            return [module.fetch_details(ctx.driver)]
+
+        cases += [
+            Case(f'{site}_listing/element', f'{site}_listing', True, run_element),
+            Case(f'{site}_listing/script', f'{site}_listing', True, run_script),
+            Case(f'{site}_detail/selenium', f'{site}_detail', True, run_detail),
+        ]
+    return cases + state_cases(tokopedia, lazada)
+
+
+def state_cases(tokopedia, lazada):
+    # Shopee tidak menyematkan state JSON produk di halamannya
+    from common.page_state import parse_page_state
+
+    def run_tokopedia_parse(ctx):
+        return tokopedia.state_to_rows(parse_page_state(ctx.html, tokopedia.STATE_NAMES)['__cache'] or {})
+
+    def run_tokopedia_detail_parse(ctx):
+        return [tokopedia.details_from_state(parse_page_state(ctx.html, tokopedia.STATE_NAMES)['__cache'] or {})]
+
+    def run_lazada_parse(ctx):
+        return lazada.state_to_rows(parse_page_state(ctx.html, lazada.LIST_STATE_NAMES)['pageData'] or {})
+
+    def run_lazada_detail_parse(ctx):
+        state = parse_page_state(ctx.html, lazada.DETAIL_STATE_NAMES)['__moduleData__']
+        return [lazada.details_from_state(state or {})]
+
+    cases = [
+        Case('tokopedia_listing/state_parse', 'tokopedia_listing', False, run_tokopedia_parse),
+        Case('tokopedia_detail/state_parse', 'tokopedia_detail', False, run_tokopedia_detail_parse),
+        Case('lazada_listing/state_parse', 'lazada_listing', False, run_lazada_parse),
+        Case('lazada_detail/state_parse', 'lazada_detail', False, run_lazada_detail_parse),
+    ]
+    for site, module in (('tokopedia', tokopedia), ('lazada', lazada)):
+        def run_state(ctx, module=module):
+            return module.iter_cards_state(ctx.driver) or []
+
+        def run_detail_state(ctx, module=module):
+            return [module.fetch_details_state(ctx.driver)]
+
+        cases += [
+            Case(f'{site}_listing/state', f'{site}_listing', True, run_state),
+            Case(f'{site}_detail/state', f'{site}_detail', True, run_detail_state),
+        ]
+    return cases
+
+
+def store_cases():
+    import scrapper_store_tokopedia as store
+
+    def run_full(ctx):
+        return store.parse_product_cards(ctx.html, 'kelorina', parse_only=False)
+
+    def run_strained(ctx):
+        return store.parse_product_cards(ctx.html, 'kelorina', parse_only=True)
+
+    def run_description_bs4(ctx):
+        return [store.parse_description(ctx.html)]
+
+    return [
+        Case('store_listing/bs4_full', 'tokopedia_store_listing', False, run_full),
+        Case('store_listing/bs4_parse_only', 'tokopedia_store_listing', False, run_strained),
+        Case('tokopedia_detail/bs4', 'tokopedia_detail', False, run_description_bs4),
+    ]
+
+
+def review_cases():
+    import review_scraper
+    import review_scraper2
+
+    url = 'https://www.tokopedia.com/kelorina/produk-0/review'
+
+    def run_reviews(ctx):
+        return review_scraper.extract_reviews(ctx.driver, url, 1) or []
+
+    def run_reviews2(ctx):
+        return review_scraper2.extract_reviews(ctx.driver, url, 1) or []
+
+    def run_network_parse(ctx):
+        reviews = []
+        for page, body in enumerate(json.loads(ctx.html), start=1):
+            page_reviews, _ = review_scraper2.parse_review_payload(body, url, page)
+            reviews += page_reviews
+        return reviews
+
+    return [
+        Case('tokopedia_reviews/element', 'tokopedia_reviews', True, run_reviews),
+        Case('tokopedia_reviews/element_full', 'tokopedia_reviews', True, run_reviews2),
+        Case('tokopedia_reviews/network_parse', 'tokopedia_reviews_api', False, run_network_parse),
+    ]
+
+
+class Context:
+    """
+    Data yang dibutuhkan satu kasus: HTML fixture (jalur offline) atau driver
+    yang sudah membuka fixture lewat file:// (jalur browser).
+    """
+
+    def __init__(self, html=None, driver=None):
+        self.html = html
+        self.driver = driver
+
+
+def measure(case, ctx, repeat):
+    """
+    Menjalankan satu kasus beberapa kali. Waktu diukur tanpa tracemalloc; peak
+    memori Python diukur di satu run terpisah dengan tracemalloc aktif.
+    """
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = case.run(ctx)
+        timings.append(time.perf_counter() - start)
+        items = len(result)
+
+    tracemalloc.start()
+    case.run(ctx)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        'items': items,
+        'repeat': repeat,
+        'best_seconds': round(min(timings), 6),
+        'median_seconds': round(median, 6),
+        'items_per_second': round(items / median, 2) if median else None,
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def open_fixture(driver, fixture):
+    driver.get('file://' + fixture_path(fixture))
+
+
+def run_suite(cases, repeat, browser_repeat, browser_profile):
+    results = {}
+    offline = [c for c in cases if not c.browser]
+    online = [c for c in cases if c.browser]
+
+    for case in offline:
+        results[case.name] = measure(case, Context(html=read_fixture(case.fixture)), repeat)
+        print(format_row(case.name, results[case.name]))
+
+    if not online:
+        return results
+    try:
+        from common.browser import build_driver
+        driver = build_driver(browser_profile)
+    except Exception as e:
+        reason = f"browser tidak tersedia ({e.__class__.__name__})"
+        for case in online:
+            results[case.name] = {'skipped': reason}
+            print(f"{case.name:<36} dilewati: {reason}")
+        return results
+
+    try:
+        for case in online:
+            open_fixture(driver, case.fixture)
+            results[case.name] = measure(case, Context(driver=driver), browser_repeat)
+            print(format_row(case.name, results[case.name]))
+    finally:
+        driver.quit()
+    return results
+
+
+def format_row(name, result):
+    if 'skipped' in result:
+        return f"{name:<36} dilewati: {result['skipped']}"
+    return (f"{name:<36} {result['items']:>5} item  {result['median_seconds'] * 1000:>10.2f} ms  "
+            f"{result['items_per_second']:>10.1f} item/s  {result['peak_memory_kb']:>9.1f} KB")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(results, baseline_path):
+    """
+    Mencetak perbandingan median waktu terhadap file hasil sebelumnya.
+    """
+    with open(baseline_path, 'r') as file:
+        baseline = json.load(file)
+    print(f"\nPerbandingan dengan {baseline_path} (commit {baseline['meta']['commit']}):")
+    for name, result in results.items():
+        old = baseline['results'].get(name)
+        if not old or 'skipped' in old or 'skipped' in result:
+            continue
+        ratio = result['median_seconds'] / old['median_seconds'] if old['median_seconds'] else 0
+        flag = '  <-- lebih lambat' if ratio > 1.10 else ''
+        print(f"{name:<36} {old['median_seconds'] * 1000:>10.2f} ms -> "
+              f"{result['median_seconds'] * 1000:>10.2f} ms  (x{ratio:.2f}){flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark jalur ekstraksi scraper memakai fixture HTML offline.")
+    parser.add_argument('--only', help="Jalankan kasus yang namanya mengandung teks ini saja.")
+    parser.add_argument('--offline', action='store_true', help="Lewati kasus yang butuh browser.")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--browser-repeat', type=int, default=DEFAULT_BROWSER_REPEAT)
+    parser.add_argument('--browser', default='headless', help="Profil browser untuk kasus Selenium.")
+    parser.add_argument('--compare', help="File JSON hasil sebelumnya sebagai pembanding.")
+    parser.add_argument('--output', help="Lokasi file JSON hasil (default: benchmarks/results/).")
+    args = parser.parse_args()
+
+    if not all(os.path.exists(fixture_path(name)) for name in {**FIXTURES, **JSON_FIXTURES}):
+        build_all()
+
+    cases = store_cases() + keyword_cases() + review_cases()
+    if args.only:
+        cases = [c for c in cases if args.only in c.name]
+    if args.offline:
+        cases = [c for c in cases if not c.browser]
+
+    results = run_suite(cases, args.repeat, args.browser_repeat, args.browser)
+
+    commit = git_commit()
+    report = {
+        'meta': {
+            'commit': commit,
+            'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+        },
+        'results': results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}_{commit}.json")
+    with open(output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"\nHasil disimpan ke {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
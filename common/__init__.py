@@ -0,0 +1,8 @@
+"""
+Modul bersama yang dipakai oleh seluruh scraper (keyword_scrapper, store_scrapper,
+review_scraper).
+
+Setiap script scraper menambahkan root repo ke sys.path sehingga modul di sini
+dapat diimpor dengan `from common.<modul> import ...` walaupun script dijalankan
+langsung dari foldernya masing-masing.
+"""
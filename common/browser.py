@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import time
+import argparse
+from urllib.parse import urlsplit
+
+from selenium import webdriver as wb
+from selenium.common.exceptions import WebDriverException
+
+# Profil browser yang bisa dipilih per scraper:
+#   - 'default' : sama seperti wb.Chrome() biasa (semua resource dimuat)
+#   - 'fast'    : browser terlihat, pageLoadStrategy eager, gambar, video/audio,
+#                 font dan domain tracking pihak ketiga diblokir
+#   - 'headless': seperti 'fast' tetapi tanpa jendela browser
+BROWSER_PROFILES = {
+    'default': {
+        'headless': False,
+        'page_load_strategy': 'normal',
+        'block_resources': False,
+        'block_third_party': False,
+    },
+    'fast': {
+        'headless': False,
+        'page_load_strategy': 'eager',
+        'block_resources': True,
+        'block_third_party': True,
+    },
+    'headless': {
+        'headless': True,
+        'page_load_strategy': 'eager',
+        'block_resources': True,
+        'block_third_party': True,
+    },
+}
+DEFAULT_PROFILE = 'fast'
+
+# Pola URL gambar, video/audio dan font yang diblokir lewat CDP Network.setBlockedURLs
+# (video/audio hanya bisa diblokir di sini, tidak ada Chrome pref untuknya)
+BLOCKED_RESOURCE_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.mp4', '*.webm', '*.m3u8', '*.mp3',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+]
+
+# Domain analytics/iklan pihak ketiga yang tidak dibutuhkan untuk scraping
+BLOCKED_THIRD_PARTY_PATTERNS = [
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*googlesyndication.com*', '*googleadservices.com*', '*facebook.net*',
+    '*connect.facebook.com*', '*hotjar.com*', '*criteo.com*', '*criteo.net*',
+    '*analytics.tiktok.com*', '*branch.io*', '*appsflyer.com*', '*newrelic.com*',
+    '*nr-data.net*', '*clarity.ms*',
+]
+
+# Chrome prefs: 2 = blokir. Gambar diblokir di level browser sehingga berlaku juga
+# untuk tab baru (CDP setBlockedURLs hanya berlaku untuk tab tempat perintah dikirim).
+# Prompt notifikasi juga ditolak agar tidak menutupi halaman.
+BLOCK_PREFS = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.default_content_setting_values.notifications': 2,
+}
+
+
+def add_browser_arguments(parser, default=DEFAULT_PROFILE):
+    """
+    Menambahkan opsi --browser (pilihan profil browser) ke argparse parser milik main().
+    """
+    parser.add_argument('--browser', choices=sorted(BROWSER_PROFILES), default=default,
+                        help=f"Profil browser (default: {default}).")
+
+
+def blocked_patterns(block_resources=True, block_third_party=True, extra=None):
+    """
+    Menggabungkan daftar pola URL yang diblokir sesuai opsi profil.
+    """
+    patterns = []
+    if block_resources:
+        patterns += BLOCKED_RESOURCE_PATTERNS
+    if block_third_party:
+        patterns += BLOCKED_THIRD_PARTY_PATTERNS
+    return patterns + list(extra or [])
+
+
+def profile_blocked_patterns(profile):
+    """
+    Pola URL yang diblokir oleh profil browser (mis. untuk tab tambahan yang
+    dibuka lewat CDP, yang tidak ikut setBlockedURLs tab utama).
+    """
+    settings = BROWSER_PROFILES[profile]
+    return blocked_patterns(settings['block_resources'], settings['block_third_party'])
+
+
+def apply_blocking(driver, patterns):
+    """
+    Mengaktifkan pemblokiran URL lewat CDP pada tab aktif driver.
+    """
+    if not patterns:
+        return
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+
+def build_driver(profile=DEFAULT_PROFILE, user_agent=None, performance_log=False, user_data_dir=None,
+                 **overrides):
+    """
+    Membuat Chrome WebDriver sesuai profil browser.
+
+    Parameter:
+        profile (str): Nama profil di BROWSER_PROFILES.
+        user_agent (str): User-Agent kustom (opsional).
+        performance_log (bool): Aktifkan log performa Chrome (goog:loggingPrefs),
+            dipakai untuk menghitung byte yang ditransfer.
+        user_data_dir (str): Folder profil Chrome persisten (cache HTTP dan
+            cookie tetap ada antar run); None = profil sementara.
+        **overrides: Menimpa opsi profil (headless, page_load_strategy,
+            block_resources, block_third_party, extra_blocked).
+
+    Return:
+        webdriver: Instance Chrome WebDriver.
+    """
+    settings = {**BROWSER_PROFILES[profile], **overrides}
+    options = wb.ChromeOptions()
+    options.page_load_strategy = settings['page_load_strategy']
+    if settings['headless']:
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1366,900')
+    if user_agent:
+        options.add_argument(f'user-agent={user_agent}')
+    if settings['block_resources']:
+        options.add_experimental_option('prefs', BLOCK_PREFS)
+    if user_data_dir:
+        options.add_argument(f'--user-data-dir={os.path.abspath(user_data_dir)}')
+    if performance_log:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+    driver = wb.Chrome(options=options)
+    apply_blocking(driver, blocked_patterns(
+        settings['block_resources'], settings['block_third_party'], settings.get('extra_blocked')
+    ))
+    return driver
+
+
+def _transfer_from_log(driver):
+    # Menjumlahkan encodedDataLength dari event Network.loadingFinished di log performa
+    total_bytes = 0
+    requests = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message'])['message']
+        if message.get('method') == 'Network.loadingFinished':
+            total_bytes += message['params'].get('encodedDataLength', 0)
+            requests += 1
+    return total_bytes, requests
+
+
+def measure_page_load(driver, url):
+    """
+    Membuka url lalu mengukur waktu muat dan jumlah byte yang ditransfer.
+    Driver harus dibuat dengan performance_log=True.
+
+    Return:
+        dict: seconds (waktu driver.get), dom_content_loaded (ms),
+            bytes (total byte terkompresi) dan requests (jumlah request selesai).
+    """
+    driver.get_log('performance')  # buang log dari halaman sebelumnya
+    start = time.perf_counter()
+    driver.get(url)
+    seconds = time.perf_counter() - start
+    dom_ready = driver.execute_script(
+        "const nav = performance.getEntriesByType('navigation')[0];"
+        "return nav ? nav.domContentLoadedEventEnd : null;"
+    )
+    total_bytes, requests = _transfer_from_log(driver)
+    return {
+        'seconds': round(seconds, 3),
+        'dom_content_loaded': round(dom_ready, 1) if dom_ready else None,
+        'bytes': total_bytes,
+        'requests': requests,
+    }
+
+
+def compare_profiles(urls, profiles=('default', DEFAULT_PROFILE)):
+    """
+    Membandingkan waktu muat dan byte yang ditransfer antar profil browser
+    (mis. pemblokiran mati vs hidup) untuk daftar URL yang sama.
+
+    Return:
+        dict: profil -> list hasil measure_page_load per URL.
+    """
+    results = {}
+    for profile in profiles:
+        driver = build_driver(profile, performance_log=True)
+        try:
+            results[profile] = []
+            for url in urls:
+                try:
+                    measurement = measure_page_load(driver, url)
+                except WebDriverException as e:
+                    print(f"Gagal mengukur {url} ({profile}): {e.__class__.__name__}")
+                    continue
+                measurement['url'] = url
+                results[profile].append(measurement)
+        finally:
+            driver.quit()
+    return results
+
+
+def format_comparison(results):
+    """
+    Membuat tabel ringkas hasil compare_profiles.
+    """
+    lines = [f"{'profil':<10} {'halaman':<40} {'detik':>7} {'KB':>9} {'request':>8}"]
+    for profile, measurements in results.items():
+        for m in measurements:
+            page = urlsplit(m['url']).netloc + urlsplit(m['url']).path
+            lines.append(f"{profile:<10} {page[:40]:<40} {m['seconds']:>7.2f} "
+                         f"{m['bytes'] / 1024:>9.1f} {m['requests']:>8}")
+        if measurements:
+            total_seconds = sum(m['seconds'] for m in measurements)
+            total_kb = sum(m['bytes'] for m in measurements) / 1024
+            lines.append(f"{profile:<10} {'TOTAL':<40} {total_seconds:>7.2f} {total_kb:>9.1f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bandingkan waktu muat dan byte yang ditransfer dengan pemblokiran resource mati/hidup."
+    )
+    parser.add_argument('urls', nargs='+', help="URL halaman list/detail yang diukur.")
+    parser.add_argument('--profiles', default=f'default,{DEFAULT_PROFILE}',
+                        help="Profil yang dibandingkan, dipisah koma.")
+    parser.add_argument('--json', help="Simpan hasil mentah ke file JSON.")
+    args = parser.parse_args()
+
+    profiles = [p.strip() for p in args.profiles.split(',') if p.strip()]
+    unknown = [p for p in profiles if p not in BROWSER_PROFILES]
+    if unknown:
+        sys.exit(f"Profil tidak dikenal: {', '.join(unknown)}")
+
+    results = compare_profiles(args.urls, profiles)
+    print(format_comparison(results))
+    if args.json:
+        with open(args.json, 'w') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+from collections import deque
+from concurrent.futures import wait as wait_futures
+
+import pandas as pd
+
+from common.metrics import metrics
+
+# Folder default checkpoint (relatif terhadap folder kerja scraper)
+DEFAULT_CHECKPOINT_DIR = 'checkpoints'
+
+
+class Checkpoint:
+    """
+    Checkpoint append-only untuk hasil scraping.
+
+    Baris hasil ditulis ke file JSONL segera setelah satu halaman/toko/produk
+    selesai, dan file state kecil (JSON) mencatat posisi terakhir (mis. keyword,
+    nomor halaman, link terakhir). Jika run berhenti di tengah jalan, run berikutnya
+    dengan --resume dapat melanjutkan dari state tersebut. File CSV/XLSX akhir
+    dibangun dari file JSONL ini.
+
+    Parameter:
+        name (str): Nama checkpoint (mis. 'Tokopedia'); menjadi nama file.
+        directory (str): Folder penyimpanan checkpoint.
+    """
+
+    def __init__(self, name, directory=DEFAULT_CHECKPOINT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.rows_path = os.path.join(directory, f'{name}.jsonl')
+        self.state_path = os.path.join(directory, f'{name}.state.json')
+        self._staged = deque()
+
+    def load_state(self):
+        """
+        Membaca state terakhir. Mengembalikan dict kosong jika belum ada.
+        """
+        try:
+            with open(self.state_path, 'r') as file:
+                return json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save_state(self, **state):
+        """
+        Menyimpan state secara atomik (tulis file sementara lalu os.replace).
+        """
+        state['updated_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(state, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def reset(self):
+        """
+        Menghapus checkpoint lama untuk memulai run baru.
+        """
+        self._staged.clear()
+        for path in (self.rows_path, self.state_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def append(self, rows, **state):
+        """
+        Menulis baris ke file JSONL (flush + fsync), lalu memperbarui state.
+        """
+        with open(self.rows_path, 'a', encoding='utf-8') as file:
+            for row in rows:
+                file.write(json.dumps(row, ensure_ascii=False, default=str) + '\n')
+            file.flush()
+            os.fsync(file.fileno())
+        self.save_state(**state)
+
+    def stage_page(self, rows, futures, **state):
+        """
+        Menahan baris satu halaman sampai seluruh tugas detailnya (futures) selesai.
+        Halaman ditulis sesuai urutan lewat flush(), sehingga halaman berikutnya
+        bisa di-scrape sementara detail halaman sebelumnya masih dimuat.
+
+        Future yang selesai dianggap berarti row-nya sudah terisi, jadi future
+        harus baru selesai setelah row diperbarui (seperti DetailPool.submit dan
+        TabDetailPool.submit), bukan lewat add_done_callback.
+        """
+        self._staged.append((rows, [f for f in futures if f is not None], state))
+
+    def flush(self, wait=False):
+        """
+        Menulis halaman yang sudah lengkap secara berurutan. Dengan wait=True,
+        tunggu seluruh tugas detail selesai lalu tulis semua halaman tersisa.
+
+        Return:
+            int: Jumlah halaman yang ditulis.
+        """
+        written = 0
+        while self._staged:
+            rows, futures, state = self._staged[0]
+            if wait:
+                wait_futures(futures)
+            elif not all(f.done() for f in futures):
+                break
+            self._staged.popleft()
+            failed = sum(1 for f in futures if f.cancelled() or f.exception() is not None)
+            if failed:
+                # Tugas detail gagal: baris tetap ditulis, tetapi tanpa field detail
+                print(f"{failed} tugas detail gagal, baris ditulis tanpa detail.")
+                metrics.count('error', 'detail_missing', failed)
+            self.append(rows, **state)
+            written += 1
+        return written
+
+    def pending_pages(self):
+        """
+        Jumlah halaman yang masih menunggu tugas detail.
+        """
+        return len(self._staged)
+
+    def to_dataframe(self):
+        """
+        Membangun DataFrame dari seluruh baris di file JSONL (tanpa konversi tipe).
+        """
+        if not os.path.exists(self.rows_path) or os.path.getsize(self.rows_path) == 0:
+            return pd.DataFrame()
+        return pd.read_json(self.rows_path, lines=True, dtype=False, convert_dates=False)
@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import zlib
+import sqlite3
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qs
+
+# Lokasi default cache, dibagi oleh semua scraper
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.cache', 'detail_cache.sqlite'
+)
+
+# TTL per field (detik). Rating cepat berubah, deskripsi/toko/brand jarang berubah.
+DEFAULT_TTLS = {
+    'description': 7 * 24 * 3600,
+    'rating': 24 * 3600,
+    'store': 30 * 24 * 3600,
+    'brand': 30 * 24 * 3600,
+}
+DEFAULT_TTL = 3 * 24 * 3600
+
+# Batas ukuran total cache sebelum entri yang paling lama tidak diakses dibuang
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def canonical_url(url):
+    """
+    Menormalkan URL produk menjadi key cache: link iklan Tokopedia (ta.tokopedia.com)
+    dibuka ke URL tujuan, query string dan fragment dibuang, host di-lowercase.
+    """
+    parts = urlsplit(url)
+    if parts.netloc == 'ta.tokopedia.com':
+        target = parse_qs(parts.query).get('r')
+        if target:
+            parts = urlsplit(target[0])
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme or 'https', parts.netloc.lower(), path, '', ''))
+
+
+class DetailCache:
+    """
+    Cache detail produk di disk (SQLite) dengan key URL kanonik.
+
+    Setiap field disimpan bersama waktu pengambilannya sehingga TTL bisa berbeda
+    per field. HTML halaman dapat disimpan dalam bentuk terkompresi (zlib).
+    Jika total ukuran melebihi max_bytes, entri yang paling lama tidak diakses
+    dibuang lebih dulu (LRU). Aman dipakai dari beberapa thread.
+
+    Parameter:
+        path (str): Lokasi file SQLite.
+        ttls (dict): TTL per field (detik).
+        default_ttl (float): TTL untuk field yang tidak ada di ttls.
+        max_bytes (int): Batas ukuran total entri.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttls=None, default_ttl=DEFAULT_TTL,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.writes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS detail_cache ("
+            " url TEXT PRIMARY KEY,"
+            " fields TEXT NOT NULL,"
+            " html BLOB,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_detail_cache_access ON detail_cache(last_access)"
+        )
+        self._conn.commit()
+
+    def _ttl(self, field):
+        return self.ttls.get(field, self.default_ttl)
+
+    def get(self, url, fields):
+        """
+        Mengambil field detail dari cache. Mengembalikan dict field jika semua
+        field yang diminta ada dan belum kedaluwarsa, selain itu None.
+        """
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fields FROM detail_cache WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            stored = json.loads(row[0])
+            result = {}
+            for field in fields:
+                entry = stored.get(field)
+                if entry is None:
+                    self.misses += 1
+                    return None
+                if now - entry['ts'] > self._ttl(field):
+                    self.stale += 1
+                    self.misses += 1
+                    return None
+                result[field] = entry['value']
+            self._conn.execute(
+                "UPDATE detail_cache SET last_access = ? WHERE url = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+            return result
+
+    def get_html(self, url):
+        """
+        Mengambil HTML yang tersimpan untuk URL (None jika tidak ada).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT html FROM detail_cache WHERE url = ?", (canonical_url(url),)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def put(self, url, fields, html=None):
+        """
+        Menyimpan/menggabungkan field detail untuk URL. Field lama yang tidak
+        ditimpa tetap disimpan dengan waktu pengambilannya sendiri.
+        """
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fields, html FROM detail_cache WHERE url = ?", (key,)
+            ).fetchone()
+            stored = json.loads(row[0]) if row else {}
+            for field, value in fields.items():
+                stored[field] = {'value': value, 'ts': now}
+            blob = zlib.compress(html.encode('utf-8')) if html is not None else (row[1] if row else None)
+            encoded = json.dumps(stored, ensure_ascii=False)
+            size = len(encoded.encode('utf-8')) + (len(blob) if blob else 0)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO detail_cache (url, fields, html, size, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, blob, size, now)
+            )
+            self.writes += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM detail_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM detail_cache ORDER BY last_access ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM detail_cache WHERE url = ?", (url,))
+            total -= size
+            self.evictions += 1
+
+    def summary(self):
+        """
+        Ringkasan statistik hit/miss cache untuk dicetak di akhir run.
+        """
+        lookups = self.hits + self.misses
+        ratio = (self.hits / lookups * 100) if lookups else 0.0
+        return (f"Detail cache: {self.hits} hit, {self.misses} miss "
+                f"({self.stale} kedaluwarsa), hit rate {ratio:.1f}%, "
+                f"{self.writes} ditulis, {self.evictions} dibuang")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
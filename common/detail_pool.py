@@ -0,0 +1,250 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait as wait_futures
+
+from selenium.common.exceptions import WebDriverException
+
+from common.browser import build_driver
+from common.driver_pool import ManagedDriver
+from common.metrics import metrics
+from common.tab_engine import TabEngine, DEFAULT_TABS, TAB_TIMEOUT
+
+
+def cache_details(cache, link, details):
+    """
+    Menyimpan hasil detail ke cache. Detail dianggap berhasil diambil (dan layak
+    disimpan) hanya jika deskripsinya ada.
+    """
+    if cache is not None and details.get('description') is not None:
+        cache.put(link, details)
+
+
+def fetch_in_new_tab(driver, link, fetch_fn, cache=None, cache_fields=None):
+    """
+    Membuka link di tab baru pada driver utama, menjalankan fetch_fn, lalu menutup
+    tab tersebut dan kembali ke tab utama. Ini adalah jalur sekuensial lama yang
+    dipakai jika pool detail tidak digunakan. Jika cache memiliki entri segar untuk
+    link, tab tidak dibuka sama sekali.
+
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver.
+        link (str): URL halaman detail produk.
+        fetch_fn (callable): Fungsi fetch_fn(driver) yang mengembalikan dict field detail.
+        cache (DetailCache): Cache detail di disk (opsional).
+        cache_fields (tuple): Field yang harus segar di cache agar tab dilewati.
+    """
+    if cache is not None:
+        cached = cache.get(link, cache_fields)
+        if cached is not None:
+            return cached
+
+    main_window = driver.current_window_handle
+    try:
+        with metrics.phase('detail_open'):
+            driver.execute_script(f"window.open('{link}','_blank');")
+            driver.switch_to.window(driver.window_handles[-1])
+        with metrics.phase('detail_fetch'):
+            details = fetch_fn(driver)
+    finally:
+        driver.close()
+        driver.switch_to.window(main_window)
+    cache_details(cache, link, details)
+    return details
+
+
+class DetailPool:
+    """
+    Pool worker browser berukuran tetap untuk mengambil halaman detail produk.
+
+    Setiap worker thread memiliki WebDriver sendiri yang dibuat saat pertama kali
+    dibutuhkan. Link dikirim dengan submit(row, link); hasil fetch_fn ditulis
+    langsung ke dict row tersebut, sehingga urutan baris di product_data tetap sama
+    seperti urutan kartu di halaman hasil pencarian. Scraping halaman list bisa
+    terus berjalan selama halaman detail dimuat oleh worker.
+
+    Driver worker dibungkus ManagedDriver per slot, jadi cookie dan cache tersimpan
+    di profil persisten dan browser diganti baru di antara dua halaman detail
+    (tidak pernah di tengah fetch_fn) saat batas halaman atau memorinya tercapai.
+
+    Parameter:
+        fetch_fn (callable): Fungsi fetch_fn(driver) yang membaca field detail dari
+            halaman yang sedang terbuka dan mengembalikan dict.
+        size (int): Jumlah worker browser.
+        driver_factory (callable): Fungsi pembuat WebDriver baru (menerima user_data_dir).
+        slot (str): Nama slot profil persisten worker (lihat common/driver_pool.py).
+        implicit_wait (float): Implicit wait untuk driver worker (detik).
+        cache (DetailCache): Cache detail di disk; link dengan entri segar tidak dibuka.
+        cache_fields (tuple): Field yang harus segar di cache agar link dilewati.
+    """
+
+    def __init__(self, fetch_fn, size=3, driver_factory=None, implicit_wait=5,
+                 cache=None, cache_fields=None, slot='detail'):
+        self.fetch_fn = fetch_fn
+        self.size = size
+        self.driver_factory = driver_factory or build_driver
+        self.slot = slot
+        self.implicit_wait = implicit_wait
+        self.cache = cache
+        self.cache_fields = cache_fields
+        self._local = threading.local()
+        self._drivers = []
+        self._lock = threading.Lock()
+        self._futures = []
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="detail")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _managed(self):
+        managed = getattr(self._local, "managed", None)
+        if managed is None:
+            managed = ManagedDriver(self.driver_factory, self.slot, implicit_wait=self.implicit_wait)
+            self._local.managed = managed
+            with self._lock:
+                self._drivers.append(managed)
+        return managed
+
+    def _run(self, row, link):
+        managed = self._managed()
+        try:
+            # Setiap tugas detail adalah titik aman untuk recycle driver worker
+            driver = managed.checkout()
+            with metrics.phase('detail_open'):
+                driver.get(link)
+            with metrics.phase('detail_fetch'):
+                details = self.fetch_fn(driver)
+            managed.page_done()
+            cache_details(self.cache, link, details)
+            # Row diisi di thread worker sebelum future selesai: pemanggil yang
+            # melihat future.done() (mis. Checkpoint.flush) sudah mendapat row lengkap
+            row.update(details)
+            return details
+        except WebDriverException as e:
+            # Driver worker bermasalah, buat ulang pada tugas berikutnya
+            print(f"Worker detail gagal membuka {link}: {e.__class__.__name__}")
+            metrics.count('error', 'detail_open')
+            managed.quit('error')
+            return {}
+
+    def submit(self, row, link):
+        """
+        Menjadwalkan pengambilan detail untuk satu produk. Hasilnya memperbarui
+        dict row secara in-place sebelum future yang dikembalikan selesai. Jika
+        cache memiliki entri segar, row langsung diisi dan tidak ada tugas yang
+        dijadwalkan (mengembalikan None).
+        """
+        if self.cache is not None:
+            cached = self.cache.get(link, self.cache_fields)
+            if cached is not None:
+                row.update(cached)
+                return None
+
+        future = self._executor.submit(self._run, row, link)
+        self._futures.append(future)
+        return future
+
+    def pending(self):
+        """
+        Jumlah tugas detail yang belum selesai.
+        """
+        return sum(1 for f in self._futures if not f.done())
+
+    def join(self):
+        """
+        Menunggu seluruh tugas detail yang sudah dijadwalkan selesai.
+        """
+        wait_futures(self._futures)
+        self._futures = [f for f in self._futures if not f.done()]
+
+    def close(self):
+        """
+        Menunggu tugas yang tersisa lalu menutup seluruh worker browser.
+        """
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            drivers, self._drivers = self._drivers, []
+        for managed in drivers:
+            managed.quit()
+
+
+class TabDetailPool:
+    """
+    Pengganti DetailPool yang memuat halaman detail sebagai beberapa tab di
+    browser driver yang sudah ada (TabEngine), bukan satu browser per worker.
+    Field detail dibaca dengan script JS di setiap tab, jadi fetch_fn berbasis
+    WebDriver tidak dipakai di sini. Antarmukanya sama dengan DetailPool
+    (submit/pending/close) sehingga bisa dipakai langsung oleh extract_data
+    dan Checkpoint.stage_page.
+
+    Parameter:
+        driver (webdriver): Driver yang browsernya dipakai (tab aktifnya tidak disentuh).
+        script (str): Body fungsi JS gaya execute_script yang membaca field detail.
+        parse_fn (callable): parse_fn(nilai script) -> dict detail, atau None jika belum siap.
+        args (tuple): Argumen script.
+        tabs (int): Jumlah tab detail bersamaan.
+        timeout (float): Batas waktu per halaman detail (detik).
+        blocked_urls (list): Pola URL yang diblokir di tab detail.
+        cache (DetailCache): Cache detail di disk; link dengan entri segar tidak dibuka.
+        cache_fields (tuple): Field yang harus segar di cache agar link dilewati.
+    """
+
+    def __init__(self, driver, script, parse_fn, args=(), tabs=DEFAULT_TABS, timeout=TAB_TIMEOUT,
+                 blocked_urls=None, cache=None, cache_fields=None):
+        self.cache = cache
+        self.cache_fields = cache_fields
+        self._futures = []
+        self.engine = TabEngine(driver, script, parse_fn, args, tabs, timeout, blocked_urls).start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def submit(self, row, link):
+        """
+        Menjadwalkan pengambilan detail satu produk di tab. Baris diperbarui
+        sebelum future yang dikembalikan selesai. None jika diisi dari cache.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(link, self.cache_fields)
+            if cached is not None:
+                row.update(cached)
+                return None
+
+        done = Future()
+        done.set_running_or_notify_cancel()
+
+        def _write_back(f):
+            # done selalu diselesaikan, jika tidak close() dan Checkpoint.flush(wait=True)
+            # menunggu selamanya
+            try:
+                details = f.result() or {}
+                row.update(details)
+                cache_details(self.cache, link, details)
+            except Exception as e:
+                print(f"Detail tab gagal ditulis untuk {link}: {e.__class__.__name__}")
+                metrics.count('error', 'detail_tab')
+                done.set_exception(e)
+            else:
+                done.set_result(details)
+
+        self.engine.submit(link).add_done_callback(_write_back)
+        self._futures.append(done)
+        return done
+
+    def pending(self):
+        """
+        Jumlah tugas detail yang belum selesai.
+        """
+        return sum(1 for f in self._futures if not f.done())
+
+    def close(self):
+        """
+        Menunggu tugas yang tersisa lalu menutup tab detail (browser tetap hidup).
+        """
+        wait_futures(self._futures)
+        self._futures = []
+        self.engine.close()
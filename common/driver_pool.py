@@ -0,0 +1,267 @@
+import os
+import time
+import threading
+
+from selenium.common.exceptions import WebDriverException
+
+from common.metrics import metrics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Folder induk profil Chrome persisten (--user-data-dir) per slot driver, agar
+# cache HTTP dan cookie persetujuan tetap hangat antar run. None = profil
+# sementara baru setiap kali driver dibuat (seperti sebelumnya).
+DEFAULT_PROFILE_DIR = os.path.join(ROOT_DIR, '.chrome_profiles')
+
+# Satu folder profil hanya bisa dipakai satu proses Chrome. Jika folder slot
+# sedang dipakai (thread lain atau proses batch lain), dicoba slot-2, slot-3, ...
+MAX_SLOT_ATTEMPTS = 4
+
+# Driver dibuat ulang di titik aman berikutnya setelah sekian halaman, atau jika
+# RSS seluruh proses Chrome-nya melewati batas (MB). 0 = tidak pernah.
+RECYCLE_PAGES = 150
+RECYCLE_RSS_MB = 1500
+
+MB = 1024 * 1024
+
+# Folder profil yang sedang dipakai driver di proses ini
+_claimed = set()
+_claimed_lock = threading.Lock()
+
+
+def _proc_children():
+    # Peta ppid -> [pid] dari /proc (Linux)
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as file:
+                stat = file.read()
+        except OSError:
+            continue
+        ppid = int(stat.rsplit(')', 1)[1].split()[1])
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _proc_rss(pid):
+    try:
+        with open(f'/proc/{pid}/statm', 'r') as file:
+            return int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def process_tree_rss(pid):
+    """
+    Total RSS (byte) proses pid beserta seluruh turunannya, mis. chromedriver ->
+    Chrome -> proses renderer/GPU. Memakai psutil jika terpasang, selain itu
+    /proc (Linux). Mengembalikan None jika tidak dapat diukur.
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            parent = psutil.Process(pid)
+            processes = [parent] + parent.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+    if not os.path.isdir('/proc'):
+        return None
+
+    children = _proc_children()
+    total = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        total += _proc_rss(current)
+        stack += children.get(current, [])
+    return total
+
+
+def _claim_profile(base, slot, attempt):
+    # Folder profil pertama yang belum dipakai di proses ini, mulai dari percobaan `attempt`
+    with _claimed_lock:
+        for index in range(attempt, MAX_SLOT_ATTEMPTS + 1):
+            path = os.path.join(base, slot if index == 1 else f'{slot}-{index}')
+            if path not in _claimed:
+                _claimed.add(path)
+                return path, index
+    return None, MAX_SLOT_ATTEMPTS + 1
+
+
+def _release_profile(path):
+    with _claimed_lock:
+        _claimed.discard(path)
+
+
+class ManagedDriver:
+    """
+    Siklus hidup satu slot WebDriver: profil Chrome persisten, cek kesehatan
+    sesi, dan recycle (quit lalu buat ulang) setelah sekian halaman atau jika
+    memori Chrome terlalu besar. Recycle hanya terjadi saat checkout(), yang
+    dipanggil pemakai di titik aman (antar produk/toko/keyword), sehingga posisi
+    halaman yang sedang dibuka tidak hilang di tengah jalan.
+
+    Waktu start-up dan peak RSS setiap driver dicatat ke metrics (fase
+    'driver_startup' dan daftar drivers di ringkasan metrik).
+
+    Contoh:
+        managed = ManagedDriver(partial(build_driver, 'fast'), 'review-fast')
+        for url in urls:
+            driver = managed.checkout()
+            driver.get(url)
+            ...
+            managed.page_done()
+        managed.quit()
+
+    Parameter:
+        factory (callable): Fungsi pembuat WebDriver yang menerima argumen
+            user_data_dir (mis. partial(build_driver, profile)).
+        slot (str): Nama slot; menjadi nama folder profil persisten.
+        profile_dir (str): Folder induk profil persisten (None = profil sementara).
+        max_pages (int): Recycle setelah sekian halaman (0 = tidak pernah).
+        max_rss_mb (float): Recycle jika RSS Chrome melewati batas ini (0 = tidak pernah).
+        implicit_wait (float): Implicit wait untuk driver baru (None = tidak diatur).
+    """
+
+    def __init__(self, factory, slot, profile_dir=DEFAULT_PROFILE_DIR, max_pages=RECYCLE_PAGES,
+                 max_rss_mb=RECYCLE_RSS_MB, implicit_wait=None):
+        self.factory = factory
+        self.slot = slot
+        self.profile_dir = profile_dir
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.implicit_wait = implicit_wait
+        self.driver = None
+        self.user_data_dir = None
+        self.generation = 0
+        self.pages = 0
+        self.startup_seconds = None
+        self.peak_rss = None
+
+    def _launch(self):
+        if self.profile_dir is None:
+            return self.factory(), None
+
+        attempt = 1
+        while True:
+            path, attempt = _claim_profile(self.profile_dir, self.slot, attempt)
+            if path is None:
+                # Semua slot dipakai: profil sementara (dingin)
+                print(f"Semua profil {self.slot} sedang dipakai, memakai profil sementara.")
+                metrics.count('fallback', 'driver_profile')
+                return self.factory(), None
+            os.makedirs(path, exist_ok=True)
+            try:
+                return self.factory(user_data_dir=path), path
+            except WebDriverException as e:
+                # Biasanya folder profil sedang dipakai Chrome dari proses lain
+                _release_profile(path)
+                print(f"Profil {path} tidak dapat dipakai ({e.__class__.__name__}), mencoba slot berikutnya.")
+                attempt += 1
+
+    def _start(self):
+        start = time.perf_counter()
+        self.driver, self.user_data_dir = self._launch()
+        self.startup_seconds = time.perf_counter() - start
+        metrics.observe('driver_startup', self.startup_seconds)
+        if self.implicit_wait is not None:
+            self.driver.implicitly_wait(self.implicit_wait)
+        self.generation += 1
+        self.pages = 0
+        self.peak_rss = None
+        self.sample_memory()
+
+    def sample_memory(self):
+        """
+        Mengukur RSS Chrome saat ini (byte) dan memperbarui peak driver ini.
+        """
+        if self.driver is None:
+            return None
+        try:
+            pid = self.driver.service.process.pid
+        except AttributeError:
+            return None
+        rss = process_tree_rss(pid)
+        if rss is not None:
+            self.peak_rss = max(self.peak_rss or 0, rss)
+        return rss
+
+    def healthy(self):
+        """
+        True jika sesi WebDriver masih merespons (browser tidak crash/ditutup).
+        """
+        try:
+            self.driver.execute_script('return 1')
+            return bool(self.driver.window_handles)
+        except Exception:
+            return False
+
+    def _recycle_reason(self):
+        if not self.healthy():
+            return 'sesi tidak merespons'
+        if self.max_pages and self.pages >= self.max_pages:
+            return f'{self.pages} halaman'
+        rss = self.sample_memory()
+        if self.max_rss_mb and rss is not None and rss > self.max_rss_mb * MB:
+            return f'RSS {rss / MB:.0f} MB'
+        return None
+
+    def checkout(self):
+        """
+        Mengembalikan driver yang siap dipakai. Dipanggil di titik aman: driver
+        yang tidak sehat atau sudah melewati batas halaman/memori ditutup dan
+        dibuat ulang di sini.
+        """
+        if self.driver is not None:
+            reason = self._recycle_reason()
+            if reason:
+                print(f"Driver {self.slot} dibuat ulang ({reason}).")
+                metrics.count('recycle', 'driver')
+                self.quit(reason)
+        if self.driver is None:
+            self._start()
+        return self.driver
+
+    def page_done(self, amount=1):
+        """
+        Mencatat halaman yang sudah dibuka driver ini (dasar batas recycle).
+        """
+        self.pages += amount
+        self.sample_memory()
+
+    def quit(self, reason='selesai'):
+        """
+        Menutup driver dan mencatat ringkasannya ke metrics. Aman dipanggil
+        berulang kali atau jika driver sudah mati.
+        """
+        if self.driver is None:
+            return
+        self.sample_memory()
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        if self.user_data_dir is not None:
+            _release_profile(self.user_data_dir)
+        metrics.record_driver(
+            slot=os.path.basename(self.user_data_dir) if self.user_data_dir else f'{self.slot} (sementara)',
+            generation=self.generation,
+            startup_seconds=self.startup_seconds,
+            pages=self.pages,
+            peak_rss_bytes=self.peak_rss,
+            reason=reason,
+        )
+        self.driver = None
+        self.user_data_dir = None
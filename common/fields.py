@@ -0,0 +1,62 @@
+from collections import Counter
+from contextlib import contextmanager
+
+# Implicit wait default yang dipakai scraper (detik). Setiap find_element untuk
+# field opsional yang tidak ada akan menunggu selama ini sebelum gagal.
+DEFAULT_IMPLICIT_WAIT = 5
+
+
+@contextmanager
+def implicit_wait(driver, seconds):
+    """
+    Mengubah implicit wait driver selama blok with, lalu mengembalikan nilai
+    sebelumnya. Dipakai setelah gate eksplisit (WebDriverWait) per halaman agar
+    field opsional yang tidak ada gagal dalam hitungan mikrodetik.
+    """
+    previous = driver.timeouts.implicit_wait
+    driver.implicitly_wait(seconds)
+    try:
+        yield driver
+    finally:
+        driver.implicitly_wait(previous)
+
+
+class MissingFieldCounter:
+    """
+    Menghitung seberapa sering setiap field opsional kosong per kartu produk,
+    sekaligus memperkirakan waktu implicit wait yang tidak lagi terbuang.
+    """
+
+    def __init__(self, fields, implicit_wait=DEFAULT_IMPLICIT_WAIT):
+        self.fields = tuple(fields)
+        self.implicit_wait = implicit_wait
+        self.cards = 0
+        self.missing = Counter()
+
+    def record(self, row):
+        """
+        Mencatat satu baris produk; field opsional bernilai None dihitung hilang.
+        """
+        self.cards += 1
+        for field in self.fields:
+            if row.get(field) is None:
+                self.missing[field] += 1
+
+    def seconds_saved(self):
+        """
+        Perkiraan waktu implicit wait yang dihemat (satu lookup gagal per field hilang).
+        """
+        return sum(self.missing.values()) * self.implicit_wait
+
+    def summary(self):
+        """
+        Ringkasan jumlah field hilang per field dalam bentuk teks.
+        """
+        lines = [f"Field opsional yang kosong ({self.cards} kartu):"]
+        for field in self.fields:
+            count = self.missing[field]
+            lines.append(
+                f"  {field}: {count}x (~{count * self.implicit_wait} detik implicit wait)"
+            )
+        lines.append(f"  Total perkiraan waktu dihemat: {self.seconds_saved()} detik")
+        return "\n".join(lines)
@@ -0,0 +1,521 @@
+import os
+import re
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+import datetime
+import threading
+
+import pandas as pd
+
+from common.normalize import normalize_dataframe, find_data_files
+from common.output import iter_jsonl_frames, jsonl_columns
+from common.product_index import product_id
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lokasi default database riwayat, dibagi oleh semua scraper
+DEFAULT_HISTORY_PATH = os.path.join(ROOT_DIR, 'data', 'history.sqlite')
+
+# Folder hasil scraping lama yang diimpor oleh 'python -m common.history import'
+DEFAULT_IMPORT_PATHS = [
+    os.path.join(ROOT_DIR, 'data'),
+    os.path.join(ROOT_DIR, 'data_store'),
+    os.path.join(ROOT_DIR, 'review_scraper'),
+]
+
+# Jumlah baris per executemany (satu transaksi per batch)
+BATCH_ROWS = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    product_id TEXT PRIMARY KEY,
+    platform TEXT,
+    name TEXT,
+    store TEXT,
+    location TEXT,
+    brand TEXT,
+    url TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    product_id TEXT NOT NULL,
+    scraped_on TEXT NOT NULL,
+    keyword TEXT NOT NULL DEFAULT '',
+    price INTEGER,
+    original_price INTEGER,
+    discount REAL,
+    sold INTEGER,
+    rating REAL,
+    source TEXT,
+    PRIMARY KEY (product_id, scraped_on, keyword)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON snapshots(scraped_on);
+CREATE TABLE IF NOT EXISTS reviews (
+    product_id TEXT NOT NULL,
+    review_id TEXT NOT NULL,
+    product_name TEXT,
+    rating REAL,
+    review_time TEXT,
+    review_text TEXT,
+    scraped_on TEXT NOT NULL,
+    source TEXT,
+    PRIMARY KEY (product_id, review_id)
+);
+CREATE INDEX IF NOT EXISTS idx_reviews_date ON reviews(scraped_on);
+CREATE TABLE IF NOT EXISTS review_watermarks (
+    product_url TEXT PRIMARY KEY,
+    review_hash TEXT NOT NULL,
+    review_time TEXT,
+    updated_at TEXT NOT NULL,
+    review_id TEXT,
+    run TEXT
+);
+"""
+
+UPSERT_PRODUCT = """
+INSERT INTO products (product_id, platform, name, store, location, brand, url, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(product_id) DO UPDATE SET
+    platform = COALESCE(excluded.platform, products.platform),
+    name = CASE WHEN excluded.last_seen >= products.last_seen
+                THEN COALESCE(excluded.name, products.name) ELSE products.name END,
+    store = COALESCE(products.store, excluded.store),
+    location = COALESCE(excluded.location, products.location),
+    brand = COALESCE(excluded.brand, products.brand),
+    url = COALESCE(products.url, excluded.url),
+    first_seen = MIN(products.first_seen, excluded.first_seen),
+    last_seen = MAX(products.last_seen, excluded.last_seen)
+"""
+
+UPSERT_SNAPSHOT = """
+INSERT INTO snapshots (product_id, scraped_on, keyword, price, original_price, discount, sold, rating, source)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(product_id, scraped_on, keyword) DO UPDATE SET
+    price = COALESCE(excluded.price, snapshots.price),
+    original_price = COALESCE(excluded.original_price, snapshots.original_price),
+    discount = COALESCE(excluded.discount, snapshots.discount),
+    sold = COALESCE(excluded.sold, snapshots.sold),
+    rating = COALESCE(excluded.rating, snapshots.rating),
+    source = excluded.source
+"""
+
+UPSERT_REVIEW = """
+INSERT INTO reviews (product_id, review_id, product_name, rating, review_time, review_text, scraped_on, source)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(product_id, review_id) DO UPDATE SET
+    product_name = COALESCE(excluded.product_name, reviews.product_name),
+    review_time = COALESCE(excluded.review_time, reviews.review_time)
+"""
+
+UPSERT_WATERMARK = """
+INSERT INTO review_watermarks (product_url, review_hash, review_time, updated_at, review_id, run)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(product_url) DO UPDATE SET
+    review_hash = excluded.review_hash,
+    review_time = excluded.review_time,
+    updated_at = excluded.updated_at,
+    review_id = excluded.review_id,
+    run = excluded.run
+"""
+
+# Kolom review_watermarks yang ditambahkan setelah versi awal (migrasi database lama)
+WATERMARK_COLUMNS = {'review_id': 'TEXT', 'run': 'TEXT'}
+
+# Jumlah review terbaru berurutan (hash + review_time) yang disimpan sebagai
+# watermark untuk review tanpa ID; semuanya harus cocok berturut-turut agar
+# pagination berhenti, sehingga review pendek yang sama isinya ('Mantap', bintang
+# 5 tanpa teks) tidak dianggap watermark
+WATERMARK_RUN = 3
+
+# Tanggal di nama file hasil scraping: '..._11-03-2025' atau '..._2025-03-23_16.31.22'
+DMY_DATE_RE = re.compile(r'(\d{2})-(\d{2})-(\d{4})')
+YMD_DATE_RE = re.compile(r'(\d{4})-(\d{2})-(\d{2})')
+PLATFORMS = ('tokopedia', 'lazada', 'shopee')
+
+
+def today():
+    return datetime.date.today().isoformat()
+
+
+def parse_filename(path):
+    """
+    Membaca platform, keyword dan tanggal scraping dari nama file hasil scraper,
+    mis. 'Tokopedia_Moringa_Tea_11-03-2025.csv' -> ('tokopedia', 'Moringa Tea', '2025-03-11').
+    Bagian yang tidak terbaca bernilai None (tanggal: waktu modifikasi file).
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    match = DMY_DATE_RE.search(stem)
+    if match:
+        day, month, year = match.groups()
+    else:
+        match = YMD_DATE_RE.search(stem)
+        if match:
+            year, month, day = match.groups()
+    if match:
+        scraped_on = f'{year}-{month}-{day}'
+        prefix = stem[:match.start()]
+    else:
+        scraped_on = datetime.date.fromtimestamp(os.path.getmtime(path)).isoformat()
+        prefix = stem
+
+    tokens = [t for t in prefix.split('_') if t]
+    platform = None
+    if tokens and tokens[0].lower() in PLATFORMS:
+        platform = tokens.pop(0).lower()
+    tokens = [t for t in tokens if t.lower() not in ('products', 'product', 'reviews')]
+    keyword = ' '.join(tokens) or None
+    return platform, keyword, scraped_on
+
+
+def _column(df, *names):
+    # Kolom pertama yang ada di df (nama kolom berbeda antar scraper/versi)
+    for name in names:
+        if name in df.columns:
+            return df[name]
+    return pd.Series(None, index=df.index, dtype=object)
+
+
+def _values(series):
+    # Nilai kolom sebagai list Python dengan <NA>/NaN menjadi None untuk sqlite3
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+def snapshot_frame(df, platform=None, keyword=None, scraped_on=None):
+    """
+    Menyeragamkan kolom hasil scraper (keyword, toko, versi lama) menjadi kolom
+    riwayat: product_id, platform, name, store, location, brand, url, price,
+    original_price, discount, sold, rating, keyword. Harga dll. dinormalisasi
+    dengan normalize_dataframe. Baris tanpa URL produk dibuang.
+    """
+    df = normalize_dataframe(df)
+    url = _column(df, 'details_link', 'url', 'product_url')
+    if 'discounted_price' in df.columns:
+        price = df['discounted_price'].fillna(df['original_price'])
+        original_price = df['original_price']
+    else:
+        price = _column(df, 'price')
+        original_price = price
+    out = pd.DataFrame({
+        'product_id': url.map(product_id, na_action='ignore'),
+        'name': _column(df, 'name', 'product_name'),
+        'store': _column(df, 'store', 'shop'),
+        'location': _column(df, 'location'),
+        'brand': _column(df, 'brand'),
+        'url': url,
+        'price': price,
+        'original_price': original_price,
+        'discount': _column(df, 'discount'),
+        'sold': _column(df, 'sold', 'sales'),
+        'rating': _column(df, 'rating'),
+    })
+    out['platform'] = df['platform'] if 'platform' in df.columns else platform
+    out['platform'] = out['platform'].fillna(out['product_id'].str.split(':').str[0])
+    out['keyword'] = (df['keyword'] if 'keyword' in df.columns else keyword)
+    out['keyword'] = out['keyword'].fillna('')
+    out['scraped_on'] = scraped_on or today()
+    return out[out['product_id'].notna()]
+
+
+def review_frame(df, scraped_on=None):
+    """
+    Menyeragamkan kolom hasil review scraper. review_id memakai ID review dari
+    sumber jika ada; selain itu hash rating + teks + review_time ditambah urutan
+    kemunculan review dengan isi yang sama di produk itu, sehingga review berbeda
+    yang isinya sama (mis. bintang 5 tanpa teks) tidak tergabung menjadi satu baris.
+    """
+    url = _column(df, 'product_url', 'url')
+    rating = pd.to_numeric(_column(df, 'rating'), errors='coerce')
+    text = _column(df, 'review_text', 'review').astype('string')
+    out = pd.DataFrame({
+        'product_id': url.map(product_id, na_action='ignore'),
+        'product_name': _column(df, 'product_name'),
+        'rating': rating,
+        'review_time': _column(df, 'review_time'),
+        'review_text': text,
+    })
+    keys = (rating.astype('string').fillna('') + '|' + text.fillna('') + '|'
+            + out['review_time'].astype('string').fillna(''))
+    occurrence = keys.groupby([out['product_id'].fillna(''), keys]).cumcount().astype('string')
+    synthetic = (keys + '|' + occurrence).map(lambda key: hashlib.sha1(key.encode('utf-8')).hexdigest()[:16])
+    if 'review_id' in df.columns:
+        # Baris tanpa ID di sumber yang sebagian ber-ID tetap mendapat kunci sintetis
+        out['review_id'] = df['review_id'].astype('string').fillna(synthetic)
+    else:
+        out['review_id'] = synthetic
+    out['scraped_on'] = scraped_on or today()
+    return out[out['product_id'].notna()]
+
+
+def review_hash(row):
+    """
+    Hash satu baris review (dict) untuk watermark review inkremental: sha1 rating +
+    teks review. Jalur network dan DOM menghasilkan hash yang sama untuk review
+    yang sama, sedangkan review_time relatif ('3 bulan lalu') tidak ikut di-hash.
+    """
+    rating = row.get('rating')
+    text = row.get('review_text') or row.get('review') or ''
+    key = f"{'' if rating is None else rating}|{text}"
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+
+
+class HistoryStore:
+    """
+    Riwayat produk, snapshot harga/terjual/rating per tanggal scraping, dan
+    review dalam satu database SQLite. Semua penulisan berupa upsert, jadi
+    file/run yang sama boleh diimpor berulang kali. Aman dipakai dari beberapa
+    thread.
+
+    Parameter:
+        path (str): Lokasi file SQLite.
+    """
+
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(review_watermarks)")}
+        for column, kind in WATERMARK_COLUMNS.items():
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE review_watermarks ADD COLUMN {column} {kind}")
+        self._conn.commit()
+
+    def _executemany(self, sql, rows):
+        # Satu transaksi per batch BATCH_ROWS baris
+        with self._lock:
+            for start in range(0, len(rows), BATCH_ROWS):
+                with self._conn:
+                    self._conn.executemany(sql, rows[start:start + BATCH_ROWS])
+
+    def upsert_snapshots(self, df, platform=None, keyword=None, scraped_on=None, source=None):
+        """
+        Menulis DataFrame hasil scraper (kolom mentah atau sudah dinormalisasi)
+        ke tabel products dan snapshots.
+
+        Return:
+            int: Jumlah snapshot yang ditulis.
+        """
+        frame = snapshot_frame(df, platform, keyword, scraped_on)
+        if frame.empty:
+            return 0
+        products = list(zip(*(_values(frame[c]) for c in (
+            'product_id', 'platform', 'name', 'store', 'location', 'brand', 'url', 'scraped_on', 'scraped_on'
+        ))))
+        snapshots = list(zip(*(_values(frame[c]) for c in (
+            'product_id', 'scraped_on', 'keyword', 'price', 'original_price', 'discount', 'sold', 'rating'
+        )), [source] * len(frame)))
+        self._executemany(UPSERT_PRODUCT, products)
+        self._executemany(UPSERT_SNAPSHOT, snapshots)
+        return len(snapshots)
+
+    def upsert_reviews(self, df, scraped_on=None, source=None):
+        """
+        Menulis DataFrame hasil review scraper ke tabel reviews.
+
+        Return:
+            int: Jumlah review yang ditulis.
+        """
+        frame = review_frame(df, scraped_on)
+        if frame.empty:
+            return 0
+        rows = list(zip(*(_values(frame[c]) for c in (
+            'product_id', 'review_id', 'product_name', 'rating', 'review_time', 'review_text', 'scraped_on'
+        )), [source] * len(frame)))
+        self._executemany(UPSERT_REVIEW, rows)
+        return len(rows)
+
+    def ingest_jsonl(self, path, platform=None, keyword=None, reviews=False):
+        """
+        Menulis checkpoint JSONL scraper ke riwayat per potongan DataFrame.
+
+        Return:
+            int: Jumlah baris yang ditulis.
+        """
+        columns = jsonl_columns(path)
+        source = os.path.basename(path)
+        total = 0
+        for frame in iter_jsonl_frames(path, columns):
+            if reviews:
+                total += self.upsert_reviews(frame, source=source)
+            else:
+                total += self.upsert_snapshots(frame, platform, keyword, source=source)
+        return total
+
+    def import_file(self, path):
+        """
+        Mengimpor satu file CSV/XLSX hasil scraping lama. Semua sheet XLSX dibaca
+        (mis. file *_per_store.xlsx dengan satu sheet per toko).
+
+        Return:
+            tuple: (jenis 'snapshots'/'reviews'/None, jumlah baris).
+        """
+        if path.endswith('.xlsx'):
+            df = pd.concat(pd.read_excel(path, sheet_name=None).values(), ignore_index=True)
+        else:
+            df = pd.read_csv(path)
+        platform, keyword, scraped_on = parse_filename(path)
+        source = os.path.relpath(path, ROOT_DIR)
+        if 'review_text' in df.columns or 'review' in df.columns:
+            return 'reviews', self.upsert_reviews(df, scraped_on, source)
+        if {'name', 'product_name'} & set(df.columns) and {'price', 'original_price'} & set(df.columns):
+            return 'snapshots', self.upsert_snapshots(df, platform, keyword, scraped_on, source)
+        return None, 0
+
+    def review_watermark(self, product_url):
+        """
+        Watermark review terbaru yang tersimpan untuk satu produk.
+
+        Return:
+            dict | None: {'review_hash', 'review_time', 'review_id', 'run', 'updated_at'}
+                atau None. run adalah daftar [hash, review_time] review terbaru
+                berurutan (watermark lama tanpa run: hanya review terbaru).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT review_hash, review_time, updated_at, review_id, run FROM review_watermarks "
+                "WHERE product_url = ?",
+                (product_url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'review_hash': row[0],
+            'review_time': row[1],
+            'updated_at': row[2],
+            'review_id': row[3],
+            'run': json.loads(row[4]) if row[4] else [[row[0], row[1]]],
+        }
+
+    def set_review_watermark(self, product_url, reviews, previous=None):
+        """
+        Menyimpan watermark produk dari review baru hasil scraping urut terbaru:
+        ID review terbaru (jika sumber menyediakan) dan WATERMARK_RUN pasangan
+        hash + review_time teratas. Jika review baru lebih sedikit dari
+        WATERMARK_RUN, run dilanjutkan dengan run watermark sebelumnya (previous),
+        karena review itulah yang berada tepat di bawahnya.
+        """
+        if not reviews:
+            return
+        run = [[review_hash(row), row.get('review_time')] for row in reviews[:WATERMARK_RUN]]
+        if previous:
+            run = (run + previous['run'])[:WATERMARK_RUN]
+        newest = reviews[0]
+        updated_at = datetime.datetime.now().isoformat(timespec='seconds')
+        with self._lock, self._conn:
+            self._conn.execute(UPSERT_WATERMARK, (
+                product_url, review_hash(newest), newest.get('review_time'), updated_at,
+                newest.get('review_id'), json.dumps(run, ensure_ascii=False),
+            ))
+
+    def price_history(self, product, start=None, end=None):
+        """
+        Riwayat harga/terjual/rating satu produk (ID kanonik atau URL), urut tanggal.
+        """
+        pid = product_id(product) if product.startswith('http') else product
+        return self._query(
+            "SELECT scraped_on, keyword, price, original_price, discount, sold, rating"
+            " FROM snapshots WHERE product_id = ? AND scraped_on BETWEEN ? AND ?"
+            " ORDER BY scraped_on, keyword",
+            (pid, start or '0000-00-00', end or '9999-99-99')
+        )
+
+    def snapshots_between(self, start, end, platform=None):
+        """
+        Semua snapshot dalam rentang tanggal (inklusif), opsional per platform.
+        """
+        sql = ("SELECT s.scraped_on, p.platform, s.product_id, p.name, p.store, s.keyword,"
+               " s.price, s.original_price, s.discount, s.sold, s.rating"
+               " FROM snapshots s JOIN products p ON p.product_id = s.product_id"
+               " WHERE s.scraped_on BETWEEN ? AND ?")
+        params = [start, end]
+        if platform:
+            sql += " AND p.platform = ?"
+            params.append(platform)
+        return self._query(sql + " ORDER BY s.scraped_on, s.product_id", params)
+
+    def _query(self, sql, params):
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            rows = cursor.fetchall()
+        return pd.DataFrame(rows, columns=columns)
+
+    def stats(self):
+        with self._lock:
+            return {
+                table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('products', 'snapshots', 'reviews', 'review_watermarks')
+            }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def import_all(store, paths=None):
+    """
+    Mengimpor semua file CSV/XLSX di paths ke store, mencetak ringkasan per file.
+    """
+    totals = {'snapshots': 0, 'reviews': 0}
+    start = time.perf_counter()
+    for path in find_data_files(paths or DEFAULT_IMPORT_PATHS):
+        kind, count = store.import_file(path)
+        if kind is None:
+            print(f"{path}: dilewati (kolom tidak dikenal)")
+            continue
+        totals[kind] += count
+        print(f"{path}: {count} {kind}")
+    seconds = time.perf_counter() - start
+    print(f"\nDiimpor {totals['snapshots']} snapshot dan {totals['reviews']} review "
+          f"dalam {seconds:.2f} detik. Isi database: {store.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Riwayat harga/terjual/rating produk di SQLite.")
+    parser.add_argument('--db', default=DEFAULT_HISTORY_PATH, help="Lokasi file SQLite riwayat.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help="Impor file CSV/XLSX hasil scraping lama.")
+    import_parser.add_argument('paths', nargs='*', help="Folder/file (default: data/, data_store/, review_scraper/).")
+
+    query_parser = commands.add_parser('query', help="Riwayat satu produk (ID kanonik atau URL).")
+    query_parser.add_argument('product')
+    query_parser.add_argument('--from', dest='start')
+    query_parser.add_argument('--to', dest='end')
+
+    range_parser = commands.add_parser('range', help="Semua snapshot dalam rentang tanggal.")
+    range_parser.add_argument('start', help="Tanggal awal (YYYY-MM-DD).")
+    range_parser.add_argument('end', help="Tanggal akhir (YYYY-MM-DD).")
+    range_parser.add_argument('--platform')
+    range_parser.add_argument('--csv', help="Simpan hasil ke file CSV.")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.db)
+    try:
+        if args.command == 'import':
+            import_all(store, args.paths or None)
+            return
+        start = time.perf_counter()
+        if args.command == 'query':
+            result = store.price_history(args.product, args.start, args.end)
+        else:
+            result = store.snapshots_between(args.start, args.end, args.platform)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if getattr(args, 'csv', None):
+            result.to_csv(args.csv, index=False)
+        with pd.option_context('display.max_rows', 50, 'display.width', 200):
+            print(result)
+        print(f"{len(result)} baris dalam {elapsed_ms:.1f} ms")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import urllib3
+
+from common.metrics import metrics
+
+# Header default agar respon HTML sama dengan yang diterima browser biasa
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'id-ID,id;q=0.9,en;q=0.8',
+}
+
+
+class HttpDetailFetcher:
+    """
+    Mengambil halaman detail produk lewat HTTP biasa (tanpa browser) dengan
+    koneksi yang dipakai ulang dari urllib3.PoolManager, lalu mem-parsing HTML
+    dengan parse_fn. Jumlah request bersamaan dibatasi max_workers.
+
+    Parameter:
+        parse_fn (callable): Fungsi parse_fn(html) yang mengembalikan nilai hasil
+            parsing, atau None jika data tidak ada di HTML.
+        max_workers (int): Jumlah request HTTP bersamaan (juga ukuran pool per host).
+        timeout (float): Timeout baca per request (detik).
+        retries (int): Jumlah retry untuk error koneksi/5xx.
+        headers (dict): Header tambahan untuk setiap request.
+        on_html (callable): Hook opsional on_html(url, html) untuk setiap respon
+            yang berhasil, mis. untuk menyimpan HTML ke cache.
+    """
+
+    def __init__(self, parse_fn, max_workers=8, timeout=10, retries=2, headers=None,
+                 on_html=None):
+        self.parse_fn = parse_fn
+        self.on_html = on_html
+        self.max_workers = max_workers
+        self.http = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=max_workers,
+            block=True,
+            headers={**DEFAULT_HEADERS, **(headers or {})},
+            timeout=urllib3.Timeout(connect=5, read=timeout),
+            retries=urllib3.Retry(total=retries, backoff_factor=0.5,
+                                  status_forcelist=(429, 500, 502, 503, 504)),
+        )
+
+    def fetch_html(self, url):
+        """
+        Mengambil HTML satu halaman. Mengembalikan None jika request gagal atau
+        status bukan 200.
+        """
+        try:
+            with metrics.phase('detail_http'):
+                response = self.http.request('GET', url)
+        except urllib3.exceptions.HTTPError as e:
+            print(f"HTTP gagal untuk {url}: {e.__class__.__name__}")
+            metrics.count('error', 'detail_http')
+            return None
+        if response.status != 200:
+            metrics.count('error', 'detail_http')
+            return None
+        return response.data.decode('utf-8', errors='replace')
+
+    def fetch(self, url):
+        """
+        Mengambil dan mem-parsing satu halaman detail. None jika gagal atau data kosong.
+        """
+        html = self.fetch_html(url)
+        if html is None:
+            return None
+        if self.on_html is not None:
+            self.on_html(url, html)
+        return self.parse_fn(html)
+
+    def fetch_many(self, urls):
+        """
+        Mengambil banyak halaman detail secara bersamaan (maksimal max_workers).
+
+        Return:
+            dict: url -> hasil parse_fn (None jika gagal/kosong).
+        """
+        unique = list(dict.fromkeys(urls))
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="http") as executor:
+            results = executor.map(self.fetch, unique)
+            return dict(zip(unique, results))
+
+    def close(self):
+        self.http.clear()
@@ -0,0 +1,67 @@
+import json
+
+# Snippet JavaScript yang membaca seluruh kartu produk dalam satu panggilan
+# execute_script. Selector memakai XPath yang sama dengan jalur find_element.
+#   arguments[0]: XPath kartu produk (relatif terhadap document)
+#   arguments[1]: map field -> XPath relatif terhadap kartu
+#   arguments[2]: map field -> nama atribut (mis. href); field lain diambil teksnya
+#   arguments[3]: XPath elemen yang perlu di-hover sebelum dibaca (opsional)
+CARD_EXTRACT_JS = """
+var cardXpath = arguments[0], selectors = arguments[1],
+    attributes = arguments[2] || {}, hoverXpath = arguments[3];
+
+function first(node, xpath) {
+    return document.evaluate(
+        xpath, node, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+    ).singleNodeValue;
+}
+
+var cards = document.evaluate(
+    cardXpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+);
+var out = [];
+for (var i = 0; i < cards.snapshotLength; i++) {
+    var card = cards.snapshotItem(i);
+    if (hoverXpath) {
+        var target = first(card, hoverXpath);
+        if (target) {
+            ['mouseover', 'mouseenter'].forEach(function (type) {
+                target.dispatchEvent(new MouseEvent(type, {bubbles: true}));
+            });
+        }
+    }
+    var row = {};
+    for (var field in selectors) {
+        var el = first(card, selectors[field]);
+        if (!el) {
+            row[field] = null;
+        } else if (attributes[field]) {
+            var attr = attributes[field];
+            row[field] = el[attr] || el.getAttribute(attr);
+        } else {
+            row[field] = (el.innerText || el.textContent || '').trim();
+        }
+    }
+    out.push(row);
+}
+return JSON.stringify(out);
+"""
+
+
+def extract_cards_script(driver, card_xpath, selectors, attributes=None, hover=None):
+    """
+    Mengambil field seluruh kartu produk di halaman dengan satu round trip ke
+    chromedriver. Field yang tidak ditemukan bernilai None.
+
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver.
+        card_xpath (str): XPath kartu produk.
+        selectors (dict): Map nama field -> XPath relatif terhadap kartu.
+        attributes (dict): Map nama field -> atribut yang dibaca (default: teks).
+        hover (str): XPath relatif elemen yang di-hover sebelum field dibaca.
+
+    Return:
+        list[dict]: Satu dict field mentah per kartu, urut sesuai halaman.
+    """
+    raw = driver.execute_script(CARD_EXTRACT_JS, card_xpath, selectors, attributes or {}, hover)
+    return json.loads(raw) if raw else []
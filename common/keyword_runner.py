@@ -0,0 +1,266 @@
+import time
+import argparse
+import datetime
+from collections import namedtuple
+from functools import partial
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
+
+from common.detail_pool import DetailPool, TabDetailPool
+from common.fields import MissingFieldCounter
+from common.detail_cache import DetailCache
+from common.product_index import ProductIndex
+from common.checkpoint import Checkpoint
+from common.output import add_output_arguments, output_formats, export_jsonl, iter_jsonl
+from common.browser import add_browser_arguments, profile_blocked_patterns
+from common.driver_pool import ManagedDriver
+from common.metrics import metrics
+from common.normalize import normalize_dataframe
+from common.history import HistoryStore
+
+# Profil browser (lihat common/browser.py): 'fast' memblokir gambar/media/font dan
+# tracker pihak ketiga dengan pageLoadStrategy eager; bisa diganti lewat --browser
+BROWSER_PROFILE = 'fast'
+
+# Ubah harga/diskon/terjual/rating menjadi angka saat membangun file output
+# (checkpoint JSONL tetap menyimpan teks aslinya)
+NORMALIZE_OUTPUT = True
+
+# Simpan snapshot harga/terjual/rating run ini ke database riwayat (common/history.py)
+RECORD_HISTORY = True
+
+# Jumlah worker browser untuk membuka halaman detail (0 = sekuensial di tab baru)
+DETAIL_WORKERS = 3
+
+# Mesin detail jika DETAIL_WORKERS > 0: 'tabs' memuat DETAIL_TABS halaman detail
+# sekaligus sebagai tab di browser driver utama (lewat CDP, tanpa browser
+# tambahan), 'browsers' memakai satu browser per worker (DetailPool). Jika mesin
+# tab tidak bisa tersambung, dipakai 'browsers'.
+DETAIL_ENGINE = 'tabs'
+DETAIL_TABS = 4
+
+# Lewati produk yang sudah diambil di halaman sebelumnya (kartu sponsor/iklan yang
+# muncul berulang) sebelum hover dan sebelum halaman detailnya dibuka
+SKIP_DUPLICATES = True
+
+# Cache detail di disk: produk dengan entri segar (field KeywordSite.detail_fields)
+# tidak dibuka lagi
+USE_DETAIL_CACHE = True
+
+# Implicit wait driver utama (detik). Jika ZERO_IMPLICIT_WAIT aktif, implicit wait
+# diset 0 selama ekstraksi kartu (setelah satu gate eksplisit per halaman) sehingga
+# field opsional yang tidak ada tidak lagi memakan IMPLICIT_WAIT detik per kartu.
+IMPLICIT_WAIT = 5
+ZERO_IMPLICIT_WAIT = True
+
+# Batas waktu scroll adaptif per halaman hasil pencarian (detik)
+SCROLL_MAX_TIME = 20
+
+# Pagination hasil pencarian: 'url' membuka halaman ke-N langsung dari
+# search_url(keyword, N), sehingga setiap halaman bisa diambil atau diulang
+# sendiri tanpa mengulang halaman sebelumnya (mis. satu halaman per shard batch);
+# 'click' mengetik keyword di kotak pencarian lalu klik tombol halaman berikutnya.
+PAGINATION = 'url'
+
+# Urutan hasil untuk search_url: key SORT_OPTIONS scraper, atau None = urutan default situs
+SEARCH_SORT = None
+
+# Bagian khusus platform yang dipakai scrape_keyword dan run_cli:
+#   name            : nama platform ('tokopedia'), untuk slot driver dan riwayat
+#   label           : nama tampilan ('Tokopedia'), untuk checkpoint dan metrik
+#   output_name     : awalan nama file output (tanggal ditambahkan di belakang)
+#   home_url, search_xpath : halaman awal dan kotak pencarian untuk PAGINATION 'click'
+#   create_driver   : create_driver(profile, **kwargs) -> WebDriver
+#   scrolling       : scrolling(driver), memuat seluruh kartu halaman hasil pencarian
+#   extract_data    : extract_data(driver, product_data, detail_pool, missing_fields=...,
+#                     detail_cache=..., product_index=...) -> list future detail
+#   search_url      : search_url(keywords, page) -> URL halaman hasil pencarian
+#   go_to_next_page : go_to_next_page(driver) -> False jika gagal pindah halaman
+#   detail_fetcher  : detail_fetcher() -> fetch_fn(driver) untuk DetailPool
+#   tab_detail      : (script, parse_fn, args) untuk TabDetailPool
+#   detail_fields   : field detail yang harus segar di cache
+#   optional_fields : field opsional kartu yang dihitung jika kosong
+KeywordSite = namedtuple('KeywordSite', [
+    'name', 'label', 'output_name', 'home_url', 'search_xpath', 'create_driver', 'scrolling',
+    'extract_data', 'search_url', 'go_to_next_page', 'detail_fetcher', 'tab_detail',
+    'detail_fields', 'optional_fields',
+])
+
+
+def open_detail_pool(site, driver, browser, detail_workers, detail_cache):
+    """
+    Pool detail sesuai DETAIL_ENGINE: TabDetailPool di browser driver utama, atau
+    DetailPool (satu browser per worker) jika mesin tab tidak bisa tersambung.
+    None jika detail_workers 0 (detail dibuka di tab baru oleh extract_data).
+    """
+    if detail_workers <= 0:
+        return None
+    if DETAIL_ENGINE == 'tabs':
+        script, parse_fn, args = site.tab_detail
+        try:
+            return TabDetailPool(driver, script, parse_fn, args,
+                                 tabs=DETAIL_TABS, blocked_urls=profile_blocked_patterns(browser),
+                                 cache=detail_cache, cache_fields=site.detail_fields)
+        except Exception as e:
+            print(f"Mesin tab detail tidak tersedia ({e.__class__.__name__}), memakai worker browser.")
+            metrics.count('fallback', 'detail_tabs')
+    return DetailPool(site.detail_fetcher(), size=detail_workers,
+                      driver_factory=partial(site.create_driver, browser),
+                      implicit_wait=0 if ZERO_IMPLICIT_WAIT else IMPLICIT_WAIT,
+                      cache=detail_cache, cache_fields=site.detail_fields,
+                      slot=f'{site.name}-{browser}-detail')
+
+
+def scrape_keyword(site, keywords, pages, checkpoint, start_page=1, browser=BROWSER_PROFILE,
+                   detail_workers=DETAIL_WORKERS):
+    """
+    Menjalankan scraping satu keyword di satu platform dengan driver sendiri:
+    mencari keyword, lalu mengambil halaman start_page sampai pages. Setiap
+    halaman yang selesai langsung ditulis ke checkpoint. Dengan PAGINATION 'url'
+    setiap halaman dibuka langsung lewat site.search_url, jadi start_page..pages
+    boleh hanya satu halaman (shard per halaman).
+
+    Parameter:
+        site (KeywordSite): Bagian khusus platform.
+        keywords (str): Kata kunci pencarian.
+        pages (int): Jumlah halaman hasil pencarian yang diambil.
+        checkpoint (Checkpoint): Tujuan penulisan baris hasil.
+        start_page (int): Halaman pertama yang diambil (untuk --resume).
+        browser (str): Profil browser untuk driver utama dan worker detail.
+        detail_workers (int): Jumlah worker browser detail (0 = tab baru sekuensial);
+            dengan DETAIL_ENGINE 'tabs' cukup > 0 untuk mengaktifkan mesin tab.
+
+    Return:
+        dict: Ringkasan run (pages, rows, seconds).
+    """
+    start_time = time.time()
+    pages_done = 0
+    rows = 0
+
+    # Driver utama dengan profil persisten; tidak di-recycle di tengah keyword
+    # karena posisi halaman hasil pencarian akan hilang
+    main_driver = ManagedDriver(partial(site.create_driver, browser), f'{site.name}-{browser}')
+    driver = main_driver.checkout()
+    driver.implicitly_wait(IMPLICIT_WAIT)
+    if PAGINATION == 'click':
+        driver.get(site.home_url)
+        search = driver.find_element(By.XPATH, site.search_xpath)
+        search.send_keys(keywords)
+        search.send_keys(Keys.ENTER)
+
+    missing_fields = MissingFieldCounter(site.optional_fields, IMPLICIT_WAIT)
+    product_index = ProductIndex() if SKIP_DUPLICATES else None
+    if product_index is not None and start_page > 1:
+        product_index.update_from_rows(iter_jsonl(checkpoint.rows_path))
+    detail_cache = DetailCache() if USE_DETAIL_CACHE else None
+    detail_pool = open_detail_pool(site, driver, browser, detail_workers, detail_cache)
+
+    # Lewati halaman yang sudah tersimpan di checkpoint (mode 'url' langsung
+    # membuka start_page)
+    if PAGINATION == 'click' and start_page <= pages:
+        for _ in range(start_page - 1):
+            site.scrolling(driver)
+            if not site.go_to_next_page(driver):
+                print("Tidak dapat mencapai halaman lanjutan dari checkpoint.")
+                start_page = pages + 1
+                break
+
+    for page in range(start_page, pages + 1):
+        print(f"\n--- Halaman {page} ---")
+        if PAGINATION == 'url':
+            with metrics.phase('next_page'):
+                driver.get(site.search_url(keywords, page))
+        page_data = []
+        if product_index is not None:
+            product_index.start_page(page)
+        try:
+            with metrics.phase('extract_page'):
+                futures = site.extract_data(driver, page_data, detail_pool, missing_fields=missing_fields,
+                                            detail_cache=detail_cache, product_index=product_index)
+        except TimeoutException:
+            # Mode 'url': halaman di luar jumlah hasil pencarian tidak berisi kartu
+            if PAGINATION != 'url':
+                raise
+            print(f"Halaman {page} tidak berisi produk, pencarian selesai.")
+            metrics.count('skip', 'page')
+            break
+        if product_index is not None:
+            print(product_index.page_summary())
+
+        # Baris halaman ini ditulis ke checkpoint setelah semua detailnya selesai
+        last_link = page_data[-1]['details_link'] if page_data else None
+        checkpoint.stage_page(page_data, futures, keyword=keywords, pages=pages,
+                              page=page, last_link=last_link)
+        checkpoint.flush()
+        pages_done += 1
+        main_driver.page_done()
+        rows += len(page_data)
+
+        if PAGINATION == 'click':
+            with metrics.phase('next_page'):
+                moved = site.go_to_next_page(driver)
+            if not moved:
+                break
+
+    if detail_pool is not None:
+        print(f"Menunggu {detail_pool.pending()} halaman detail yang tersisa...")
+        detail_pool.close()
+    checkpoint.flush(wait=True)
+    main_driver.quit()
+    print(missing_fields.summary())
+    if product_index is not None:
+        print(product_index.summary())
+    if detail_cache is not None:
+        print(detail_cache.summary())
+        detail_cache.close()
+
+    return {'pages': pages_done, 'rows': rows, 'seconds': round(time.time() - start_time, 1)}
+
+
+def run_cli(site, detail_workers=DETAIL_WORKERS):
+    """
+    main() scraper keyword: membaca keyword dan jumlah halaman dari input (atau
+    dari checkpoint dengan --resume), menjalankan scrape_keyword, lalu membangun
+    file output, menyimpan riwayat dan metrik run.
+    """
+    parser = argparse.ArgumentParser(description=f"Scraper produk {site.label} berdasarkan keyword.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Lanjutkan run terakhir dari checkpoint.")
+    add_browser_arguments(parser, BROWSER_PROFILE)
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    formats = output_formats(args)
+
+    checkpoint = Checkpoint(site.label)
+    state = checkpoint.load_state() if args.resume else {}
+    if args.resume and not state:
+        print("Checkpoint tidak ditemukan, memulai dari awal.")
+
+    if state:
+        keywords, pages = state['keyword'], state['pages']
+        start_page = state['page'] + 1
+        print(f"Melanjutkan '{keywords}' dari halaman {start_page} (link terakhir: {state.get('last_link')})")
+    else:
+        checkpoint.reset()
+        keywords = input("Keywords: ")
+        pages = int(input("Pages: "))
+        start_page = 1
+
+    scrape_keyword(site, keywords, pages, checkpoint, start_page, args.browser, detail_workers)
+
+    now = datetime.datetime.today().strftime('%d-%m-%Y')
+    transform = normalize_dataframe if NORMALIZE_OUTPUT else None
+    written = export_jsonl(checkpoint.rows_path, f'{site.output_name}_{now}', formats, transform)
+    print(f"\nScraping selesai. File disimpan sebagai {', '.join(written)}")
+    if RECORD_HISTORY:
+        history = HistoryStore()
+        count = history.ingest_jsonl(checkpoint.rows_path, site.name, keywords)
+        history.close()
+        print(f"{count} snapshot disimpan ke riwayat {history.path}")
+
+    # Ringkasan durasi per fase dan penghitung retry/timeout/skip
+    print(metrics.format_summary())
+    json_path, prom_path = metrics.write(site.label)
+    print(f"Metrik disimpan ke {json_path} dan {prom_path}")
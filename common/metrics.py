@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import math
+import threading
+from contextlib import contextmanager
+
+# Batas atas bucket histogram durasi (detik), mengikuti gaya bucket Prometheus
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, math.inf)
+
+# Folder default hasil metrik (relatif terhadap folder kerja scraper)
+DEFAULT_METRICS_DIR = 'metrics'
+
+
+class PhaseHistogram:
+    """
+    Histogram durasi satu fase: jumlah per bucket, total, min dan max.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        for index, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[index] += 1
+                break
+
+    def quantile(self, q):
+        """
+        Perkiraan kuantil dari bucket (batas atas bucket tempat kuantil jatuh,
+        dibatasi nilai max yang teramati).
+        """
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_seconds': round(self.total, 3),
+            'mean_seconds': round(self.total / self.count, 4) if self.count else None,
+            'min_seconds': round(self.min, 4) if self.min is not None else None,
+            'max_seconds': round(self.max, 4) if self.max is not None else None,
+            'p50_seconds': self.quantile(0.5),
+            'p95_seconds': self.quantile(0.95),
+            'buckets': {
+                ('+Inf' if math.isinf(bound) else str(bound)): count
+                for bound, count in zip(self.buckets, self.counts)
+            },
+        }
+
+
+class RunMetrics:
+    """
+    Pencatat metrik run scraping: histogram durasi per fase (scroll, tunggu list,
+    buka tab detail, hover, ekspor, ...) dan penghitung kejadian per fase
+    (retry, timeout, skip, error). Aman dipakai dari beberapa thread.
+
+    Contoh:
+        with metrics.phase('scroll'):
+            scrolling(driver)
+        metrics.count('retry', 'list_wait')
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.phases = {}
+            self.events = {}
+            self.drivers = []
+            self.stages = []
+            self.started_at = time.time()
+
+    def observe(self, phase, seconds):
+        with self._lock:
+            histogram = self.phases.get(phase)
+            if histogram is None:
+                histogram = self.phases[phase] = PhaseHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Mengukur durasi blok kode sebagai satu observasi fase `name`. Durasi tetap
+        dicatat walaupun blok melempar exception.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def count(self, event, phase='run', amount=1):
+        """
+        Menambah penghitung kejadian (mis. 'retry', 'timeout', 'skip', 'error') untuk fase.
+        """
+        if amount <= 0:
+            return
+        with self._lock:
+            key = (event, phase)
+            self.events[key] = self.events.get(key, 0) + amount
+
+    def record_driver(self, slot, generation, startup_seconds, pages, peak_rss_bytes, reason):
+        """
+        Mencatat satu driver yang sudah ditutup (lihat common/driver_pool.py):
+        waktu start-up, jumlah halaman, peak RSS Chrome dan alasan ditutup.
+        """
+        with self._lock:
+            self.drivers.append({
+                'slot': slot,
+                'generation': generation,
+                'startup_seconds': round(startup_seconds, 3) if startup_seconds is not None else None,
+                'pages': pages,
+                'peak_rss_bytes': peak_rss_bytes,
+                'reason': reason,
+            })
+
+    def record_stage(self, stage, items, busy_seconds, utilization, max_queue_depth):
+        """
+        Mencatat ringkasan satu tahap pipeline (lihat common/pipeline.py): jumlah
+        item, waktu sibuk, utilisasi (%) dan kedalaman maksimum antrean keluarnya.
+        """
+        with self._lock:
+            self.stages.append({
+                'stage': stage,
+                'items': items,
+                'busy_seconds': round(busy_seconds, 3),
+                'utilization_percent': round(utilization, 1),
+                'max_queue_depth': max_queue_depth,
+            })
+
+    def summary(self):
+        """
+        Ringkasan metrik dalam bentuk dict (siap ditulis sebagai JSON).
+        """
+        with self._lock:
+            return {
+                'started_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started_at)),
+                'wall_seconds': round(time.time() - self.started_at, 1),
+                'phases': {name: h.to_dict() for name, h in sorted(self.phases.items())},
+                'events': [
+                    {'event': event, 'phase': phase, 'count': count}
+                    for (event, phase), count in sorted(self.events.items())
+                ],
+                'drivers': list(self.drivers),
+                'stages': list(self.stages),
+            }
+
+    def to_prometheus(self, scraper):
+        """
+        Metrik dalam format teks eksposisi Prometheus (untuk node_exporter textfile
+        collector atau pushgateway).
+        """
+        lines = [
+            '# HELP scraper_phase_seconds Durasi fase scraping.',
+            '# TYPE scraper_phase_seconds histogram',
+        ]
+        with self._lock:
+            for name, histogram in sorted(self.phases.items()):
+                labels = f'scraper="{scraper}",phase="{name}"'
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if math.isinf(bound) else repr(float(bound))
+                    lines.append(f'scraper_phase_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'scraper_phase_seconds_sum{{{labels}}} {histogram.total:.6f}')
+                lines.append(f'scraper_phase_seconds_count{{{labels}}} {histogram.count}')
+            lines += [
+                '# HELP scraper_events_total Jumlah retry, timeout, skip dan error per fase.',
+                '# TYPE scraper_events_total counter',
+            ]
+            for (event, phase), count in sorted(self.events.items()):
+                lines.append(
+                    f'scraper_events_total{{scraper="{scraper}",event="{event}",phase="{phase}"}} {count}'
+                )
+            if self.drivers:
+                for metric, field, help_text in (
+                    ('scraper_driver_startup_seconds', 'startup_seconds', 'Waktu start-up per driver.'),
+                    ('scraper_driver_peak_rss_bytes', 'peak_rss_bytes', 'Peak RSS proses Chrome per driver.'),
+                ):
+                    lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+                    for driver in self.drivers:
+                        if driver[field] is not None:
+                            labels = (f'scraper="{scraper}",slot="{driver["slot"]}",'
+                                      f'generation="{driver["generation"]}"')
+                            lines.append(f'{metric}{{{labels}}} {driver[field]}')
+            if self.stages:
+                for metric, field, help_text in (
+                    ('scraper_stage_utilization_percent', 'utilization_percent',
+                     'Persentase waktu sibuk tahap pipeline.'),
+                    ('scraper_stage_max_queue_depth', 'max_queue_depth',
+                     'Kedalaman maksimum antrean keluar tahap pipeline.'),
+                ):
+                    lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} gauge']
+                    for stage in self.stages:
+                        if stage[field] is not None:
+                            lines.append(f'{metric}{{scraper="{scraper}",stage="{stage["stage"]}"}} {stage[field]}')
+        return "\n".join(lines) + "\n"
+
+    def format_summary(self):
+        """
+        Tabel ringkas per fase untuk dicetak di akhir run.
+        """
+        data = self.summary()
+        lines = [f"{'fase':<20} {'n':>6} {'total(s)':>10} {'rata2(s)':>9} {'p95(s)':>8} {'max(s)':>8}"]
+        for name, phase in data['phases'].items():
+            lines.append(f"{name:<20} {phase['count']:>6} {phase['total_seconds']:>10.2f} "
+                         f"{phase['mean_seconds']:>9.3f} {phase['p95_seconds']:>8.2f} {phase['max_seconds']:>8.2f}")
+        for event in data['events']:
+            lines.append(f"{event['event']} [{event['phase']}]: {event['count']}")
+        for driver in data['drivers']:
+            peak = f"{driver['peak_rss_bytes'] / (1024 * 1024):.0f} MB" if driver['peak_rss_bytes'] else '-'
+            startup = f"{driver['startup_seconds']:.2f}s" if driver['startup_seconds'] is not None else '-'
+            lines.append(f"driver {driver['slot']} #{driver['generation']}: start-up {startup}, "
+                         f"{driver['pages']} halaman, peak RSS {peak} ({driver['reason']})")
+        for stage in data['stages']:
+            depth = stage['max_queue_depth'] if stage['max_queue_depth'] is not None else '-'
+            lines.append(f"tahap {stage['stage']}: {stage['items']} item, sibuk {stage['busy_seconds']:.1f}s "
+                         f"({stage['utilization_percent']:.0f}%), antrean max {depth}")
+        return "\n".join(lines)
+
+    def write(self, scraper, directory=DEFAULT_METRICS_DIR):
+        """
+        Menulis ringkasan JSON dan file teks Prometheus untuk run ini.
+
+        Return:
+            tuple: (lokasi file JSON, lokasi file .prom).
+        """
+        os.makedirs(directory, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        json_path = os.path.join(directory, f'{scraper}_{stamp}.json')
+        prom_path = os.path.join(directory, f'{scraper}_{stamp}.prom')
+        with open(json_path, 'w') as file:
+            json.dump({'scraper': scraper, **self.summary()}, file, indent=2)
+        with open(prom_path, 'w') as file:
+            file.write(self.to_prometheus(scraper))
+        return json_path, prom_path
+
+
+# Instance bersama untuk satu proses scraper
+metrics = RunMetrics()
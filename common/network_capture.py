@@ -0,0 +1,98 @@
+import re
+import json
+import time
+import base64
+
+from selenium.common.exceptions import WebDriverException
+
+# Ukuran buffer body response di Chrome. Body yang sudah dibuang dari buffer
+# tidak bisa diambil lagi lewat Network.getResponseBody.
+MAX_RESOURCE_BUFFER = 10 * 1024 * 1024
+MAX_TOTAL_BUFFER = 50 * 1024 * 1024
+
+# Interval polling log performa saat menunggu response (detik)
+POLL_INTERVAL = 0.1
+
+
+def enable_network_capture(driver):
+    """
+    Mengaktifkan domain Network CDP dengan buffer body yang cukup besar.
+    Driver harus dibuat dengan build_driver(..., performance_log=True).
+    """
+    driver.execute_cdp_cmd('Network.enable', {
+        'maxResourceBufferSize': MAX_RESOURCE_BUFFER,
+        'maxTotalBufferSize': MAX_TOTAL_BUFFER,
+    })
+
+
+class NetworkCapture:
+    """
+    Membaca body response XHR/fetch yang URL-nya cocok dengan pola, dari log
+    performa Chrome (event Network.responseReceived + Network.loadingFinished)
+    dan Network.getResponseBody. Data diambil dari JSON yang memang sudah diminta
+    halaman, tanpa membaca DOM.
+
+    Parameter:
+        driver (webdriver): Chrome WebDriver dengan performance_log=True.
+        url_pattern (str): Regex URL response yang diambil (mis. 'graphql/productReviewList').
+    """
+
+    def __init__(self, driver, url_pattern):
+        self.driver = driver
+        self.url_pattern = re.compile(url_pattern)
+        self._matched = {}
+        enable_network_capture(driver)
+
+    def clear(self):
+        """
+        Membuang log performa yang belum dibaca (mis. sebelum membuka halaman baru).
+        """
+        self.driver.get_log('performance')
+        self._matched.clear()
+
+    def poll(self):
+        """
+        Membaca log performa sejak panggilan terakhir.
+
+        Return:
+            list: Tuple (url, body) response cocok yang sudah selesai dimuat.
+        """
+        finished = []
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method = message.get('method')
+            params = message.get('params', {})
+            if method == 'Network.responseReceived':
+                url = params['response']['url']
+                if self.url_pattern.search(url):
+                    self._matched[params['requestId']] = url
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._matched:
+                finished.append(params['requestId'])
+
+        bodies = []
+        for request_id in finished:
+            url = self._matched.pop(request_id)
+            try:
+                result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+            except WebDriverException:
+                continue
+            body = result.get('body', '')
+            if result.get('base64Encoded'):
+                body = base64.b64decode(body).decode('utf-8', errors='replace')
+            bodies.append((url, body))
+        return bodies
+
+    def wait_for(self, timeout=10, count=1):
+        """
+        Menunggu sampai minimal `count` response cocok selesai dimuat.
+
+        Return:
+            list: Tuple (url, body); bisa kurang dari count jika timeout.
+        """
+        deadline = time.monotonic() + timeout
+        bodies = []
+        while True:
+            bodies += self.poll()
+            if len(bodies) >= count or time.monotonic() >= deadline:
+                return bodies
+            time.sleep(POLL_INTERVAL)
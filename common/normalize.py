@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from common.output import add_output_arguments, output_formats, export_dataframe
+
+# Pengali untuk akhiran angka singkat yang dipakai Tokopedia, Lazada dan Shopee
+# ('1rb+', '1,5rb', '1.2K', '2jt', '10RB+')
+SUFFIX_MULTIPLIERS = {
+    'rb': 1_000, 'ribu': 1_000, 'k': 1_000,
+    'jt': 1_000_000, 'juta': 1_000_000, 'm': 1_000_000,
+}
+
+# Angka (dengan pemisah ribuan/desimal '.' atau ',') diikuti akhiran opsional
+NUMBER_PATTERN = r'(?P<number>\d+(?:[.,]\d+)*)\s*(?P<suffix>ribu|rb|juta|jt|k|m)?(?![a-z])'
+PERCENT_PATTERN = r'(\d+(?:[.,]\d+)?)\s*%'
+DECIMAL_PATTERN = r'(\d+(?:[.,]\d+)?)'
+
+# Parser per nama kolom output scraper
+PRICE_COLUMNS = ('price', 'original_price', 'discounted_price')
+SOLD_COLUMNS = ('sold', 'sales')
+DISCOUNT_COLUMNS = ('discount',)
+RATING_COLUMNS = ('rating',)
+
+# Folder data mentah dan folder hasil reprocess default
+DEFAULT_DATA_DIR = 'data'
+DEFAULT_OUTPUT_DIR = 'data_clean'
+
+
+def parse_count(series):
+    """
+    Mengubah teks angka gaya marketplace menjadi bilangan bulat (Int64), secara
+    vektor tanpa loop per baris. Dipakai untuk harga dan jumlah terjual:
+        'Rp64.900' -> 64900, '452 Terjual' -> 452, '1rb+ terjual' -> 1000,
+        '1,5rb' -> 1500, '10rb+' -> 10000, '1.2K Terjual' -> 1200, '2jt' -> 2000000
+
+    Tanpa akhiran, '.' dan ',' dianggap pemisah ribuan; dengan akhiran (rb/jt/k),
+    keduanya dianggap pemisah desimal. Tanda '+' diabaikan sehingga nilainya
+    adalah batas bawah. Nilai yang tidak mengandung angka menjadi <NA>.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.round().astype('Int64')
+    text = series.astype('string').str.lower()
+    # Sen di belakang koma (mis. 'Rp64.900,00') tidak dipakai di harga Rupiah
+    text = text.str.replace(r',\d{2}(?!\d)(?=\s*$)', '', regex=True)
+    parts = text.str.extract(NUMBER_PATTERN)
+    suffix = parts['suffix']
+    has_suffix = suffix.notna().to_numpy()
+
+    plain = pd.to_numeric(parts['number'].str.replace(r'[.,]', '', regex=True), errors='coerce')
+    decimal = pd.to_numeric(parts['number'].str.replace(',', '.', regex=False), errors='coerce')
+    multiplier = suffix.map(SUFFIX_MULTIPLIERS).astype('float64').fillna(1)
+
+    values = np.where(has_suffix, decimal.astype('float64') * multiplier, plain.astype('float64'))
+    return pd.Series(values, index=series.index).round().astype('Int64')
+
+
+def parse_percent(series):
+    """
+    Mengubah teks diskon ('20%', '-20%', '12,5%') menjadi persen (Float64).
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.abs().astype('Float64')
+    number = series.astype('string').str.extract(PERCENT_PATTERN, expand=False)
+    return pd.to_numeric(number.str.replace(',', '.', regex=False), errors='coerce').astype('Float64')
+
+
+def parse_rating(series):
+    """
+    Mengubah teks rating ('4.9', '4,9', '4.9 (120)') menjadi Float64.
+    """
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype('Float64')
+    number = series.astype('string').str.extract(DECIMAL_PATTERN, expand=False)
+    return pd.to_numeric(number.str.replace(',', '.', regex=False), errors='coerce').astype('Float64')
+
+
+def column_parsers():
+    """
+    Pemetaan nama kolom -> fungsi parser.
+    """
+    parsers = {}
+    parsers.update(dict.fromkeys(PRICE_COLUMNS, parse_count))
+    parsers.update(dict.fromkeys(SOLD_COLUMNS, parse_count))
+    parsers.update(dict.fromkeys(DISCOUNT_COLUMNS, parse_percent))
+    parsers.update(dict.fromkeys(RATING_COLUMNS, parse_rating))
+    return parsers
+
+
+def normalize_dataframe(df):
+    """
+    Mengubah kolom harga, harga asli, diskon, terjual dan rating menjadi kolom
+    numerik (nama kolom tetap). Kolom lain tidak diubah.
+
+    Return:
+        DataFrame: Salinan df dengan kolom numerik.
+    """
+    df = df.copy()
+    for column, parser in column_parsers().items():
+        if column in df.columns:
+            df[column] = parser(df[column])
+    return df
+
+
+def find_data_files(paths):
+    """
+    Mencari file CSV/XLSX di daftar folder/file. File .xlsx dilewati jika ada
+    .csv dengan nama yang sama (isinya sama, CSV jauh lebih cepat dibaca).
+    """
+    files = []
+    for path in paths:
+        if os.path.isfile(path):
+            files.append(path)
+            continue
+        for folder, _, names in os.walk(path):
+            for name in sorted(names):
+                stem, ext = os.path.splitext(name)
+                if ext == '.csv' or (ext == '.xlsx' and f'{stem}.csv' not in names):
+                    files.append(os.path.join(folder, name))
+    return files
+
+
+def read_data_file(path):
+    if path.endswith('.xlsx'):
+        return pd.read_excel(path)
+    return pd.read_csv(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Normalisasi ulang harga/diskon/terjual/rating hasil scraping yang sudah ada."
+    )
+    parser.add_argument('paths', nargs='*', default=[DEFAULT_DATA_DIR],
+                        help=f"Folder atau file CSV/XLSX (default: {DEFAULT_DATA_DIR}/).")
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                        help=f"Folder hasil, struktur subfolder dipertahankan (default: {DEFAULT_OUTPUT_DIR}/).")
+    add_output_arguments(parser, default='csv')
+    args = parser.parse_args()
+    formats = output_formats(args)
+
+    files = find_data_files(args.paths)
+    if not files:
+        sys.exit("Tidak ada file CSV/XLSX yang ditemukan.")
+    root = os.path.commonpath([p if os.path.isdir(p) else os.path.dirname(p) or '.' for p in args.paths])
+
+    total_rows = 0
+    read_seconds = 0.0
+    normalize_seconds = 0.0
+    for path in files:
+        start = time.perf_counter()
+        df = read_data_file(path)
+        read_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = normalize_dataframe(df)
+        normalize_seconds += time.perf_counter() - start
+        total_rows += len(df)
+
+        basename = os.path.join(args.output_dir, os.path.relpath(os.path.splitext(path)[0], root))
+        os.makedirs(os.path.dirname(basename), exist_ok=True)
+        written = export_dataframe(df, basename, formats)
+        print(f"{path}: {len(df)} baris -> {', '.join(written)}")
+
+    rate = total_rows / normalize_seconds if normalize_seconds else 0
+    print(f"\n{total_rows} baris dari {len(files)} file; baca {read_seconds:.2f} detik, "
+          f"normalisasi {normalize_seconds:.3f} detik ({rate:,.0f} baris/detik).")
+
+
+if __name__ == "__main__":
+    main()
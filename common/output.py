@@ -0,0 +1,262 @@
+import os
+import re
+import csv
+import json
+
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+from common.metrics import metrics
+
+# Format output yang didukung oleh export_jsonl/export_dataframe
+SUPPORTED_FORMATS = ('csv', 'xlsx', 'parquet')
+DEFAULT_FORMATS = 'csv,xlsx'
+
+# Jumlah baris JSONL per potongan DataFrame saat ekspor memakai transform
+EXPORT_CHUNK_ROWS = 5000
+
+# Karakter yang tidak boleh ada di nama sheet Excel
+INVALID_SHEET_CHARS = re.compile(r'[\[\]\:\*\?\/\\]')
+
+
+def add_output_arguments(parser, default=DEFAULT_FORMATS):
+    """
+    Menambahkan opsi output standar ke argparse parser milik main().
+    """
+    parser.add_argument('--format', default=default,
+                        help=f"Format output dipisah koma: csv, xlsx, parquet (default: {default}).")
+    parser.add_argument('--no-excel', action='store_true',
+                        help="Jangan tulis file Excel (paling lambat untuk data besar).")
+
+
+def output_formats(args):
+    """
+    Membaca daftar format output dari argumen hasil add_output_arguments.
+    """
+    formats = [f.strip().lower() for f in args.format.split(',') if f.strip()]
+    unknown = [f for f in formats if f not in SUPPORTED_FORMATS]
+    if unknown:
+        raise ValueError(f"Format output tidak dikenal: {', '.join(unknown)}")
+    if 'parquet' in formats:
+        # Ditolak sebelum scraping dimulai, bukan dilewati diam-diam saat ekspor
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Format parquet membutuhkan pyarrow (pip install pyarrow).")
+    if args.no_excel:
+        formats = [f for f in formats if f != 'xlsx']
+    return formats
+
+
+def iter_jsonl(path):
+    """
+    Membaca file JSONL baris per baris (memori konstan).
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def jsonl_columns(path):
+    """
+    Mengumpulkan nama kolom dari seluruh baris JSONL sesuai urutan kemunculan.
+    """
+    columns = {}
+    for row in iter_jsonl(path):
+        for key in row:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def iter_jsonl_frames(path, columns, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Membaca file JSONL sebagai potongan DataFrame berisi maks. chunk_rows baris.
+    """
+    rows = []
+    for row in iter_jsonl(path):
+        rows.append(row)
+        if len(rows) >= chunk_rows:
+            yield pd.DataFrame(rows, columns=columns)
+            rows = []
+    if rows:
+        yield pd.DataFrame(rows, columns=columns)
+
+
+def iter_transformed(path, columns, transform):
+    """
+    Menerapkan transform (fungsi DataFrame -> DataFrame, mis. normalize_dataframe)
+    per potongan JSONL lalu mengembalikan barisnya sebagai dict; <NA> menjadi None.
+    """
+    for frame in iter_jsonl_frames(path, columns):
+        frame = transform(frame)
+        yield from iter_records(frame.astype(object).where(frame.notna(), None))
+
+
+def _excel_value(value):
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    if value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    return value
+
+
+def safe_sheet_name(name, used):
+    """
+    Membuat nama sheet Excel yang valid (maks. 31 karakter) dan unik.
+    """
+    base = INVALID_SHEET_CHARS.sub('_', str(name)).strip() or 'Sheet'
+    base = base[:31]
+    candidate = base
+    index = 2
+    while candidate.lower() in used:
+        suffix = f"_{index}"
+        candidate = base[:31 - len(suffix)] + suffix
+        index += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def write_csv(rows, path, columns):
+    """
+    Menulis baris (iterable dict) ke CSV secara streaming.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=columns, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+
+
+def write_excel_sheets(sheets, path):
+    """
+    Menulis satu atau beberapa sheet dengan openpyxl write_only: setiap baris
+    langsung di-stream ke file sementara, jadi memori tetap konstan walaupun
+    jumlah baris/sheet besar.
+
+    Parameter:
+        sheets (iterable): Tuple (nama_sheet, kolom, iterable dict baris).
+        path (str): Lokasi file .xlsx.
+    """
+    workbook = Workbook(write_only=True)
+    used = set()
+    for name, columns, rows in sheets:
+        sheet = workbook.create_sheet(safe_sheet_name(name, used))
+        sheet.append(list(columns))
+        for row in rows:
+            sheet.append([_excel_value(row.get(column)) for column in columns])
+    if not used:
+        workbook.create_sheet('Sheet1')
+    workbook.save(path)
+
+
+def write_excel(rows, path, columns, sheet_name='Sheet1'):
+    """
+    Menulis baris ke satu sheet Excel secara streaming (write_only).
+    """
+    write_excel_sheets([(sheet_name, columns, rows)], path)
+
+
+def write_parquet(df, path, compression='zstd'):
+    """
+    Menulis DataFrame ke Parquet dengan tipe kolom hasil convert_dtypes()
+    (string/Int64/Float64/boolean) dan kompresi. Membutuhkan pyarrow.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        print("pyarrow belum terpasang (pip install pyarrow); output Parquet dilewati.")
+        return False
+    df.convert_dtypes().to_parquet(path, index=False, compression=compression)
+    return True
+
+
+def export_jsonl(jsonl_path, basename, formats, transform=None):
+    """
+    Membangun file output dari checkpoint JSONL. CSV dan Excel ditulis secara
+    streaming baris per baris; Parquet dibangun dari DataFrame.
+
+    Parameter:
+        transform (callable): Fungsi DataFrame -> DataFrame yang diterapkan
+            sebelum ditulis (mis. normalize_dataframe). Untuk CSV/Excel dijalankan
+            per potongan EXPORT_CHUNK_ROWS baris agar memori tetap kecil.
+
+    Return:
+        list: Lokasi file yang berhasil ditulis.
+    """
+    columns = jsonl_columns(jsonl_path)
+
+    def rows():
+        if transform is None:
+            return iter_jsonl(jsonl_path)
+        return iter_transformed(jsonl_path, columns, transform)
+
+    written = []
+    if 'csv' in formats:
+        with metrics.phase('export_csv'):
+            write_csv(rows(), f'{basename}.csv', columns)
+        written.append(f'{basename}.csv')
+    if 'xlsx' in formats:
+        with metrics.phase('export_xlsx'):
+            write_excel(rows(), f'{basename}.xlsx', columns)
+        written.append(f'{basename}.xlsx')
+    if 'parquet' in formats:
+        with metrics.phase('export_parquet'):
+            df = pd.DataFrame(list(iter_jsonl(jsonl_path)), columns=columns)
+            if transform is not None:
+                df = transform(df)
+            saved = write_parquet(df, f'{basename}.parquet')
+        if saved:
+            written.append(f'{basename}.parquet')
+    return written
+
+
+def iter_records(df):
+    """
+    Iterasi baris DataFrame sebagai dict tanpa membuat salinan seluruh data.
+    """
+    columns = list(df.columns)
+    for values in df.itertuples(index=False, name=None):
+        yield dict(zip(columns, values))
+
+
+def export_dataframe(df, basename, formats):
+    """
+    Menulis DataFrame yang sudah ada di memori ke format yang dipilih.
+
+    Return:
+        list: Lokasi file yang berhasil ditulis.
+    """
+    columns = list(df.columns)
+    written = []
+    if 'csv' in formats:
+        with metrics.phase('export_csv'):
+            df.to_csv(f'{basename}.csv', index=False)
+        written.append(f'{basename}.csv')
+    if 'xlsx' in formats:
+        with metrics.phase('export_xlsx'):
+            write_excel(iter_records(df), f'{basename}.xlsx', columns)
+        written.append(f'{basename}.xlsx')
+    if 'parquet' in formats:
+        with metrics.phase('export_parquet'):
+            saved = write_parquet(df, f'{basename}.parquet')
+        if saved:
+            written.append(f'{basename}.parquet')
+    return written
+
+
+def write_excel_per_group(df, path, group_column):
+    """
+    Menulis satu sheet per nilai group_column (mis. satu sheet per toko) secara
+    streaming, tanpa menyimpan seluruh sheet di memori.
+    """
+    columns = list(df.columns)
+    sheets = (
+        (name, columns, iter_records(group))
+        for name, group in df.groupby(group_column, sort=False)
+    )
+    with metrics.phase('export_xlsx_per_group'):
+        write_excel_sheets(sheets, path)
@@ -0,0 +1,128 @@
+import re
+import json
+
+from common.product_index import product_id
+
+# Membaca beberapa objek state global halaman sekaligus dalam satu panggilan
+# execute_script (mis. cache Apollo Tokopedia window.__cache, window.pageData
+# dan __moduleData__ Lazada). Jika tidak ada sebagai variabel global, dicari
+# <script id="nama"> berisi JSON (mis. __NEXT_DATA__). Objek yang tidak ada
+# bernilai null.
+#   arguments[0]: daftar nama objek state
+PAGE_STATE_JS = """
+var names = arguments[0], out = {};
+names.forEach(function (name) {
+    var value = window[name];
+    if (value === undefined) {
+        var script = document.getElementById(name);
+        if (script) {
+            try { value = JSON.parse(script.textContent); } catch (e) { value = undefined; }
+        }
+    }
+    out[name] = value === undefined ? null : value;
+});
+return JSON.stringify(out);
+"""
+
+
+def read_page_state(driver, names):
+    """
+    Mengambil objek state JSON halaman yang sedang terbuka dengan satu round trip.
+
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver.
+        names (iterable): Nama objek state, mis. ('__cache',).
+
+    Return:
+        dict: nama -> objek hasil json (None jika tidak ada di halaman).
+    """
+    raw = driver.execute_script(PAGE_STATE_JS, list(names))
+    return json.loads(raw) if raw else {}
+
+
+def parse_page_state(html, names):
+    """
+    Versi tanpa browser dari read_page_state: mencari 'nama = {...}' di script
+    inline atau <script id="nama"> di HTML (page_source, fixture, respon HTTP).
+    """
+    decoder = json.JSONDecoder()
+    state = {}
+    for name in names:
+        value = None
+        for match in re.finditer(rf'\b{re.escape(name)}\s*=\s*(?=[{{\[])', html):
+            try:
+                value, _ = decoder.raw_decode(html, match.end())
+                break
+            except ValueError:
+                continue
+        if value is None:
+            match = re.search(rf'<script[^>]*\bid="{re.escape(name)}"[^>]*>(.*?)</script>', html, re.S)
+            if match:
+                try:
+                    value = json.loads(match.group(1))
+                except ValueError:
+                    pass
+        state[name] = value
+    return state
+
+
+def resolve(cache, value):
+    """
+    Mengikuti referensi cache Apollo ({'type': 'id', 'id': ...} atau {'__ref': ...})
+    ke entri yang dirujuk. Nilai lain dikembalikan apa adanya.
+    """
+    if isinstance(value, dict) and cache:
+        ref = value.get('__ref') or (value.get('id') if value.get('type') == 'id' else None)
+        if isinstance(ref, str) and ref in cache:
+            return cache[ref]
+    return value
+
+
+def dig(value, path, cache=None):
+    """
+    Nilai pada path bertitik, mis. 'data.root.fields.seller.name' atau
+    'mods.listItems.0.name'. Referensi Apollo diikuti jika cache diberikan.
+    Mengembalikan None jika salah satu bagian path tidak ada.
+    """
+    for key in path.split('.'):
+        value = resolve(cache, value)
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+        if value is None:
+            return None
+    return resolve(cache, value)
+
+
+def first_value(value, paths, cache=None):
+    """
+    Nilai pertama yang tidak kosong dari beberapa kandidat path (struktur state
+    berbeda antar versi halaman).
+    """
+    for path in paths:
+        found = dig(value, path, cache)
+        if found not in (None, ''):
+            return found
+    return None
+
+
+def match_visible(rows, links, link_field='details_link'):
+    """
+    Mengurutkan baris hasil state sesuai kartu yang terlihat di halaman
+    (berdasarkan product_id). Mengembalikan None jika ada kartu yang tidak ada di
+    state, mis. state SSR yang basi setelah navigasi client-side, sehingga
+    pemanggil kembali ke jalur DOM.
+    """
+    by_id = {}
+    for row in rows:
+        by_id.setdefault(product_id(row.get(link_field)), row)
+    ordered = []
+    for link in links:
+        row = by_id.get(product_id(link))
+        if row is None:
+            return None
+        ordered.append(dict(row))
+    return ordered
@@ -0,0 +1,196 @@
+import time
+import queue
+import threading
+
+from common.metrics import metrics
+
+# Kapasitas antrean di antara dua tahap. Tahap yang lebih cepat berhenti menunggu
+# jika antrean di depannya penuh, sehingga memori tetap terbatas.
+DEFAULT_QUEUE_SIZE = 3
+
+# Interval cetak status pipeline (detik)
+REPORT_INTERVAL = 15
+
+# Penanda akhir antrean
+_DONE = object()
+
+
+class Stage:
+    """
+    Satu tahap pipeline: satu thread yang menjalankan fn(item) untuk setiap item
+    dari antrean masuk dan meneruskan hasilnya ke tahap berikutnya. Hasil None
+    tidak diteruskan. Waktu sibuk (di dalam fn) dicatat untuk utilisasi; sisanya
+    adalah waktu menunggu antrean.
+
+    Parameter:
+        name (str): Nama tahap (juga nama fase di metrics, 'stage_<name>').
+        fn (callable): Fungsi pemroses satu item.
+        close (callable): Dipanggil sekali di thread tahap setelah item terakhir
+            (mis. menutup driver milik tahap). Opsional.
+    """
+
+    def __init__(self, name, fn, close=None):
+        self.name = name
+        self.fn = fn
+        self.close = close
+        self.items = 0
+        self.busy = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+    def utilization(self, now=None):
+        """
+        Persentase waktu tahap ini sibuk sejak mulai (0-100).
+        """
+        if self.started_at is None:
+            return 0.0
+        elapsed = (self.finished_at or now or time.monotonic()) - self.started_at
+        return 100 * self.busy / elapsed if elapsed > 0 else 0.0
+
+
+class Pipeline:
+    """
+    Pipeline bertahap dengan antrean terbatas: setiap tahap berjalan di thread
+    sendiri, sehingga tahap-tahap memproses item yang berbeda secara bersamaan
+    (mis. toko ke-3 di-scroll selagi deskripsi toko ke-2 diambil dan toko ke-1
+    ditulis). Urutan item dipertahankan karena setiap tahap satu thread.
+
+    Selama berjalan, kedalaman antrean dan utilisasi setiap tahap dicetak setiap
+    REPORT_INTERVAL detik. Jika satu tahap melempar exception, tahap itu dan
+    tahap sebelumnya berhenti memproses item baru, item yang sudah lewat tetap
+    diselesaikan tahap berikutnya, lalu run() melempar ulang exception tersebut.
+
+    Contoh:
+        pipeline = Pipeline([Stage('listing', load), Stage('detail', describe), Stage('sink', write)])
+        pipeline.run(shop_urls)
+        print(pipeline.report())
+
+    Parameter:
+        stages (list): Daftar Stage berurutan; hasil tahap terakhir dibuang.
+        queue_size (int): Kapasitas setiap antrean antar tahap.
+        report_interval (float): Interval cetak status (detik, 0 = tidak dicetak).
+    """
+
+    def __init__(self, stages, queue_size=DEFAULT_QUEUE_SIZE, report_interval=REPORT_INTERVAL):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.report_interval = report_interval
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages[1:]]
+        self.max_depth = [0] * len(self.queues)
+        self.error = None
+        self.failed_stage = None
+        self.seconds = None
+
+    def _put(self, index, item):
+        q = self.queues[index]
+        q.put(item)
+        self.max_depth[index] = max(self.max_depth[index], q.qsize())
+
+    def _run_stage(self, index, source):
+        stage = self.stages[index]
+        stage.started_at = time.monotonic()
+        try:
+            for item in source:
+                if self.failed_stage is not None and index <= self.failed_stage:
+                    # Tahap ini atau tahap sesudahnya sudah gagal: item baru tidak
+                    # diproses, antrean masuk tetap dikosongkan sampai akhir
+                    if index == 0:
+                        break
+                    continue
+                start = time.perf_counter()
+                try:
+                    result = stage.fn(item)
+                except Exception as e:
+                    print(f"Tahap {stage.name} gagal: {e.__class__.__name__}: {e}")
+                    metrics.count('error', f'stage_{stage.name}')
+                    if self.error is None:
+                        self.error = e
+                        self.failed_stage = index
+                    continue
+                finally:
+                    seconds = time.perf_counter() - start
+                    stage.busy += seconds
+                    metrics.observe(f'stage_{stage.name}', seconds)
+                stage.items += 1
+                if result is not None and index < len(self.queues):
+                    self._put(index, result)
+        finally:
+            if stage.close is not None:
+                try:
+                    stage.close()
+                except Exception as e:
+                    print(f"Gagal menutup tahap {stage.name}: {e.__class__.__name__}")
+            stage.finished_at = time.monotonic()
+            if index < len(self.queues):
+                self._put(index, _DONE)
+
+    def _incoming(self, index):
+        # Item dari antrean masuk tahap `index` sampai penanda akhir
+        q = self.queues[index - 1]
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            yield item
+
+    def status(self):
+        """
+        Satu baris status: item selesai dan utilisasi per tahap, serta isi antrean.
+        """
+        now = time.monotonic()
+        parts = []
+        for index, stage in enumerate(self.stages):
+            parts.append(f"{stage.name} {stage.items} (sibuk {stage.utilization(now):.0f}%)")
+            if index < len(self.queues):
+                parts.append(f"antrean {self.queues[index].qsize()}/{self.queue_size}")
+        return ' | '.join(parts)
+
+    def run(self, items):
+        """
+        Memproses seluruh item lewat semua tahap dan menunggu sampai selesai.
+
+        Return:
+            float: Durasi run (detik).
+        """
+        start = time.monotonic()
+        threads = [threading.Thread(target=self._run_stage, args=(0, iter(items)),
+                                    name=f'stage-{self.stages[0].name}')]
+        threads += [
+            threading.Thread(target=self._run_stage, args=(index, self._incoming(index)),
+                             name=f'stage-{stage.name}')
+            for index, stage in enumerate(self.stages) if index > 0
+        ]
+        for thread in threads:
+            thread.start()
+        last_report = time.monotonic()
+        while any(thread.is_alive() for thread in threads):
+            threads[-1].join(timeout=1)
+            if self.report_interval and time.monotonic() - last_report >= self.report_interval:
+                print(f"[pipeline {time.monotonic() - start:.0f}s] {self.status()}")
+                last_report = time.monotonic()
+        for thread in threads:
+            thread.join()
+        self.seconds = time.monotonic() - start
+
+        for index, stage in enumerate(self.stages):
+            metrics.record_stage(
+                stage.name, stage.items, stage.busy, stage.utilization(),
+                self.max_depth[index] if index < len(self.queues) else None,
+            )
+        if self.error is not None:
+            raise self.error
+        return self.seconds
+
+    def report(self):
+        """
+        Tabel ringkas per tahap setelah run(): jumlah item, waktu sibuk,
+        utilisasi dan kedalaman maksimum antrean keluarnya.
+        """
+        lines = [f"{'tahap':<12} {'item':>6} {'sibuk(s)':>9} {'utilisasi':>10} {'antrean max':>12}"]
+        for index, stage in enumerate(self.stages):
+            depth = f"{self.max_depth[index]}/{self.queue_size}" if index < len(self.queues) else '-'
+            lines.append(f"{stage.name:<12} {stage.items:>6} {stage.busy:>9.1f} "
+                         f"{stage.utilization():>9.0f}% {depth:>12}")
+        if self.seconds is not None:
+            lines.append(f"Total: {self.seconds:.1f} detik")
+        return "\n".join(lines)
@@ -0,0 +1,118 @@
+import re
+from collections import Counter
+from urllib.parse import urlsplit
+
+from common.detail_cache import canonical_url
+from common.metrics import metrics
+
+# Pola ID produk di URL per platform
+#   Lazada : /products/nama-produk-i8249122400-s123456.html -> item id 8249122400
+#   Shopee : /nama-produk-i.123456.7890123                  -> shop id + item id
+#            /product/123456/7890123
+LAZADA_ID_RE = re.compile(r'-i(\d+)(?:-s\d+)?\.html')
+SHOPEE_ID_RE = re.compile(r'-i\.(\d+)\.(\d+)')
+SHOPEE_PRODUCT_RE = re.compile(r'^/product/(\d+)/(\d+)')
+
+
+def product_id(url):
+    """
+    Membuat ID kanonik produk dari URL detail, sehingga link iklan/sponsor dan
+    link organik ke produk yang sama menghasilkan ID yang sama:
+        Lazada    -> 'lazada:8249122400'
+        Shopee    -> 'shopee:123456.7890123'
+        Tokopedia -> 'tokopedia:nama-toko/slug-produk' (link ta.tokopedia.com dibuka)
+    URL lain memakai URL kanonik tanpa query string.
+    """
+    if not url:
+        return None
+    url = canonical_url(url)
+    parts = urlsplit(url)
+    host = parts.netloc
+    if 'lazada' in host:
+        match = LAZADA_ID_RE.search(parts.path)
+        if match:
+            return f'lazada:{match.group(1)}'
+    elif 'shopee' in host:
+        match = SHOPEE_ID_RE.search(parts.path) or SHOPEE_PRODUCT_RE.search(parts.path)
+        if match:
+            return f'shopee:{match.group(1)}.{match.group(2)}'
+    elif host.endswith('tokopedia.com'):
+        segments = [s for s in parts.path.split('/') if s]
+        if len(segments) >= 2:
+            return f'tokopedia:{segments[0].lower()}/{segments[1].lower()}'
+    return url
+
+
+class ProductIndex:
+    """
+    Indeks ID produk yang sudah diambil selama satu run. Kartu sponsor/iklan
+    sering muncul lagi di halaman berikutnya; dengan indeks ini kartu yang sama
+    dilewati sebelum hover dan sebelum detail produknya dibuka.
+
+    Parameter:
+        link_field (str): Nama field URL detail pada baris produk.
+    """
+
+    def __init__(self, link_field='details_link'):
+        self.link_field = link_field
+        self.seen = set()
+        self.page = None
+        self.duplicates = Counter()
+
+    def start_page(self, page):
+        """
+        Menandai halaman yang sedang diproses (untuk laporan duplikat per halaman).
+        """
+        self.page = page
+        self.duplicates.setdefault(page, 0)
+
+    def update_from_rows(self, rows):
+        """
+        Mengisi indeks dari baris yang sudah tersimpan (mis. checkpoint saat --resume).
+        """
+        for row in rows:
+            pid = product_id(row.get(self.link_field))
+            if pid:
+                self.seen.add(pid)
+
+    def is_new(self, url):
+        """
+        True jika produk belum pernah diambil. Tidak mengubah indeks.
+        """
+        pid = product_id(url)
+        return pid is None or pid not in self.seen
+
+    def count_duplicate(self, amount=1):
+        self.duplicates[self.page] += amount
+        metrics.count('skip', 'duplicate', amount)
+
+    def filter_new(self, rows):
+        """
+        Mengembalikan baris yang produknya belum pernah diambil (termasuk duplikat
+        di halaman yang sama), lalu menandainya sebagai sudah diambil.
+        """
+        new_rows = []
+        skipped = 0
+        for row in rows:
+            pid = product_id(row.get(self.link_field))
+            if pid is not None and pid in self.seen:
+                skipped += 1
+                continue
+            if pid is not None:
+                self.seen.add(pid)
+            new_rows.append(row)
+        if skipped:
+            self.count_duplicate(skipped)
+        return new_rows
+
+    def page_summary(self, page=None):
+        page = self.page if page is None else page
+        return f"{self.duplicates[page]} produk duplikat dilewati di halaman {page}"
+
+    def summary(self):
+        """
+        Ringkasan jumlah produk unik dan duplikat yang dilewati per halaman.
+        """
+        total = sum(self.duplicates.values())
+        per_page = ", ".join(f"hal {page}: {count}" for page, count in sorted(self.duplicates.items()))
+        return f"Produk unik: {len(self.seen)}, duplikat dilewati: {total} ({per_page or '-'})"
@@ -0,0 +1,158 @@
+import time
+from collections import namedtuple
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import StaleElementReferenceException
+
+from common.metrics import metrics
+
+# Ringkasan satu kali adaptive_scroll: jumlah langkah scroll, durasi (detik),
+# jumlah kartu terakhir, dan apakah berhenti karena batas waktu.
+ScrollReport = namedtuple('ScrollReport', ['steps', 'seconds', 'count', 'timed_out'])
+
+# Satu langkah scroll dalam satu round trip (execute_async_script):
+# scroll satu layar, lalu tunggu dengan MutationObserver sampai jumlah kartu
+# bertambah atau batas waktu tunggu habis. Tunggu panjang (settle) hanya dipakai
+# di dasar halaman, tempat lazy-load memicu kartu baru.
+#   arguments: by, selector, rasio tinggi layar, step_ms, settle_ms, callback
+SCROLL_STEP_JS = """
+var by = arguments[0], selector = arguments[1], ratio = arguments[2],
+    stepMs = arguments[3], settleMs = arguments[4],
+    done = arguments[arguments.length - 1];
+
+function count() {
+    if (by === 'xpath') {
+        return document.evaluate(
+            'count(' + selector + ')', document, null, XPathResult.NUMBER_TYPE, null
+        ).numberValue;
+    }
+    return document.querySelectorAll(selector).length;
+}
+function atBottom() {
+    var height = Math.max(document.body.scrollHeight, document.documentElement.scrollHeight);
+    return window.innerHeight + window.scrollY >= height - 2;
+}
+
+var before = count();
+window.scrollBy(0, Math.max(window.innerHeight * ratio, 200));
+var finished = false, timer = null;
+var observer = new MutationObserver(function () {
+    if (count() > before) finish();
+});
+function finish() {
+    if (finished) return;
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    var now = count();
+    done([now, atBottom(), now > before]);
+}
+observer.observe(document.body, {childList: true, subtree: true});
+timer = setTimeout(finish, atBottom() ? settleMs : stepMs);
+"""
+
+
+def adaptive_scroll(driver, locator, max_time=20.0, step_ratio=0.9,
+                    step_wait=0.15, settle_wait=1.5, stable_rounds=2):
+    """
+    Scroll ke bawah halaman secara adaptif sampai jumlah kartu (produk/review)
+    tidak bertambah lagi, menggantikan loop scroll dengan sleep tetap.
+
+    Proses:
+      1. Scroll satu layar dan tunggu sebentar (step_wait) di tengah halaman.
+      2. Di dasar halaman, tunggu hingga settle_wait detik sampai kartu baru muncul.
+      3. Berhenti jika di dasar halaman jumlah kartu tetap selama stable_rounds
+         langkah berturut-turut, atau jika max_time terlampaui.
+
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver.
+        locator (tuple): (By.XPATH, ...) atau (By.CSS_SELECTOR, ...) kartu yang dihitung.
+        max_time (float): Batas waktu total scroll (detik).
+        step_ratio (float): Besar satu langkah scroll relatif terhadap tinggi layar.
+        step_wait (float): Waktu tunggu per langkah di tengah halaman (detik).
+        settle_wait (float): Waktu tunggu lazy-load di dasar halaman (detik).
+        stable_rounds (int): Jumlah langkah tanpa pertambahan sebelum berhenti.
+
+    Return:
+        ScrollReport: jumlah langkah, durasi, jumlah kartu, dan status timeout.
+    """
+    by, selector = locator
+    by = 'xpath' if by == By.XPATH else 'css'
+    driver.set_script_timeout(max(30, settle_wait * 4))
+
+    start = time.monotonic()
+    steps = 0
+    stable = 0
+    count = 0
+    timed_out = False
+    while True:
+        count, bottom, grew = driver.execute_async_script(
+            SCROLL_STEP_JS, by, selector, step_ratio,
+            int(step_wait * 1000), int(settle_wait * 1000)
+        )
+        steps += 1
+        if grew:
+            stable = 0
+        elif bottom:
+            stable += 1
+        if bottom and stable >= stable_rounds:
+            break
+        if time.monotonic() - start >= max_time:
+            timed_out = True
+            break
+    seconds = time.monotonic() - start
+    metrics.observe('scroll', seconds)
+    if timed_out:
+        metrics.count('timeout', 'scroll')
+    return ScrollReport(steps, round(seconds, 2), int(count), timed_out)
+
+
+def format_report(report):
+    """
+    Format ScrollReport menjadi satu baris log.
+    """
+    status = " (batas waktu)" if report.timed_out else ""
+    return (f"Scroll: {report.steps} langkah, {report.seconds:.1f} detik, "
+            f"{report.count} kartu{status}")
+
+
+def wait_for_replacement(driver, locator, click, timeout=10):
+    """
+    Klik paginasi lalu menunggu daftar kartu diganti: elemen pertama daftar lama
+    menjadi stale (dibuang dari DOM) atau teksnya berubah (node dipakai ulang),
+    lalu kartu baru ada di halaman. Elemen dan teks pembanding diambil sebelum
+    klik, sehingga node yang sudah berganti isi saat fungsi ini berjalan tidak
+    menjadi pembanding baru. Pengganti scroll ulang + sleep tetap setelah klik.
+
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver.
+        locator (tuple): Locator kartu, mis. (By.CSS_SELECTOR, 'article...').
+        click (callable): Melakukan klik paginasi (tanpa argumen).
+        timeout (float): Batas waktu tunggu (detik).
+
+    Return:
+        list: Elemen kartu di halaman baru.
+
+    Raises:
+        TimeoutException: Jika daftar tidak berganti dalam timeout.
+    """
+    elements = driver.find_elements(*locator)
+    element = elements[0] if elements else None
+    try:
+        old_text = element.text if element is not None else None
+    except StaleElementReferenceException:
+        old_text = None
+    click()
+
+    def replaced(_):
+        if old_text is None:
+            return True
+        try:
+            return element.text != old_text
+        except StaleElementReferenceException:
+            return True
+
+    wait = WebDriverWait(driver, timeout, poll_frequency=0.05)
+    wait.until(replaced)
+    return wait.until(lambda d: d.find_elements(*locator))
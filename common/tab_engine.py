@@ -0,0 +1,245 @@
+import json
+import math
+import time
+import threading
+import urllib.request
+from concurrent.futures import Future, wait as wait_futures
+
+import trio
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.common.bidi import cdp
+
+from common.metrics import metrics
+
+# Jumlah tab yang memuat halaman bersamaan di satu browser
+DEFAULT_TABS = 4
+
+# Batas waktu satu halaman di tab sampai field-nya terbaca (detik)
+TAB_TIMEOUT = 20
+
+# Interval polling script ekstraksi selama halaman dimuat (detik)
+POLL_INTERVAL = 0.25
+
+# Penanda di window dokumen yang sudah selesai dibaca. Page.navigate bisa kembali
+# sebelum dokumen lama diganti, jadi polling pada dokumen bertanda ini diabaikan.
+DONE_FLAG = '__tabEngineDone'
+
+
+def cdp_endpoint(driver):
+    """
+    URL WebSocket CDP level browser dan versi mayor Chrome dari sesi WebDriver
+    (debuggerAddress chromedriver, atau se:cdp pada Selenium Grid).
+
+    Return:
+        tuple: (ws_url, versi mayor) mis. ('ws://127.0.0.1:9222/devtools/browser/...', '120').
+    """
+    caps = driver.capabilities
+    if caps.get('se:cdp'):
+        return caps['se:cdp'], caps.get('se:cdpVersion', '').split('.')[0]
+    address = (caps.get('goog:chromeOptions') or {}).get('debuggerAddress')
+    if not address:
+        raise WebDriverException("Sesi WebDriver tidak menyediakan debuggerAddress CDP.")
+    with urllib.request.urlopen(f'http://{address}/json/version', timeout=5) as response:
+        info = json.load(response)
+    return info['webSocketDebuggerUrl'], info['Browser'].split('/')[-1].split('.')[0]
+
+
+def wrap_script(script, args=()):
+    """
+    Mengubah body fungsi gaya execute_script (memakai arguments[i]) menjadi
+    ekspresi Runtime.evaluate. Dokumen yang sudah selesai dibaca bernilai null.
+    """
+    return (f"window.{DONE_FLAG} ? null : "
+            f"(function () {{{script}}}).apply(null, {json.dumps(list(args))})")
+
+
+class TabEngine:
+    """
+    Memuat banyak halaman sekaligus sebagai tab di browser milik satu sesi
+    WebDriver, lewat koneksi CDP (trio, dependensi Selenium). Sejumlah `tabs`
+    tab dibuka di latar; setiap tab mengambil URL berikutnya dari antrean,
+    menavigasi, lalu menjalankan script ekstraksi berulang kali sampai
+    parse_fn menganggap halaman siap. Hasil tiap URL dikembalikan sebagai
+    Future yang selesai begitu tab-nya siap, tanpa menunggu tab lain.
+
+    Tab aktif WebDriver tidak disentuh, sehingga driver tetap bisa dipakai
+    (mis. halaman hasil pencarian) selama tab detail dimuat. Engine berjalan di
+    thread sendiri; seluruh method publik dipanggil dari kode sinkron biasa.
+
+    Contoh:
+        engine = TabEngine(driver, DETAIL_JS, parse_details, tabs=4)
+        engine.start()
+        results = engine.fetch_many(urls)
+        engine.close()
+
+    Parameter:
+        driver (webdriver): Chrome WebDriver yang browsernya dipakai.
+        script (str): Body fungsi JS gaya execute_script yang membaca field halaman.
+        parse_fn (callable): parse_fn(nilai script) -> hasil, atau None jika
+            halaman belum siap (polling dilanjutkan).
+        args (tuple): Argumen script (arguments[i]), harus bisa di-JSON-kan.
+        tabs (int): Jumlah tab bersamaan.
+        timeout (float): Batas waktu per URL; hasil None jika terlewati.
+        blocked_urls (list): Pola URL yang diblokir di setiap tab (setBlockedURLs
+            di build_driver hanya berlaku untuk tab utama).
+    """
+
+    def __init__(self, driver, script, parse_fn, args=(), tabs=DEFAULT_TABS, timeout=TAB_TIMEOUT,
+                 blocked_urls=None):
+        self.driver = driver
+        self.expression = wrap_script(script, args)
+        self.parse_fn = parse_fn
+        self.tabs = tabs
+        self.timeout = timeout
+        self.blocked_urls = list(blocked_urls or [])
+        self._thread = None
+        self._token = None
+        self._send = None
+        self._ready = threading.Event()
+        self._error = None
+        self._futures = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self):
+        """
+        Menghubungkan ke CDP browser dan membuka tab worker. Mengembalikan self.
+        """
+        ws_url, version = cdp_endpoint(self.driver)
+        self._thread = threading.Thread(target=trio.run, args=(self._main, ws_url, version),
+                                        name='tab-engine', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    async def _main(self, ws_url, version):
+        devtools = cdp.import_devtools(version)
+        send, receive = trio.open_memory_channel(math.inf)
+        try:
+            async with cdp.open_cdp(ws_url) as conn:
+                self._token = trio.lowlevel.current_trio_token()
+                self._send = send
+                self._ready.set()
+                async with trio.open_nursery() as nursery:
+                    for _ in range(self.tabs):
+                        nursery.start_soon(self._tab_worker, conn, devtools, receive.clone())
+                    receive.close()
+        except Exception as e:
+            self._error = e
+            print(f"Engine tab berhenti: {e.__class__.__name__}")
+            metrics.count('error', 'tab_engine')
+        finally:
+            self._token = None
+            self._ready.set()
+            # URL yang belum sempat diproses (koneksi CDP putus) tidak menggantung
+            for future in list(self._futures):
+                if not future.done():
+                    future.set_result(None)
+
+    async def _tab_worker(self, conn, devtools, receive):
+        target_id = await conn.execute(devtools.target.create_target('about:blank', background=True))
+        session = await conn.connect_session(target_id)
+        try:
+            if self.blocked_urls:
+                await session.execute(devtools.network.enable())
+                await session.execute(devtools.network.set_blocked_ur_ls(urls=self.blocked_urls))
+            async with receive:
+                async for url, future in receive:
+                    if future.done():
+                        continue
+                    start = time.perf_counter()
+                    try:
+                        result = await self._load(session, devtools, url)
+                    except Exception as e:
+                        # Error satu URL (parse_fn, perintah CDP) hanya menggagalkan
+                        # URL itu; tab tetap melayani URL berikutnya
+                        print(f"Tab gagal memuat {url}: {e.__class__.__name__}")
+                        metrics.count('error', 'detail_tab')
+                        result = None
+                    metrics.observe('detail_tab', time.perf_counter() - start)
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            with trio.CancelScope(shield=True), trio.move_on_after(5):
+                try:
+                    await conn.execute(devtools.target.close_target(target_id))
+                except Exception:
+                    pass
+
+    async def _load(self, session, devtools, url):
+        # Navigasi lalu polling script sampai parse_fn mengembalikan hasil atau timeout
+        result = await session.execute(devtools.page.navigate(url))
+        if result[2]:
+            print(f"Tab gagal membuka {url}: {result[2]}")
+            metrics.count('error', 'detail_tab')
+            return None
+        with trio.move_on_after(self.timeout):
+            while True:
+                remote, exception = await session.execute(
+                    devtools.runtime.evaluate(self.expression, return_by_value=True)
+                )
+                if exception is None and remote.value is not None:
+                    parsed = self.parse_fn(remote.value)
+                    if parsed is not None:
+                        await session.execute(devtools.runtime.evaluate(f'window.{DONE_FLAG} = true'))
+                        return parsed
+                await trio.sleep(POLL_INTERVAL)
+        metrics.count('timeout', 'detail_tab')
+        return None
+
+    def submit(self, url):
+        """
+        Menjadwalkan satu URL. Future berisi hasil parse_fn, atau None jika
+        timeout, navigasi gagal, atau engine sudah berhenti.
+        """
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self._futures.append(future)
+        token = self._token
+        try:
+            if token is None:
+                raise RuntimeError("engine tidak berjalan")
+            trio.from_thread.run_sync(self._send.send_nowait, (url, future), trio_token=token)
+        except (RuntimeError, trio.RunFinishedError, trio.ClosedResourceError):
+            if not future.done():
+                future.set_result(None)
+        return future
+
+    def fetch_many(self, urls):
+        """
+        Memuat seluruh URL (maksimal `tabs` bersamaan) dan menunggu hasilnya.
+
+        Return:
+            dict: url -> hasil parse_fn (None jika gagal/timeout).
+        """
+        futures = {url: self.submit(url) for url in urls}
+        wait_futures(futures.values())
+        return {url: future.result() for url, future in futures.items()}
+
+    def pending(self):
+        """
+        Jumlah URL yang belum selesai.
+        """
+        self._futures = [f for f in self._futures if not f.done()]
+        return len(self._futures)
+
+    def close(self):
+        """
+        Menunggu URL yang tersisa, menutup tab worker dan koneksi CDP. Driver
+        tidak ditutup.
+        """
+        token = self._token
+        if token is not None:
+            try:
+                trio.from_thread.run_sync(self._send.close, trio_token=token)
+            except trio.RunFinishedError:
+                pass
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
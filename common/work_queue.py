@@ -0,0 +1,498 @@
+import os
+import re
+import json
+import time
+import socket
+import sqlite3
+import argparse
+import threading
+
+from common.metrics import metrics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lokasi default antrean kerja bersama (semua runner dan semua proses worker)
+DEFAULT_QUEUE_PATH = os.path.join(ROOT_DIR, 'data', 'work_queue.sqlite')
+
+# Lama lease satu item (detik). Worker memperpanjangnya lewat heartbeat setiap
+# LEASE_SECONDS / 3; jika worker mati, item kembali ke antrean setelah lease habis.
+LEASE_SECONDS = 120
+
+# Batas percobaan per item; setelah itu item berstatus 'failed' dan tidak diklaim lagi
+MAX_ATTEMPTS = 3
+
+# Jeda sebelum item gagal boleh diklaim lagi (detik, dikali nomor percobaan)
+RETRY_BACKOFF = 30
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    owner TEXT,
+    lease_expires REAL,
+    not_before REAL NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    UNIQUE (kind, key)
+);
+CREATE INDEX IF NOT EXISTS idx_items_claim ON items(kind, status, not_before, id);
+CREATE INDEX IF NOT EXISTS idx_items_lease ON items(status, lease_expires);
+"""
+
+INSERT_ITEM = """
+INSERT INTO items (kind, key, payload, status, created_at, updated_at)
+VALUES (?, ?, ?, 'pending', ?, ?)
+ON CONFLICT(kind, key) DO NOTHING
+"""
+
+# Item lama yang sudah selesai/gagal dijadwalkan ulang (enqueue dengan refresh=True)
+REFRESH_ITEM = """
+INSERT INTO items (kind, key, payload, status, created_at, updated_at)
+VALUES (?, ?, ?, 'pending', ?, ?)
+ON CONFLICT(kind, key) DO UPDATE SET
+    payload = excluded.payload,
+    status = 'pending',
+    attempts = 0,
+    owner = NULL,
+    lease_expires = NULL,
+    not_before = 0,
+    error = NULL,
+    updated_at = excluded.updated_at
+WHERE items.status IN ('done', 'failed')
+"""
+
+
+def default_owner(suffix=None):
+    """
+    Identitas worker yang unik antar host dan proses, mis. 'host-a:4121/worker-2'.
+    """
+    owner = f'{socket.gethostname()}:{os.getpid()}'
+    return f'{owner}/{suffix}' if suffix else owner
+
+
+def worker_checkpoint_name(base):
+    """
+    Nama checkpoint milik satu proses worker antrean, mis.
+    'review_runner_host_a_4121_20250415_103000'. Setiap proses menulis ke
+    checkpoint sendiri (tidak pernah di-reset oleh proses lain), karena item yang
+    sudah selesai di antrean hanya tercatat di checkpoint proses yang mengerjakannya.
+    """
+    owner = re.sub(r'[^A-Za-z0-9]+', '_', default_owner()).strip('_')
+    return f"{base}_{owner}_{time.strftime('%Y%m%d_%H%M%S')}"
+
+
+class WorkQueue:
+    """
+    Antrean kerja tahan crash di satu file SQLite, dipakai bersama oleh banyak
+    proses worker (di satu host, atau beberapa host lewat file bersama). Item
+    (mis. shard keyword, URL toko, URL produk review) diklaim dengan lease
+    berbatas waktu: worker memperpanjang lease lewat heartbeat selama bekerja,
+    lalu menandainya selesai atau gagal. Item yang lease-nya habis (worker
+    crash, proses dibunuh, host mati) kembali ke antrean dan diklaim worker lain.
+
+    Klaim berjalan dalam satu transaksi BEGIN IMMEDIATE, jadi satu item tidak
+    pernah dipegang dua worker sekaligus. Setiap operasi memeriksa pemilik lease,
+    sehingga worker yang lease-nya sudah diambil alih tidak bisa menimpa hasil.
+
+    Mode WAL (default) hanya untuk proses di host yang sama. Untuk file di
+    network share yang dibuka beberapa host, pakai shared=True (journal rollback
+    biasa) pada filesystem dengan file locking yang benar; jam antar host harus
+    sinkron (NTP) karena lease memakai waktu dinding.
+
+    Contoh:
+        work = WorkQueue()
+        work.enqueue('review', url, {'url': url})
+        item = work.claim('review')
+        lease = Lease(work, item).start()
+        ...
+        lease.complete()
+
+    Parameter:
+        path (str): Lokasi file SQLite.
+        lease_seconds (float): Lama lease setiap klaim/heartbeat.
+        max_attempts (int): Batas percobaan per item.
+        shared (bool): Pakai journal rollback, bukan WAL (file di network share).
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, lease_seconds=LEASE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, shared=False):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # Transaksi dikelola sendiri (BEGIN IMMEDIATE), bukan oleh modul sqlite3
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._conn.execute(f"PRAGMA journal_mode={'DELETE' if shared else 'WAL'}")
+        self._conn.execute("PRAGMA synchronous=FULL" if shared else "PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _transaction(self, fn):
+        # Menjalankan fn dalam satu transaksi tulis; lock tulis diambil di awal
+        # sehingga baca-lalu-ubah (klaim) tidak berebut dengan proses lain
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn()
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return result
+
+    def enqueue(self, kind, key, payload=None, refresh=False):
+        """
+        Menambahkan satu item; lihat enqueue_many.
+        """
+        return self.enqueue_many(kind, [(key, payload)], refresh)
+
+    def enqueue_many(self, kind, items, refresh=False):
+        """
+        Menambahkan item (key, payload) ke antrean dalam satu transaksi. Key yang
+        sudah ada dilewati, sehingga sumber yang sama boleh dimasukkan berulang
+        kali; dengan refresh=True item yang sudah selesai/gagal dijadwalkan ulang.
+
+        Return:
+            int: Jumlah item yang ditambahkan atau dijadwalkan ulang.
+        """
+        now = time.time()
+        rows = [(kind, str(key), json.dumps(payload if payload is not None else key, ensure_ascii=False),
+                 now, now) for key, payload in items]
+        sql = REFRESH_ITEM if refresh else INSERT_ITEM
+
+        def insert():
+            before = self._conn.total_changes
+            self._conn.executemany(sql, rows)
+            return self._conn.total_changes - before
+
+        with self._lock:
+            return self._transaction(insert)
+
+    def _requeue_expired(self, now):
+        # Lease yang habis: kembali ke antrean, atau 'failed' jika percobaan habis
+        self._conn.execute(
+            "UPDATE items SET status = 'failed', owner = NULL, lease_expires = NULL, updated_at = ?, "
+            "error = COALESCE(error, 'lease habis') "
+            "WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, now, self.max_attempts),
+        )
+        cursor = self._conn.execute(
+            "UPDATE items SET status = 'pending', owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE status = 'leased' AND lease_expires < ?",
+            (now, now),
+        )
+        return cursor.rowcount
+
+    def requeue_expired(self):
+        """
+        Mengembalikan item dengan lease habis ke antrean (juga dilakukan otomatis
+        di setiap claim).
+
+        Return:
+            int: Jumlah item yang dikembalikan ke antrean.
+        """
+        with self._lock:
+            count = self._transaction(lambda: self._requeue_expired(time.time()))
+        metrics.count('requeue', 'work_queue', count)
+        return count
+
+    def claim(self, kind, owner=None):
+        """
+        Mengklaim item tertua berstatus pending dari jenis `kind`.
+
+        Parameter:
+            kind (str): Jenis item, mis. 'keyword', 'shop', 'review'.
+            owner (str): Identitas worker (default: host:pid).
+
+        Return:
+            dict: Item (id, kind, key, payload, attempts, owner, lease_expires),
+                atau None jika tidak ada item yang bisa diklaim.
+        """
+        owner = owner or default_owner()
+
+        def claim_one():
+            now = time.time()
+            requeued = self._requeue_expired(now)
+            row = self._conn.execute(
+                "SELECT id, key, payload, attempts FROM items "
+                "WHERE kind = ? AND status = 'pending' AND not_before <= ? ORDER BY id LIMIT 1",
+                (kind, now),
+            ).fetchone()
+            if row is None:
+                return requeued, None
+            expires = now + self.lease_seconds
+            self._conn.execute(
+                "UPDATE items SET status = 'leased', owner = ?, lease_expires = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                (owner, expires, now, row[0]),
+            )
+            return requeued, {
+                'id': row[0],
+                'kind': kind,
+                'key': row[1],
+                'payload': json.loads(row[2]),
+                'attempts': row[3] + 1,
+                'owner': owner,
+                'lease_expires': expires,
+            }
+
+        with self._lock:
+            requeued, item = self._transaction(claim_one)
+        metrics.count('requeue', 'work_queue', requeued)
+        if item is not None:
+            metrics.count('claim', 'work_queue')
+        return item
+
+    def _update_owned(self, item, sql, params):
+        # Perubahan hanya berlaku jika item masih dipegang worker ini
+        with self._lock:
+            cursor = self._transaction(lambda: self._conn.execute(
+                f"UPDATE items SET {sql}, updated_at = ? WHERE id = ? AND owner = ? AND status = 'leased'",
+                (*params, time.time(), item['id'], item['owner']),
+            ))
+        return cursor.rowcount == 1
+
+    def heartbeat(self, item):
+        """
+        Memperpanjang lease item yang sedang dikerjakan.
+
+        Return:
+            bool: False jika lease sudah hilang (habis dan diambil worker lain).
+        """
+        expires = time.time() + self.lease_seconds
+        ok = self._update_owned(item, "lease_expires = ?", (expires,))
+        if ok:
+            item['lease_expires'] = expires
+        else:
+            metrics.count('lease_lost', 'work_queue')
+        return ok
+
+    def complete(self, item):
+        """
+        Menandai item selesai. Mengembalikan False jika lease sudah hilang.
+        """
+        ok = self._update_owned(item, "status = 'done', owner = NULL, lease_expires = NULL, error = NULL", ())
+        if ok:
+            metrics.count('done', 'work_queue')
+        return ok
+
+    def fail(self, item, error=None, retry=True):
+        """
+        Menandai percobaan item gagal. Item dijadwalkan ulang setelah jeda
+        RETRY_BACKOFF x percobaan, kecuali retry=False atau percobaan sudah
+        mencapai max_attempts (status 'failed').
+
+        Return:
+            bool: False jika lease sudah hilang.
+        """
+        error = str(error)[:500] if error is not None else None
+        if retry and item['attempts'] < self.max_attempts:
+            not_before = time.time() + RETRY_BACKOFF * item['attempts']
+            ok = self._update_owned(
+                item, "status = 'pending', owner = NULL, lease_expires = NULL, not_before = ?, error = ?",
+                (not_before, error),
+            )
+            event = 'retry'
+        else:
+            ok = self._update_owned(item, "status = 'failed', owner = NULL, lease_expires = NULL, error = ?",
+                                    (error,))
+            event = 'failed'
+        if ok:
+            metrics.count(event, 'work_queue')
+        return ok
+
+    def reset_failed(self, kind=None):
+        """
+        Mengembalikan item 'failed' ke antrean dengan jatah percobaan baru.
+        """
+        where, params = ("AND kind = ?", (kind,)) if kind else ("", ())
+        with self._lock:
+            cursor = self._transaction(lambda: self._conn.execute(
+                "UPDATE items SET status = 'pending', attempts = 0, not_before = 0, updated_at = ? "
+                f"WHERE status = 'failed' {where}",
+                (time.time(), *params),
+            ))
+        return cursor.rowcount
+
+    def purge(self, kind=None):
+        """
+        Menghapus item yang sudah selesai.
+        """
+        where, params = ("AND kind = ?", (kind,)) if kind else ("", ())
+        with self._lock:
+            cursor = self._transaction(lambda: self._conn.execute(
+                f"DELETE FROM items WHERE status = 'done' {where}", params,
+            ))
+        return cursor.rowcount
+
+    def pending(self, kind):
+        """
+        Jumlah item jenis `kind` yang belum selesai (pending atau sedang dikerjakan).
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM items WHERE kind = ? AND status IN ('pending', 'leased')", (kind,)
+            ).fetchone()[0]
+
+    def stats(self):
+        """
+        Jumlah item per jenis dan status, mis. {'review': {'pending': 10, 'done': 3}}.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, status, COUNT(*) FROM items GROUP BY kind, status ORDER BY kind"
+            ).fetchall()
+        stats = {}
+        for kind, status, count in rows:
+            stats.setdefault(kind, {})[status] = count
+        return stats
+
+    def leases(self):
+        """
+        Item yang sedang dikerjakan: (kind, key, owner, sisa lease dalam detik, percobaan).
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, key, owner, lease_expires, attempts FROM items "
+                "WHERE status = 'leased' ORDER BY lease_expires"
+            ).fetchall()
+        return [(kind, key, owner, expires - now, attempts) for kind, key, owner, expires, attempts in rows]
+
+    def failures(self, kind=None):
+        """
+        Item berstatus 'failed' beserta pesan error terakhirnya: (kind, key, percobaan, error).
+        """
+        where, params = ("AND kind = ?", (kind,)) if kind else ("", ())
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT kind, key, attempts, error FROM items WHERE status = 'failed' {where} ORDER BY id",
+                params,
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class Lease:
+    """
+    Heartbeat untuk satu item yang sedang dikerjakan: thread latar memperpanjang
+    lease setiap `interval` detik sampai complete()/fail() dipanggil. Jika lease
+    ternyata hilang (mis. proses sempat macet lebih lama dari lease), `lost`
+    bernilai True dan hasil pekerjaan sebaiknya tidak dianggap milik worker ini.
+
+    Parameter:
+        work_queue (WorkQueue): Antrean asal item.
+        item (dict): Item hasil claim().
+        interval (float): Jeda heartbeat (default: sepertiga lama lease).
+    """
+
+    def __init__(self, work_queue, item, interval=None):
+        self.work_queue = work_queue
+        self.item = item
+        self.interval = interval or work_queue.lease_seconds / 3
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._beat, name=f"lease-{self.item['id']}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _beat(self):
+        while not self._stop.wait(self.interval):
+            try:
+                if not self.work_queue.heartbeat(self.item):
+                    print(f"Lease {self.item['kind']} {self.item['key']} hilang.")
+                    self.lost = True
+                    return
+            except sqlite3.Error as e:
+                # Database sibuk/terkunci sesaat: dicoba lagi di heartbeat berikutnya
+                print(f"Heartbeat gagal: {e.__class__.__name__}: {e}")
+                metrics.count('error', 'work_queue')
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def complete(self):
+        self.stop()
+        return self.work_queue.complete(self.item)
+
+    def fail(self, error=None, retry=True):
+        self.stop()
+        return self.work_queue.fail(self.item, error, retry)
+
+
+def add_queue_arguments(parser):
+    """
+    Menambahkan opsi antrean kerja bersama (--queue, --enqueue, --shared-queue)
+    ke argparse parser milik main() sebuah runner.
+    """
+    parser.add_argument('--queue', nargs='?', const=DEFAULT_QUEUE_PATH, default=None, metavar='PATH',
+                        help=f"Ambil pekerjaan dari antrean kerja SQLite bersama (default: {DEFAULT_QUEUE_PATH}).")
+    parser.add_argument('--enqueue', action='store_true',
+                        help="Hanya masukkan pekerjaan dari sumber input ke antrean lalu keluar.")
+    parser.add_argument('--refresh', action='store_true',
+                        help="Dengan --enqueue: jadwalkan ulang item yang sudah selesai/gagal.")
+    parser.add_argument('--shared-queue', action='store_true',
+                        help="File antrean dibuka beberapa host (network share): tanpa WAL.")
+
+
+def open_queue(args):
+    """
+    Membuka WorkQueue dari argumen hasil add_queue_arguments. Mengembalikan None
+    jika --queue maupun --enqueue tidak dipakai.
+    """
+    if args.queue is None and not args.enqueue:
+        return None
+    return WorkQueue(args.queue or DEFAULT_QUEUE_PATH, shared=args.shared_queue)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Status dan perawatan antrean kerja scraper.")
+    parser.add_argument('--db', default=DEFAULT_QUEUE_PATH, help="Lokasi file SQLite antrean.")
+    parser.add_argument('--shared', action='store_true', help="File dibuka beberapa host (tanpa WAL).")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('stats', help="Jumlah item per jenis dan status, serta lease aktif.")
+    commands.add_parser('requeue', help="Kembalikan item dengan lease habis ke antrean.")
+    retry_parser = commands.add_parser('retry', help="Antrekan ulang item yang gagal.")
+    retry_parser.add_argument('--kind')
+    failed_parser = commands.add_parser('failed', help="Daftar item gagal beserta error terakhir.")
+    failed_parser.add_argument('--kind')
+    purge_parser = commands.add_parser('purge', help="Hapus item yang sudah selesai.")
+    purge_parser.add_argument('--kind')
+    args = parser.parse_args()
+
+    work = WorkQueue(args.db, shared=args.shared)
+    try:
+        if args.command == 'stats':
+            for kind, counts in work.stats().items():
+                print(f"{kind:<10} " + ', '.join(f"{status} {count}" for status, count in sorted(counts.items())))
+            for kind, key, owner, remaining, attempts in work.leases():
+                print(f"  {kind} {key} oleh {owner}, sisa lease {remaining:.0f} detik (percobaan {attempts})")
+        elif args.command == 'requeue':
+            print(f"{work.requeue_expired()} item dikembalikan ke antrean.")
+        elif args.command == 'retry':
+            print(f"{work.reset_failed(args.kind)} item gagal diantrekan ulang.")
+        elif args.command == 'failed':
+            for kind, key, attempts, error in work.failures(args.kind):
+                print(f"{kind} {key} ({attempts}x): {error}")
+        else:
+            print(f"{work.purge(args.kind)} item selesai dihapus.")
+    finally:
+        work.close()
+
+
+if __name__ == '__main__':
+    main()
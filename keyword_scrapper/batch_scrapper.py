@@ -0,0 +1,319 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import datetime
+import importlib
+import multiprocessing as mp
+from collections import deque
+from multiprocessing.connection import wait as wait_processes
+
+# Tambahkan root repo ke sys.path agar modul bersama di common/ dapat diimpor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.checkpoint import Checkpoint
+from common.output import add_output_arguments, output_formats, export_jsonl, iter_jsonl
+from common.browser import add_browser_arguments, DEFAULT_PROFILE
+from common.metrics import metrics
+from common.normalize import normalize_dataframe
+from common.history import HistoryStore
+from common.product_index import product_id
+from common.work_queue import Lease, add_queue_arguments, open_queue, default_owner
+
+# Modul scraper per platform; masing-masing menyediakan scrape_keyword()
+PLATFORM_MODULES = {
+    'tokopedia': 'scrapper_tokopedia',
+    'lazada': 'scrapper_lazada',
+    'shopee': 'scrapper_shopee',
+}
+
+# Jumlah proses worker (masing-masing dengan driver sendiri) dan worker detail per proses.
+# Total browser yang terbuka kira-kira BATCH_WORKERS * (1 + BATCH_DETAIL_WORKERS), atau
+# BATCH_WORKERS saja jika DETAIL_ENGINE (common/keyword_runner.py) 'tabs' (detail dimuat sebagai tab).
+BATCH_WORKERS = 3
+BATCH_DETAIL_WORKERS = 1
+
+# Normalisasi harga/diskon/terjual/rating pada file gabungan
+NORMALIZE_OUTPUT = True
+
+# Simpan snapshot harga/terjual/rating ke database riwayat (common/history.py)
+RECORD_HISTORY = True
+
+# Jenis item shard keyword di antrean kerja bersama (common/work_queue.py)
+QUEUE_KIND = 'keyword'
+
+# Satu shard per halaman hasil pencarian (platform x keyword x halaman), bukan per
+# keyword. Halaman dibuka langsung lewat search_url scraper (PAGINATION 'url' di
+# common/keyword_runner.py), jadi halaman-halaman satu keyword bisa dikerjakan
+# worker/host berbeda dan halaman yang gagal diulang sendiri. Bisa juga
+# diaktifkan lewat --page-shards.
+PAGE_SHARDS = False
+
+def load_batch_config(json_file_path):
+    """
+    Memuat konfigurasi batch dari file JSON, contoh:
+        {"keywords": ["Moringa", "Moringa Tea"],
+         "platforms": ["tokopedia", "lazada"],
+         "pages": {"tokopedia": 5, "lazada": 3}}
+    'pages' boleh berupa angka (sama untuk semua platform) atau dict per platform.
+    """
+    with open(json_file_path, 'r') as file:
+        return json.load(file)
+
+def build_shards(keywords, platforms, pages, per_page=PAGE_SHARDS):
+    """
+    Membuat daftar shard (platform x keyword) beserta jumlah halamannya. Dengan
+    per_page, setiap halaman menjadi shard sendiri (first_page == pages).
+
+    Return:
+        list: dict shard dengan key platform, keyword, pages, first_page dan name.
+    """
+    shards = []
+    for platform in platforms:
+        if platform not in PLATFORM_MODULES:
+            raise ValueError(f"Platform tidak dikenal: {platform}")
+        platform_pages = pages[platform] if isinstance(pages, dict) else pages
+        for keyword in keywords:
+            slug = re.sub(r'[^a-z0-9]+', '_', keyword.lower()).strip('_')
+            if not per_page:
+                shards.append({
+                    'platform': platform,
+                    'keyword': keyword,
+                    'pages': int(platform_pages),
+                    'first_page': 1,
+                    'name': f'batch_{platform}_{slug}',
+                })
+                continue
+            for page in range(1, int(platform_pages) + 1):
+                shards.append({
+                    'platform': platform,
+                    'keyword': keyword,
+                    'pages': page,
+                    'first_page': page,
+                    'name': f'batch_{platform}_{slug}_p{page}',
+                })
+    return shards
+
+def count_rows(checkpoint):
+    """
+    Menghitung jumlah baris yang sudah tertulis di checkpoint shard.
+    """
+    if not os.path.exists(checkpoint.rows_path):
+        return 0
+    with open(checkpoint.rows_path, 'r', encoding='utf-8') as file:
+        return sum(1 for line in file if line.strip())
+
+def run_shard(shard, resume, browser, detail_workers):
+    """
+    Dijalankan di proses worker: scraping satu keyword di satu platform dengan
+    driver sendiri. Hasil ditulis ke checkpoint shard, jadi proses induk tetap
+    bisa membaca hasil sebagian walaupun proses ini crash.
+    """
+    module = importlib.import_module(PLATFORM_MODULES[shard['platform']])
+    checkpoint = Checkpoint(shard['name'])
+    state = checkpoint.load_state() if resume else {}
+    if state.get('keyword') == shard['keyword']:
+        start_page = state['page'] + 1
+    else:
+        checkpoint.reset()
+        start_page = shard.get('first_page', 1)
+    if start_page > shard['pages']:
+        print(f"[{shard['name']}] sudah selesai, dilewati.")
+        return
+    module.scrape_keyword(shard['keyword'], shard['pages'], checkpoint, start_page,
+                          browser, detail_workers)
+    metrics.write(shard['name'])
+
+def run_batch(shards, workers=BATCH_WORKERS, resume=False, browser=DEFAULT_PROFILE,
+              detail_workers=BATCH_DETAIL_WORKERS, work_queue=None):
+    """
+    Menjalankan shard di maksimal `workers` proses terpisah. Setiap shard berjalan
+    di prosesnya sendiri, sehingga crash satu worker (exception, browser mati, atau
+    proses dibunuh) tidak menghentikan shard lain.
+
+    Dengan work_queue, shard diklaim dari antrean kerja bersama (bukan dari
+    `shards`), sehingga beberapa runner di host berbeda bisa membagi batch yang
+    sama. Proses induk memegang lease shard dan mengirim heartbeat selama proses
+    worker berjalan; shard yang crash dicoba lagi oleh runner mana pun, dan shard
+    milik runner yang mati kembali ke antrean setelah lease habis.
+
+    Return:
+        list: Laporan per shard (status, halaman, baris, detik, baris/menit).
+    """
+    ctx = mp.get_context('spawn')
+    pending = deque(shards)
+    running = {}
+    reports = []
+
+    def next_shard():
+        if work_queue is None:
+            return (pending.popleft(), None) if pending else (None, None)
+        item = work_queue.claim(QUEUE_KIND, owner=default_owner())
+        if item is None:
+            return None, None
+        return item['payload'], Lease(work_queue, item).start()
+
+    exhausted = False
+    while not exhausted or running:
+        while not exhausted and len(running) < workers:
+            shard, lease = next_shard()
+            if shard is None:
+                exhausted = True
+                break
+            # Shard yang dicoba ulang dari antrean melanjutkan checkpoint percobaan sebelumnya
+            shard_resume = resume or (lease is not None and lease.item['attempts'] > 1)
+            rows_before = count_rows(Checkpoint(shard['name'])) if shard_resume else 0
+            process = ctx.Process(target=run_shard, name=shard['name'],
+                                  args=(shard, shard_resume, browser, detail_workers))
+            process.start()
+            print(f"Mulai {shard['name']} (pid {process.pid})")
+            running[process.sentinel] = (process, shard, time.time(), rows_before, lease)
+
+        if not running:
+            break
+        for sentinel in wait_processes(list(running)):
+            process, shard, started, rows_before, lease = running.pop(sentinel)
+            process.join()
+            if lease is not None:
+                if process.exitcode == 0:
+                    lease.complete()
+                else:
+                    lease.fail(f'exit {process.exitcode}')
+            checkpoint = Checkpoint(shard['name'])
+            seconds = time.time() - started
+            rows = count_rows(checkpoint) - rows_before
+            state = checkpoint.load_state()
+            report = {
+                'name': shard['name'],
+                'platform': shard['platform'],
+                'keyword': shard['keyword'],
+                'status': 'ok' if process.exitcode == 0 else f'crash (exit {process.exitcode})',
+                'pages': state.get('page', 0),
+                'pages_target': shard['pages'],
+                'rows': rows,
+                'seconds': round(seconds, 1),
+                'rows_per_minute': round(rows / seconds * 60, 1) if seconds else 0.0,
+            }
+            reports.append(report)
+            print(f"Selesai {shard['name']}: {report['status']}, {rows} baris dalam {seconds:.1f} detik")
+    return reports
+
+def merge_shards(shards, merged_name='batch_merged'):
+    """
+    Menggabungkan checkpoint semua shard menjadi satu checkpoint JSONL, dengan
+    kolom platform dan keyword di depan setiap baris. Produk yang sama pada
+    keyword yang sama (mis. iklan yang muncul lagi di shard halaman lain) hanya
+    ditulis sekali.
+
+    Return:
+        Checkpoint: Checkpoint hasil gabungan.
+    """
+    merged = Checkpoint(merged_name)
+    merged.reset()
+    seen = set()
+    for shard in shards:
+        rows = []
+        for row in iter_jsonl(Checkpoint(shard['name']).rows_path):
+            key = (shard['platform'], shard['keyword'], product_id(row.get('details_link')))
+            if key[2] is not None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            rows.append({'platform': shard['platform'], 'keyword': shard['keyword'], **row})
+        if rows:
+            merged.append(rows, last_shard=shard['name'])
+    return merged
+
+def format_batch_report(reports):
+    """
+    Membuat tabel throughput per shard.
+    """
+    lines = [f"{'platform':<10} {'keyword':<24} {'status':<16} {'hal':>7} {'baris':>6} {'detik':>8} {'baris/mnt':>10}"]
+    for r in reports:
+        lines.append(f"{r['platform']:<10} {r['keyword'][:24]:<24} {r['status']:<16} "
+                     f"{r['pages']:>3}/{r['pages_target']:<3} {r['rows']:>6} {r['seconds']:>8.1f} "
+                     f"{r['rows_per_minute']:>10.1f}")
+    total_rows = sum(r['rows'] for r in reports)
+    lines.append(f"Total: {total_rows} baris dari {len(reports)} shard, "
+                 f"{sum(1 for r in reports if r['status'] != 'ok')} gagal")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Batch scraping beberapa keyword x platform di beberapa proses browser sekaligus."
+    )
+    parser.add_argument('--config', help="File JSON berisi keywords, platforms dan pages.")
+    parser.add_argument('--keywords', help="Daftar keyword dipisah koma.")
+    parser.add_argument('--platforms', default='tokopedia,lazada,shopee',
+                        help="Daftar platform dipisah koma (default: semua).")
+    parser.add_argument('--pages', type=int, default=1, help="Jumlah halaman per shard.")
+    parser.add_argument('--page-shards', action='store_true', default=PAGE_SHARDS,
+                        help="Satu shard per halaman hasil pencarian (bukan per keyword).")
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS,
+                        help=f"Jumlah proses worker (default: {BATCH_WORKERS}).")
+    parser.add_argument('--detail-workers', type=int, default=BATCH_DETAIL_WORKERS,
+                        help="Jumlah worker browser detail per proses (0 = tab baru).")
+    parser.add_argument('--resume', action='store_true',
+                        help="Lanjutkan shard dari checkpoint masing-masing.")
+    add_browser_arguments(parser)
+    add_output_arguments(parser)
+    add_queue_arguments(parser)
+    args = parser.parse_args()
+    formats = output_formats(args)
+    work_queue = open_queue(args)
+
+    if args.config:
+        config = load_batch_config(args.config)
+        keywords = config['keywords']
+        platforms = config.get('platforms', list(PLATFORM_MODULES))
+        pages = config.get('pages', args.pages)
+    elif args.keywords:
+        keywords = [k.strip() for k in args.keywords.split(',') if k.strip()]
+        platforms = [p.strip().lower() for p in args.platforms.split(',') if p.strip()]
+        pages = args.pages
+    elif work_queue is not None and not args.enqueue:
+        # Worker antrean murni: shard datang dari antrean yang diisi runner lain
+        keywords, platforms, pages = [], [], args.pages
+    else:
+        parser.error("Gunakan --config atau --keywords.")
+
+    shards = build_shards(keywords, platforms, pages, args.page_shards)
+    if work_queue is not None:
+        added = work_queue.enqueue_many(QUEUE_KIND, [(shard['name'], shard) for shard in shards],
+                                        args.refresh)
+        print(f"{added} shard ditambahkan ke antrean {work_queue.path}.")
+        if args.enqueue:
+            print(f"Isi antrean: {work_queue.stats()}")
+            work_queue.close()
+            return
+        print(f"Mengambil shard dari antrean dengan {args.workers} worker.")
+    else:
+        print(f"{len(shards)} shard dijalankan dengan {args.workers} worker.")
+    start_time = time.time()
+    reports = run_batch(shards, args.workers, args.resume, args.browser, args.detail_workers, work_queue)
+    if work_queue is not None:
+        # Hanya shard yang dikerjakan runner ini (checkpoint-nya ada di host ini) yang digabung
+        shards = list({r['name']: {key: r[key] for key in ('platform', 'keyword', 'name')}
+                       for r in reports}.values())
+        print(f"Antrean {work_queue.path}: {work_queue.stats()}")
+        work_queue.close()
+
+    merged = merge_shards(shards)
+    now = datetime.datetime.today().strftime('%d-%m-%Y')
+    transform = normalize_dataframe if NORMALIZE_OUTPUT else None
+    written = export_jsonl(merged.rows_path, f'Batch_{now}', formats, transform)
+    if RECORD_HISTORY:
+        history = HistoryStore()
+        print(f"{history.ingest_jsonl(merged.rows_path)} snapshot disimpan ke riwayat {history.path}")
+        history.close()
+
+    print("\n" + format_batch_report(reports))
+    print(f"Total waktu: {time.time() - start_time:.1f} detik")
+    with open(f'Batch_{now}_report.json', 'w') as file:
+        json.dump(reports, file, indent=2, ensure_ascii=False)
+    print(f"File disimpan sebagai {', '.join(written)} dan Batch_{now}_report.json")
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,67 @@
+import os
+import sys
+import json
 import time
 import random
-import datetime
-import pandas as pd
+from urllib.parse import urlencode
 from tqdm import tqdm
+from bs4 import BeautifulSoup
 
 # Import library Selenium untuk automasi browser
-from selenium import webdriver as wb
-from selenium.webdriver import ActionChains
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait as wait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, JavascriptException
+
+# Tambahkan root repo ke sys.path agar modul bersama di common/ dapat diimpor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.detail_pool import fetch_in_new_tab
+from common.js_extract import extract_cards_script
+from common.page_state import read_page_state, first_value, match_visible
+from common.scrolling import adaptive_scroll, format_report
+from common.fields import implicit_wait
+from common.browser import build_driver
+from common.metrics import metrics
+from common.keyword_runner import (
+    KeywordSite, run_cli, scrape_keyword as run_keyword, BROWSER_PROFILE, DETAIL_WORKERS,
+    IMPLICIT_WAIT, ZERO_IMPLICIT_WAIT, SCROLL_MAX_TIME, SEARCH_SORT,
+)
+
+# Field detail yang harus segar di cache detail agar halaman detail tidak dibuka lagi
+DETAIL_FIELDS = ('description', 'store', 'brand', 'rating')
+
+# Field opsional kartu produk yang dihitung jika kosong
+OPTIONAL_FIELDS = ('sold',)
+
+# Mode ekstraksi kartu: 'state' (window.pageData hasil pencarian dibaca sekali
+# per halaman), 'script' (satu execute_script per halaman) atau 'element'
+# (find_element per field). Jika state tidak mencakup semua kartu yang terlihat,
+# ekstraksi kembali ke 'script', lalu 'element'.
+EXTRACT_MODE = 'state'
+
+# Sumber detail produk: 'state' (__moduleData__ halaman detail, tanpa scroll dan
+# sleep) atau 'dom'. Jalur state kembali ke 'dom' jika deskripsi tidak ada di state.
+DETAIL_SOURCE = 'state'
+
+# Nama objek state JSON halaman hasil pencarian dan halaman detail
+LIST_STATE_NAMES = ('pageData',)
+DETAIL_STATE_NAMES = ('__moduleData__',)
+
+# Halaman hasil pencarian dan nilai parameter urutan (sort) untuk search_url
+SEARCH_URL = 'https://www.lazada.co.id/catalog/'
+SORT_OPTIONS = {'relevance': 'popularity', 'price_asc': 'priceasc', 'price_desc': 'pricedesc'}
+
+# Selector kartu produk di halaman hasil pencarian
+CARD_XPATH = '//div[contains(@class, "Bm3ON")]'
+CARD_SELECTORS = {
+    'name': './/div[@class="RfADt"]',
+    'price': './/span[@class="ooOxS"]',
+    'location': './/span[@class="oa6ri "]',
+    'details_link': './/a',
+    'sold': './/span[@class="_1cEkb"]',
+}
+CARD_ATTRIBUTES = {'details_link': 'href'}
 
 # Randomized User-Agent list
 USER_AGENTS = [
@@ -21,245 +71,521 @@ USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:102.0) Gecko/20100101 Firefox/102.0'
 ]
 
+# Mapping gambar bintang rating (base64) ke nilai bintang
+BASE64_TO_STAR = {
+    "ASUVORK5CYII=": 0.0,   # 0-star
+    "ElFTkSuQmCC":   0.5,   # 0.5-star
+    "BJRU5ErkJggg==": 1.0   # 1-star
+}
+
+def create_driver(profile=BROWSER_PROFILE, **kwargs):
+    """
+    Membuat Chrome WebDriver dengan profil browser dan User-Agent yang di-random.
+    Argumen lain (mis. user_data_dir) diteruskan ke build_driver.
+    """
+    return build_driver(profile, user_agent=random.choice(USER_AGENTS), **kwargs)
+
 def scrolling(driver):
     """
-    Melakukan scroll perlahan ke bawah halaman agar elemen-elemen termuat dengan baik.
-    
+    Scroll adaptif sampai jumlah kartu produk tidak bertambah lagi (maksimal
+    SCROLL_MAX_TIME detik), lalu mencetak jumlah langkah dan detik yang dibutuhkan.
+
     Parameter:
         driver (webdriver): Instance dari Selenium WebDriver.
+
+    Return:
+        ScrollReport: Ringkasan scroll untuk halaman ini.
     """
-    scheight = 0.1
-    while scheight < 9.9:
-        driver.execute_script(
-            "window.scrollTo(0, document.body.scrollHeight / {});".format(scheight)
-        )
-        time.sleep(0.3)
-        scheight += 0.1
+    report = adaptive_scroll(driver, (By.XPATH, CARD_XPATH), max_time=SCROLL_MAX_TIME)
+    print(format_report(report))
+    return report
 
-def reverse_scrolling(driver):
+def fetch_details(driver):
     """
-    Melakukan scroll dengan cara menekan tombol PAGE_DOWN secara berulang agar elemen-elemen tampil sempurna.
-    
+    Mengambil deskripsi, toko, brand, dan rating dari halaman detail produk yang
+    sedang terbuka di driver.
+
     Parameter:
-        driver (webdriver): Instance dari Selenium WebDriver.
+        driver (webdriver): Instance dari Selenium WebDriver yang sudah membuka halaman detail.
     """
-    body = driver.find_element(By.TAG_NAME, 'body')
-    for _ in range(25):
-        body.send_keys(Keys.PAGE_DOWN)
+    details = {'description': None, 'store': None, 'brand': None, 'rating': 0.0}
+    try:
+        # Tunggu hingga halaman utama benar-benar termuat
+        wait(driver, 15).until(EC.presence_of_element_located(
+            (By.TAG_NAME, 'body')))
+        time.sleep(2)  # tambahan waktu tunggu ekstra jika perlu
+
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
+        time.sleep(1)
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(0.5)
+        time.sleep(1)
+
+        # description
+        wait(driver, 10).until(
+            EC.visibility_of_element_located((By.XPATH, '//div[@class="pdp-product-detail"]'))
+        )
+
+        try:
+            details['description'] = driver.find_element(By.XPATH, '//div[@class="pdp-product-detail"]').text
+        except NoSuchElementException:
+            pass
+
+        # brand
+        wait(driver, 10).until(
+            EC.visibility_of_element_located((By.XPATH, '//div[@class="pdp-product-brand"]'))
+        )
+
+        try:
+            details['brand'] = wait(driver, 10).until(
+                EC.presence_of_element_located((
+                    By.XPATH, '//div[contains(@class, "pdp-product-brand")]//a[contains(@class, "pdp-product-brand__brand-link")]'
+                ))
+            ).text
+        except (TimeoutException, NoSuchElementException):
+            details['brand'] = None
+
+        # Store
+        try:
+            details['store'] = wait(driver, 10).until(
+                EC.presence_of_element_located((
+                    By.XPATH, '//div[contains(@class, "seller-name__detail")]//a[contains(@class, "seller-name__detail-name")]'
+                ))
+            ).text
+        except (TimeoutException, NoSuchElementException):
+            details['store'] = None
+
+        rating_elements = driver.find_elements(By.CSS_SELECTOR, 'div.pdp-review-summary img.star')
+        total_stars = 0.0
+        for img in rating_elements:
+            img_src = img.get_attribute("src")
+            for base64_key, star_value in BASE64_TO_STAR.items():
+                if base64_key in img_src:
+                    total_stars += star_value
+                    break
+        details['rating'] = total_stars
+
+    except (TimeoutException, NoSuchElementException):
+        metrics.count('timeout', 'detail_fetch')
+    return details
 
-def extract_data(driver, product_data):
+def html_to_text(html):
+    # Deskripsi di state berupa HTML; diubah ke teks per baris seperti .text elemen
+    if not html:
+        return None
+    return BeautifulSoup(html, 'html.parser').get_text('\n', strip=True) or None
+
+# Field data.root.fields __moduleData__ yang dibaca details_from_state
+TAB_STATE_PATHS = (
+    'product.highlights', 'product.desc', 'product.brand.name', 'productOption.product.brand.name',
+    'review.ratings.average', 'review.ratings.rating', 'seller.name',
+)
+
+# Script detail untuk mesin tab (TabDetailPool): field TAB_STATE_PATHS dari
+# __moduleData__ jika sudah ada (bukan seluruh objek, karena script dipolling
+# berulang kali), plus deskripsi, brand, toko dan bintang rating dari DOM sebagai
+# cadangan. Selama deskripsi DOM belum ada, halaman di-scroll (deskripsi dimuat lazy).
+#   arguments[0]: nama objek state, arguments[1]: selector deskripsi,
+#   arguments[2]: selector brand, arguments[3]: selector toko,
+#   arguments[4]: selector gambar bintang, arguments[5]: BASE64_TO_STAR,
+#   arguments[6]: TAB_STATE_PATHS
+TAB_DETAIL_JS = """
+var get = function (value, path) {
+    path.split('.').forEach(function (key) { value = value == null ? null : value[key]; });
+    return value == null ? null : value;
+};
+var fields = get(window[arguments[0]], 'data.root.fields'), picked = null;
+arguments[6].forEach(function (path) {
+    var value = get(fields, path);
+    if (value === null) { return; }
+    var keys = path.split('.'), target = picked = picked || {};
+    keys.slice(0, -1).forEach(function (key) { target = target[key] = target[key] || {}; });
+    target[keys[keys.length - 1]] = value;
+});
+var state = picked ? {data: {root: {fields: picked}}} : null;
+var text = function (css) {
+    var el = document.querySelector(css);
+    return el ? el.innerText : null;
+};
+var description = text(arguments[1]);
+if (description === null && document.body) {
+    window.scrollTo(0, document.body.scrollHeight);
+}
+if (!state && description === null) { return null; }
+var starMap = arguments[5], stars = 0;
+document.querySelectorAll(arguments[4]).forEach(function (img) {
+    var src = img.getAttribute('src') || '';
+    for (var key in starMap) {
+        if (src.indexOf(key) !== -1) { stars += starMap[key]; break; }
+    }
+});
+return JSON.stringify({
+    state: state,
+    description: description,
+    brand: text(arguments[2]),
+    store: text(arguments[3]),
+    rating: stars
+});
+"""
+TAB_DETAIL_ARGS = (
+    DETAIL_STATE_NAMES[0],
+    'div.pdp-product-detail',
+    'div.pdp-product-brand a.pdp-product-brand__brand-link',
+    'div.seller-name__detail a.seller-name__detail-name',
+    'div.pdp-review-summary img.star',
+    BASE64_TO_STAR,
+    TAB_STATE_PATHS,
+)
+
+def details_from_tab(raw):
     """
-    Mengekstrak data dari produk-produk yang tampil di halaman saat ini.
-    Termasuk mengambil detail produk dengan membuka halaman produk secara terpisah.
-    
+    Detail dari hasil TAB_DETAIL_JS: state lebih dulu, lalu teks DOM. Mengembalikan
+    None jika deskripsi belum ada (tab belum siap).
+    """
+    page = json.loads(raw)
+    details = details_from_state(page['state'] or {})
+    if details['description'] is None and page['description']:
+        details = {'description': page['description'], 'store': page['store'],
+                   'brand': page['brand'], 'rating': page['rating']}
+    return details if details['description'] is not None else None
+
+def details_from_state(module_data):
+    """
+    Deskripsi, toko, brand, dan rating dari __moduleData__ halaman detail
+    (data.root.fields). Deskripsi adalah gabungan highlights dan desc.
+    """
+    fields = first_value(module_data, ('data.root.fields',)) or {}
+    parts = [html_to_text(first_value(fields, (path,))) for path in ('product.highlights', 'product.desc')]
+    rating = first_value(fields, ('review.ratings.average', 'review.ratings.rating'))
+    try:
+        rating = float(rating) if rating is not None else 0.0
+    except (TypeError, ValueError):
+        rating = 0.0
+    return {
+        'description': '\n'.join(part for part in parts if part) or None,
+        'store': first_value(fields, ('seller.name',)),
+        'brand': first_value(fields, ('product.brand.name', 'productOption.product.brand.name')),
+        'rating': rating,
+    }
+
+def fetch_details_state(driver):
+    """
+    Mengambil detail dari state JSON halaman detail yang sedang terbuka dengan
+    satu execute_script, tanpa scroll dan sleep. Kembali ke fetch_details (DOM)
+    jika deskripsi tidak ada di state.
+    """
+    try:
+        module_data = read_page_state(driver, DETAIL_STATE_NAMES).get('__moduleData__') or {}
+    except JavascriptException:
+        module_data = {}
+    details = details_from_state(module_data)
+    if details['description'] is None:
+        metrics.count('fallback', 'detail_state')
+        return fetch_details(driver)
+    return details
+
+def detail_fetcher():
+    """
+    Fungsi pengambil detail sesuai DETAIL_SOURCE.
+    """
+    return fetch_details_state if DETAIL_SOURCE == 'state' else fetch_details
+
+def state_to_rows(page_data):
+    """
+    Menyusun baris produk dari window.pageData halaman hasil pencarian
+    (mods.listItems). Toko, brand, dan rating juga tersedia di state; detail
+    tetap diambil dari halaman produk untuk deskripsi.
+    """
+    rows = []
+    for item in first_value(page_data, ('mods.listItems',)) or []:
+        name = item.get('name')
+        price = item.get('priceShow') or item.get('price')
+        location = item.get('location')
+        link = item.get('itemUrl') or item.get('productUrl')
+        if not (name and price and location and link):
+            continue
+        if link.startswith('//'):
+            link = 'https:' + link
+        try:
+            rating = float(item.get('ratingScore') or 0)
+        except ValueError:
+            rating = 0.0
+        rows.append({
+            'name': name,
+            'price': price,
+            'store': item.get('sellerName'),
+            'brand': item.get('brandName'),
+            'location': location,
+            'sold': item.get('itemSoldCntShow'),
+            'rating': rating,
+            'details_link': link,
+            'description': None
+        })
+    return rows
+
+def iter_cards_state(driver):
+    """
+    Membaca kartu produk dari window.pageData (satu execute_script untuk state
+    dan satu untuk link kartu yang terlihat). Mengembalikan None jika state tidak
+    mencakup semua kartu.
+    """
+    page_data = read_page_state(driver, LIST_STATE_NAMES).get('pageData') or {}
+    rows = state_to_rows(page_data)
+    if not rows:
+        return None
+    links = [card['details_link'] for card in extract_cards_script(
+        driver, CARD_XPATH, {'details_link': CARD_SELECTORS['details_link']}, CARD_ATTRIBUTES
+    ) if card['details_link']]
+    return match_visible(rows, links)
+
+def card_to_row(card):
+    """
+    Menyusun dict produk dari field mentah hasil extract_cards_script dengan aturan
+    yang sama seperti jalur per-elemen.
+
+    Parameter:
+        card (dict): Field mentah satu kartu produk.
+
+    Return:
+        dict atau None jika salah satu field wajib tidak ditemukan.
+    """
+    if any(card[field] is None for field in ('name', 'price', 'location', 'details_link')):
+        return None
+    return {
+        'name': card['name'],
+        'price': card['price'],
+        'store': None,
+        'brand': None,
+        'location': card['location'],
+        'sold': card['sold'],
+        'rating': 0.0,  # default rating 0
+        'details_link': card['details_link'],
+        'description': None
+    }
+
+def iter_cards_script(driver):
+    """
+    Membaca seluruh kartu produk di halaman dengan satu panggilan execute_script.
+
     Parameter:
         driver (webdriver): Instance dari Selenium WebDriver.
-        product_data (list): List untuk menyimpan data produk yang berhasil diambil.
     """
-    # Mekanisme retry untuk memastikan elemen produk termuat dengan baik
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            scrolling(driver)
-            data_items = wait(driver, 10).until(
-                EC.visibility_of_all_elements_located((By.XPATH, '//div[contains(@class, "Bm3ON")]'))
-            )
-            break  # Jika berhasil, keluar dari loop retry
-        except TimeoutException:
-            if attempt == max_retries - 1:
-                raise
-            driver.refresh()
-            time.sleep(3)
+    cards = extract_cards_script(driver, CARD_XPATH, CARD_SELECTORS, CARD_ATTRIBUTES)
+    for card in cards:
+        row = card_to_row(card)
+        if row is not None:
+            yield row
+
+def iter_cards_element(data_items):
+    """
+    Membaca kartu produk satu per satu dengan find_element (jalur fallback).
 
-    # Process only the first 5 products for testing
+    Parameter:
+        data_items (list): Elemen kartu produk yang sudah terlihat di halaman.
+    """
     for item in tqdm(data_items, desc="Memproses produk"):
-    # for index, item in enumerate(tqdm(data_items, desc="Memproses produk")):
-    #     if index >= 3:
-    #         break
         # Ambil nama produk
         try:
-            name = item.find_element(By.XPATH, './/div[@class="RfADt"]').text
+            name = item.find_element(By.XPATH, CARD_SELECTORS['name']).text
         except Exception:
             continue
         
         # Ambil harga produk
         try:
-            price = item.find_element(By.XPATH, './/span[@class="ooOxS"]').text
+            price = item.find_element(By.XPATH, CARD_SELECTORS['price']).text
         except Exception:
             continue
         
         # Ambil lokasi produk
         try:
-            location = item.find_element(By.XPATH, './/span[@class="oa6ri "]').text
+            location = item.find_element(By.XPATH, CARD_SELECTORS['location']).text
         except Exception:
             continue
         
         # Ambil link detail produk
         try:
-            link_element = item.find_element(By.XPATH, './/a')
+            link_element = item.find_element(By.XPATH, CARD_SELECTORS['details_link'])
             details_link = link_element.get_attribute('href')
         except Exception:
             continue
 
         # Ambil jumlah produk yang terjual
         try:
-            sold = item.find_element(By.XPATH, './/span[@class="_1cEkb"]').text
+            sold = item.find_element(By.XPATH, CARD_SELECTORS['sold']).text
         except Exception:
             sold = None
 
-        # --- BAGIAN TAMBAHAN: PENGAMBILAN DESKRIPSI, TOKO, BRAND, DAN RATING PRODUK ---
-        description = None
-        store = None
-        brand = None
-        rating = 0.0  # default rating 0
-
-        main_window = driver.current_window_handle
-
-        try:
-            # Buka link detail produk di tab baru
-            driver.execute_script(f"window.open('{details_link}','_blank');")
-            driver.switch_to.window(driver.window_handles[-1])
-
-            # Tunggu hingga halaman utama benar-benar termuat
-            wait(driver, 15).until(EC.presence_of_element_located(
-                (By.TAG_NAME, 'body')))
-            time.sleep(2)  # tambahan waktu tunggu ekstra jika perlu
-
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/2);")
-            time.sleep(1)
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(1)
-
-
-            # Tunggu hingga elemen detail produk termuat (sesuaikan selector jika perlu)
-            
-            # description
-            wait(driver, 10).until(
-                EC.visibility_of_element_located((By.XPATH, '//div[@class="pdp-product-detail"]'))
-            )
-            
-            try:
-                description = driver.find_element(By.XPATH, '//div[@class="pdp-product-detail"]').text
-            except NoSuchElementException:
-                pass
-            
-            # brand
-            wait(driver, 10).until(
-                EC.visibility_of_element_located((By.XPATH, '//div[@class="pdp-product-brand"]'))
-            )
-            
-            try:
-                brand = wait(driver, 10).until(
-                    EC.presence_of_element_located((
-                        By.XPATH, '//div[contains(@class, "pdp-product-brand")]//a[contains(@class, "pdp-product-brand__brand-link")]'
-                    ))
-                ).text
-            except (TimeoutException, NoSuchElementException):
-                brand = None
-
-            # Store
-            try:
-                store = wait(driver, 10).until(
-                    EC.presence_of_element_located((
-                        By.XPATH, '//div[contains(@class, "seller-name__detail")]//a[contains(@class, "seller-name__detail-name")]'
-                    ))
-                ).text
-            except (TimeoutException, NoSuchElementException):
-                store = None
-
-            # Mapping
-            BASE64_TO_STAR = {
-                "ASUVORK5CYII=": 0.0,   # 0-star
-                "ElFTkSuQmCC":   0.5,   # 0.5-star
-                "BJRU5ErkJggg==": 1.0   # 1-star
-            }
-
-
-            rating_elements = driver.find_elements(By.CSS_SELECTOR, 'div.pdp-review-summary img.star')
-            total_stars = 0.0
-            for img in rating_elements:
-                img_src = img.get_attribute("src")
-                for base64_key, star_value in BASE64_TO_STAR.items():
-                    if base64_key in img_src:
-                        total_stars += star_value
-                        break
-            rating = total_stars
-
-
-
-        except (TimeoutException, NoSuchElementException):
-            pass
-        finally:
-            driver.close()
-            driver.switch_to.window(main_window)
-        # --- SELESAI BAGIAN PENGAMBILAN DESKRIPSI, TOKO, BRAND, DAN RATING ---
-
-        data = {
+        yield {
             'name': name,
             'price': price,
-            'store': store,
-            'brand': brand,
+            'store': None,
+            'brand': None,
             'location': location,
             'sold': sold,
-            'rating': rating,
+            'rating': 0.0,  # default rating 0
             'details_link': details_link,
-            'description': description
+            'description': None
         }
-        product_data.append(data)
 
-def main():
-    options = wb.ChromeOptions()
-    options.add_argument(f'user-agent={random.choice(USER_AGENTS)}')
-    driver = wb.Chrome(options=options)
-    driver.get('https://www.lazada.co.id/')
-    driver.implicitly_wait(5)
+def extract_data(driver, product_data, detail_pool=None, mode=EXTRACT_MODE, missing_fields=None,
+                 detail_cache=None, product_index=None):
+    """
+    Mengekstrak data dari produk-produk yang tampil di halaman saat ini.
+    Termasuk mengambil detail produk dengan membuka halaman produk secara terpisah.
+    
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver.
+        product_data (list): List untuk menyimpan data produk yang berhasil diambil.
+        detail_pool (DetailPool): Pool worker browser untuk halaman detail. Jika None,
+            detail dibuka satu per satu di tab baru pada driver utama.
+        mode (str): 'state' untuk state JSON halaman, 'script' untuk ekstraksi satu round trip,
+            'element' untuk find_element per field.
+        missing_fields (MissingFieldCounter): Penghitung field opsional yang kosong.
+        detail_cache (DetailCache): Cache detail di disk untuk jalur tab baru.
+        product_index (ProductIndex): Indeks produk yang sudah diambil; duplikat dilewati.
+
+    Return:
+        list: Future tugas detail yang dijadwalkan ke detail_pool untuk halaman ini.
+    """
+    # Mekanisme retry untuk memastikan elemen produk termuat dengan baik
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            scrolling(driver)
+            with metrics.phase('list_wait'):
+                data_items = wait(driver, 10).until(
+                    EC.visibility_of_all_elements_located((By.XPATH, CARD_XPATH))
+                )
+            break  # Jika berhasil, keluar dari loop retry
+        except TimeoutException:
+            metrics.count('timeout', 'list_wait')
+            if attempt == max_retries - 1:
+                raise
+            metrics.count('retry', 'list_wait')
+            driver.refresh()
+            time.sleep(3)
 
-    keywords = input("Keywords: ")
-    pages = int(input("Pages: "))
+    # Setelah gate eksplisit di atas, field opsional yang tidak ada langsung gagal
+    extraction_wait = 0 if ZERO_IMPLICIT_WAIT else IMPLICIT_WAIT
+    with implicit_wait(driver, extraction_wait):
+        rows = None
+        with metrics.phase('extract_cards'):
+            if mode == 'state':
+                try:
+                    rows = iter_cards_state(driver)
+                except JavascriptException as e:
+                    print(f"Ekstraksi state gagal ({e.msg}).")
+                    metrics.count('error', 'extract_state')
+                if rows is None:
+                    print("State halaman tidak mencakup semua kartu, kembali ke mode script.")
+                    metrics.count('fallback', 'extract_state')
+            if rows is None and mode in ('state', 'script'):
+                try:
+                    rows = list(iter_cards_script(driver))
+                except JavascriptException as e:
+                    print(f"Ekstraksi script gagal ({e.msg}), kembali ke mode per-elemen.")
+                    metrics.count('error', 'extract_script')
+            if rows is None:
+                rows = list(iter_cards_element(data_items))
+        metrics.count('skip', 'card', len(data_items) - len(rows))
 
-    # Cari elemen input pencarian dan masukkan kata kunci
-    search = driver.find_element(By.XPATH, '//input[@class="search-box__input--O34g"]')
-    search.send_keys(keywords)
-    search.send_keys(Keys.ENTER)
-    driver.implicitly_wait(5)
+        # Produk yang sudah diambil di halaman sebelumnya tidak dibuka lagi
+        if product_index is not None:
+            rows = product_index.filter_new(rows)
 
-    product_data = []
+        futures = []
+        for data in rows:
+            product_data.append(data)
+            if missing_fields is not None:
+                missing_fields.record(data)
 
-    for page in range(1, pages + 1):
-        print(f"\n--- Halaman {page} ---")
-        extract_data(driver, product_data)
+            # --- BAGIAN TAMBAHAN: PENGAMBILAN DESKRIPSI, TOKO, BRAND, DAN RATING PRODUK ---
+            if detail_pool is not None:
+                # Detail diambil oleh worker browser, baris diisi saat selesai
+                futures.append(detail_pool.submit(data, data['details_link']))
+            else:
+                data.update(fetch_in_new_tab(
+                    driver, data['details_link'], detail_fetcher(), detail_cache, DETAIL_FIELDS
+                ))
+            # --- SELESAI BAGIAN PENGAMBILAN DESKRIPSI, TOKO, BRAND, DAN RATING ---
+    return futures
 
+def search_url(keywords, page=1, sort=SEARCH_SORT):
+    """
+    URL halaman hasil pencarian ke-`page` (mulai 1) untuk keyword, mis.
+    search_url('moringa tea', 3) ->
+    'https://www.lazada.co.id/catalog/?q=moringa+tea&page=3'.
+
+    Parameter:
+        keywords (str): Kata kunci pencarian.
+        page (int): Nomor halaman hasil pencarian.
+        sort (str): Key SORT_OPTIONS (parameter sort), atau None untuk urutan default.
+    """
+    params = {'q': keywords, 'page': page}
+    if sort is not None:
+        params['sort'] = SORT_OPTIONS[sort]
+    return f"{SEARCH_URL}?{urlencode(params)}"
+
+def go_to_next_page(driver):
+    """
+    Klik tombol halaman berikutnya, dengan satu kali percobaan ulang setelah refresh.
+
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver.
+
+    Return:
+        bool: False jika gagal berpindah halaman.
+    """
+    try:
+        next_page = wait(driver, 20).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, '[aria-label="right"]'))
+        )
+        next_page.click()
+    except TimeoutException:
+        print("Tombol halaman berikutnya tidak ditemukan, mencoba ulang...")
+        driver.refresh()
+        time.sleep(2)
+        scrolling(driver)
         try:
             next_page = wait(driver, 20).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, '[aria-label="right"]'))
+                EC.element_to_be_clickable((By.CSS_SELECTOR, '[aria-label="Laman berikutnya"]'))
             )
             next_page.click()
-        except TimeoutException:
-            print("Tombol halaman berikutnya tidak ditemukan, mencoba ulang...")
-            driver.refresh()
-            time.sleep(2)
-            reverse_scrolling(driver)
-            try:
-                next_page = wait(driver, 20).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, '[aria-label="Laman berikutnya"]'))
-                )
-                next_page.click()
-            except:
-                print("Tidak dapat berpindah ke halaman berikutnya.")
-                break
         except:
-            print("Terjadi kesalahan saat mencoba pindah halaman.")
-            break
+            print("Tidak dapat berpindah ke halaman berikutnya.")
+            return False
+    except:
+        print("Terjadi kesalahan saat mencoba pindah halaman.")
+        return False
+    return True
+
+# Bagian khusus Lazada untuk loop halaman bersama (common/keyword_runner.py)
+SITE = KeywordSite(
+    name='lazada',
+    label='Lazada',
+    output_name='Lazada_Moringa',
+    home_url='https://www.lazada.co.id/',
+    search_xpath='//input[@class="search-box__input--O34g"]',
+    create_driver=create_driver,
+    scrolling=scrolling,
+    extract_data=extract_data,
+    search_url=search_url,
+    go_to_next_page=go_to_next_page,
+    detail_fetcher=detail_fetcher,
+    tab_detail=(TAB_DETAIL_JS, details_from_tab, TAB_DETAIL_ARGS),
+    detail_fields=DETAIL_FIELDS,
+    optional_fields=OPTIONAL_FIELDS,
+)
 
-    driver.quit()
+def scrape_keyword(keywords, pages, checkpoint, start_page=1, browser=BROWSER_PROFILE,
+                   detail_workers=DETAIL_WORKERS):
+    """
+    Scraping satu keyword di Lazada (lihat common.keyword_runner.scrape_keyword).
+    Dipakai oleh main() dan oleh batch runner.
+    """
+    return run_keyword(SITE, keywords, pages, checkpoint, start_page, browser, detail_workers)
 
-    df = pd.DataFrame(product_data)
-    now = datetime.datetime.today().strftime('%d-%m-%Y')
-    df.to_csv(f'Lazada_Moringa_{now}.csv', index=False)
-    df.to_excel(f'Lazada_Moringa_{now}.xlsx', index=False)
-    print(f"\nScraping selesai. File disimpan sebagai Lazada_{now}.csv dan Lazada_{now}.xlsx")
+def main(detail_workers=DETAIL_WORKERS):
+    run_cli(SITE, detail_workers)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
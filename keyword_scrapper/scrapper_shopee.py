@@ -1,239 +1,374 @@
+import os
+import sys
+import json
 import time
-import datetime
-import pandas as pd
+from urllib.parse import urlencode
 from tqdm import tqdm
 
 # Import library Selenium untuk automasi browser
-from selenium import webdriver as wb
-from selenium.webdriver import ActionChains
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait as wait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, JavascriptException
+
+# Tambahkan root repo ke sys.path agar modul bersama di common/ dapat diimpor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.detail_pool import fetch_in_new_tab
+from common.js_extract import extract_cards_script
+from common.scrolling import adaptive_scroll, format_report
+from common.fields import implicit_wait
+from common.browser import build_driver
+from common.metrics import metrics
+from common.keyword_runner import (
+    KeywordSite, run_cli, scrape_keyword as run_keyword, BROWSER_PROFILE, DETAIL_WORKERS,
+    IMPLICIT_WAIT, ZERO_IMPLICIT_WAIT, SCROLL_MAX_TIME, SEARCH_SORT,
+)
+
+# Field detail yang harus segar di cache detail agar halaman detail tidak dibuka lagi
+DETAIL_FIELDS = ('description', 'store')
+
+# Field opsional kartu produk yang dihitung jika kosong
+OPTIONAL_FIELDS = ('sold',)
+
+# Mode ekstraksi kartu: 'script' (satu execute_script per halaman) atau
+# 'element' (find_element per field, jalur lama sebagai fallback)
+EXTRACT_MODE = 'script'
+
+# Halaman hasil pencarian dan parameter urutan (sortBy/order) untuk search_url
+SEARCH_URL = 'https://shopee.co.id/search'
+SORT_OPTIONS = {
+    'relevance': {'sortBy': 'relevancy'},
+    'newest': {'sortBy': 'ctime'},
+    'sales': {'sortBy': 'sales'},
+    'price_asc': {'sortBy': 'price', 'order': 'asc'},
+    'price_desc': {'sortBy': 'price', 'order': 'desc'},
+}
+
+# Selector kartu produk di halaman hasil pencarian
+CARD_XPATH = '//li[contains(@class, "col-xs-2-4 shopee-search-item-result__item")]'
+CARD_SELECTORS = {
+    'name': './/div[@class="line-clamp-2 break-words min-w-0 min-h-[2.5rem] text-sm"]',
+    'price': './/span[@class="font-medium text-base/5 truncate"]',
+    'discount': './/div[@class="text-shopee-primary font-medium bg-shopee-pink py-0.5 px-1 text-sp10/3 h-4 rounded-[2px] shrink-0 mr-1"]',
+    'location': './/span[@class="ml-[3px] align-middle"]',
+    'rating': './/div[@class="text-shopee-black87 text-xs/sp14 flex-none"]',
+    'details_link': './/a',
+    'sold': './/span[@class="se8WAnkjbVXZNA8mT+Veuw=="]',
+}
+CARD_ATTRIBUTES = {'details_link': 'href'}
 
 def scrolling(driver):
     """
-    Melakukan scroll perlahan ke bawah halaman agar elemen-elemen termuat dengan baik.
-    
+    Scroll adaptif sampai jumlah kartu produk tidak bertambah lagi (maksimal
+    SCROLL_MAX_TIME detik), lalu mencetak jumlah langkah dan detik yang dibutuhkan.
+
     Parameter:
         driver (webdriver): Instance dari Selenium WebDriver.
+
+    Return:
+        ScrollReport: Ringkasan scroll untuk halaman ini.
+    """
+    report = adaptive_scroll(driver, (By.XPATH, CARD_XPATH), max_time=SCROLL_MAX_TIME)
+    print(format_report(report))
+    return report
+
+def fetch_details(driver):
     """
-    scheight = 0.1
-    while scheight < 9.9:
-        # Scroll ke posisi tertentu berdasarkan perhitungan tinggi halaman
-        driver.execute_script(
-            "window.scrollTo(0, document.body.scrollHeight / {});".format(scheight)
+    Mengambil deskripsi dan nama toko dari halaman detail produk yang sedang terbuka.
+
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver yang sudah membuka halaman detail.
+    """
+    details = {'description': None, 'store': None}
+    try:
+        # Tunggu hingga elemen detail produk dan nama toko termuat
+        wait(driver, 10).until(
+            EC.visibility_of_element_located((By.XPATH, '//p[@class="QN2lPu"]'))
         )
-        time.sleep(0.3)
-        scheight += 0.1
 
-def reverse_scrolling(driver):
+        wait(driver, 10).until(
+            EC.visibility_of_element_located((By.XPATH, '//div[@class="FV3T1n"]'))
+        )
+
+        # Ambil teks deskripsi produk
+        details['description'] = driver.find_element(By.XPATH, '//p[@class="QN2lPu"]').text
+        details['store'] = driver.find_element(By.XPATH, '//div[@class="FV3T1n"]').text
+
+    except (TimeoutException, NoSuchElementException):
+        # Jika gagal mengambil deskripsi, tetap biarkan nilainya None
+        metrics.count('timeout', 'detail_fetch')
+    return details
+
+# Script detail untuk mesin tab (TabDetailPool): deskripsi dan nama toko dari DOM,
+# null selama salah satunya belum termuat.
+#   arguments[0]: selector deskripsi, arguments[1]: selector nama toko
+TAB_DETAIL_JS = """
+var description = document.querySelector(arguments[0]);
+var store = document.querySelector(arguments[1]);
+if (!description || !store) { return null; }
+return JSON.stringify({description: description.innerText, store: store.innerText});
+"""
+TAB_DETAIL_ARGS = ('p[class="QN2lPu"]', 'div[class="FV3T1n"]')
+
+def details_from_tab(raw):
     """
-    Melakukan scroll dengan cara menekan tombol PAGE_DOWN secara berulang agar elemen-elemen tampil sempurna.
-    
+    Detail dari hasil TAB_DETAIL_JS (selalu lengkap jika tidak null).
+    """
+    return json.loads(raw)
+
+def card_to_row(card):
+    """
+    Menyusun dict produk dari field mentah hasil extract_cards_script dengan aturan
+    yang sama seperti jalur per-elemen.
+
     Parameter:
-        driver (webdriver): Instance dari Selenium WebDriver.
+        card (dict): Field mentah satu kartu produk.
+
+    Return:
+        dict atau None jika salah satu field wajib tidak ditemukan.
     """
-    body = driver.find_element(By.TAG_NAME, 'body')
-    for _ in range(25):
-        body.send_keys(Keys.PAGE_DOWN)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(0.5)
+    required = ('name', 'price', 'discount', 'location', 'rating', 'details_link')
+    if any(card[field] is None for field in required):
+        return None
+    return {
+        'name': card['name'],
+        'price': card['price'],
+        'discount' : card['discount'],
+        'store': None,
+        'location': card['location'],
+        'sold': card['sold'],
+        'rating' : card['rating'],
+        'details_link': card['details_link'],
+        'description': None  # Inisialisasi default jika tidak ditemukan
+    }
 
-def extract_data(driver, product_data):
+def iter_cards_script(driver):
     """
-    Mengekstrak data dari produk-produk yang tampil di halaman saat ini.
-    Termasuk mengambil detail produk dengan membuka halaman produk secara terpisah.
-    
+    Membaca seluruh kartu produk di halaman dengan satu panggilan execute_script.
+
     Parameter:
         driver (webdriver): Instance dari Selenium WebDriver.
-        product_data (list): List untuk menyimpan data produk yang berhasil diambil.
     """
-    # Mekanisme retry untuk memastikan elemen produk termuat dengan baik
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            # Lakukan scroll untuk memuat elemen
-            scrolling(driver)
-            # Tunggu hingga semua elemen produk terlihat di halaman
-            data_items = wait(driver, 10).until(
-                EC.visibility_of_all_elements_located((By.XPATH, '//li[contains(@class, "col-xs-2-4 shopee-search-item-result__item")]'))
-            )
-            break  # Jika berhasil, keluar dari loop retry
-        except TimeoutException:
-            if attempt == max_retries - 1:
-                raise
-            driver.refresh()
-            time.sleep(3)
+    cards = extract_cards_script(driver, CARD_XPATH, CARD_SELECTORS, CARD_ATTRIBUTES)
+    for card in cards:
+        row = card_to_row(card)
+        if row is not None:
+            yield row
+
+def iter_cards_element(data_items):
+    """
+    Membaca kartu produk satu per satu dengan find_element (jalur fallback).
 
-    # Proses setiap produk yang ditemukan
+    Parameter:
+        data_items (list): Elemen kartu produk yang sudah terlihat di halaman.
+    """
     for item in tqdm(data_items, desc="Memproses produk"):
         # Ambil nama produk
         try:
-            name = item.find_element(
-                By.XPATH,
-                './/div[@class="line-clamp-2 break-words min-w-0 min-h-[2.5rem] text-sm"]'
-            ).text
+            name = item.find_element(By.XPATH, CARD_SELECTORS['name']).text
         except Exception:
             continue
         
         # Ambil harga produk
         try:
-            price = item.find_element(
-                By.XPATH,
-                './/span[@class="font-medium text-base/5 truncate"]'
-            ).text
+            price = item.find_element(By.XPATH, CARD_SELECTORS['price']).text
         except Exception:
             continue
         
         # Ambil diskon produk
         try:
-            discount = item.find_element(
-                By.XPATH,
-                './/div[@class="text-shopee-primary font-medium bg-shopee-pink py-0.5 px-1 text-sp10/3 h-4 rounded-[2px] shrink-0 mr-1"]'
-            ).text
+            discount = item.find_element(By.XPATH, CARD_SELECTORS['discount']).text
         except Exception:
             continue
         
         # Ambil lokasi produk
         try:
-            location = item.find_element(
-                By.XPATH,
-                './/span[@class="ml-[3px] align-middle"]'
-            ).text
+            location = item.find_element(By.XPATH, CARD_SELECTORS['location']).text
         except Exception:
             continue
         
         # Ambil rating produk
         try:
-            rating = item.find_element(
-                By.XPATH,
-                './/div[@class="text-shopee-black87 text-xs/sp14 flex-none"]'
-            ).text
+            rating = item.find_element(By.XPATH, CARD_SELECTORS['rating']).text
         except Exception:
             continue
         
         # Ambil link detail produk
         try:
-            link_element = item.find_element(By.XPATH, './/a')
+            link_element = item.find_element(By.XPATH, CARD_SELECTORS['details_link'])
             details_link = link_element.get_attribute('href')
         except Exception:
             continue
 
         # Ambil jumlah produk yang terjual
         try:
-            sold = item.find_element(
-                By.XPATH, './/span[@class="se8WAnkjbVXZNA8mT+Veuw=="]'
-            ).text
+            sold = item.find_element(By.XPATH, CARD_SELECTORS['sold']).text
         except Exception:
             sold = None
 
-        # --- BAGIAN TAMBAHAN: PENGAMBILAN DESKRIPSI PRODUK ---
-        description = None  # Inisialisasi default jika tidak ditemukan
-        store = None
-
-        # Simpan handle tab utama agar bisa kembali setelah membuka tab baru
-        main_window = driver.current_window_handle
-
-        try:
-            # Buka link detail produk di tab baru
-            driver.execute_script(f"window.open('{details_link}','_blank');")
-            driver.switch_to.window(driver.window_handles[-1])
-
-            # Tunggu hingga elemen detail produk dan nama toko termuat
-            wait(driver, 10).until(
-                EC.visibility_of_element_located((By.XPATH, '//p[@class="QN2lPu"]'))
-            )
-            
-            wait(driver, 10).until(
-                EC.visibility_of_element_located((By.XPATH, '//div[@class="FV3T1n"]'))
-            )
-
-            # Ambil teks deskripsi produk
-            description = driver.find_element(By.XPATH, '//p[@class="QN2lPu"]').text
-            store = driver.find_element(By.XPATH, '//div[@class="FV3T1n"]').text
-
-        except (TimeoutException, NoSuchElementException):
-            # Jika gagal mengambil deskripsi, tetap biarkan nilainya None
-            pass
-        finally:
-            # Tutup tab detail dan kembali ke tab utama
-            driver.close()
-            driver.switch_to.window(main_window)
-        # --- SELESAI BAGIAN PENGAMBILAN DESKRIPSI ---
-
-        # Simpan data produk ke dalam list
-        data = {
+        yield {
             'name': name,
             'price': price,
             'discount' : discount,
-            'store': store,
+            'store': None,
             'location': location,
             'sold': sold,
             'rating' : rating,
             'details_link': details_link,
-            'description': description
+            'description': None  # Inisialisasi default jika tidak ditemukan
         }
-        product_data.append(data)
 
-def main():
+def extract_data(driver, product_data, detail_pool=None, mode=EXTRACT_MODE, missing_fields=None,
+                 detail_cache=None, product_index=None):
     """
-    Fungsi utama yang menginisiasi proses scraping data dari Shopee.
-    Melakukan inisiasi WebDriver, input kata kunci, navigasi antar halaman, dan menyimpan hasil scraping.
+    Mengekstrak data dari produk-produk yang tampil di halaman saat ini.
+    Termasuk mengambil detail produk dengan membuka halaman produk secara terpisah.
+    
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver.
+        product_data (list): List untuk menyimpan data produk yang berhasil diambil.
+        detail_pool (DetailPool): Pool worker browser untuk halaman detail. Jika None,
+            detail dibuka satu per satu di tab baru pada driver utama.
+        mode (str): 'script' untuk ekstraksi satu round trip, 'element' untuk find_element per field.
+        missing_fields (MissingFieldCounter): Penghitung field opsional yang kosong.
+        detail_cache (DetailCache): Cache detail di disk untuk jalur tab baru.
+        product_index (ProductIndex): Indeks produk yang sudah diambil; duplikat dilewati.
+
+    Return:
+        list: Future tugas detail yang dijadwalkan ke detail_pool untuk halaman ini.
+    """
+    # Mekanisme retry untuk memastikan elemen produk termuat dengan baik
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            # Lakukan scroll untuk memuat elemen
+            scrolling(driver)
+            # Tunggu hingga semua elemen produk terlihat di halaman
+            with metrics.phase('list_wait'):
+                data_items = wait(driver, 10).until(
+                    EC.visibility_of_all_elements_located((By.XPATH, CARD_XPATH))
+                )
+            break  # Jika berhasil, keluar dari loop retry
+        except TimeoutException:
+            metrics.count('timeout', 'list_wait')
+            if attempt == max_retries - 1:
+                raise
+            metrics.count('retry', 'list_wait')
+            driver.refresh()
+            time.sleep(3)
+
+    # Ambil field seluruh kartu; fallback ke per-elemen jika script gagal
+    # Setelah gate eksplisit di atas, field opsional yang tidak ada langsung gagal
+    extraction_wait = 0 if ZERO_IMPLICIT_WAIT else IMPLICIT_WAIT
+    with implicit_wait(driver, extraction_wait):
+        rows = None
+        with metrics.phase('extract_cards'):
+            if mode == 'script':
+                try:
+                    rows = list(iter_cards_script(driver))
+                except JavascriptException as e:
+                    print(f"Ekstraksi script gagal ({e.msg}), kembali ke mode per-elemen.")
+                    metrics.count('error', 'extract_script')
+            if rows is None:
+                rows = list(iter_cards_element(data_items))
+        metrics.count('skip', 'card', len(data_items) - len(rows))
+
+        # Produk yang sudah diambil di halaman sebelumnya tidak dibuka lagi
+        if product_index is not None:
+            rows = product_index.filter_new(rows)
+
+        # Proses setiap produk yang ditemukan
+        futures = []
+        for data in rows:
+            product_data.append(data)
+            if missing_fields is not None:
+                missing_fields.record(data)
+
+            # --- BAGIAN TAMBAHAN: PENGAMBILAN DESKRIPSI PRODUK ---
+            if detail_pool is not None:
+                # Detail diambil oleh worker browser, baris diisi saat selesai
+                futures.append(detail_pool.submit(data, data['details_link']))
+            else:
+                data.update(fetch_in_new_tab(
+                    driver, data['details_link'], fetch_details, detail_cache, DETAIL_FIELDS
+                ))
+            # --- SELESAI BAGIAN PENGAMBILAN DESKRIPSI ---
+    return futures
+
+def search_url(keywords, page=1, sort=SEARCH_SORT):
     """
-    # Inisiasi Chrome WebDriver dan buka situs To Shopee
-    driver = wb.Chrome()
-    driver.get('https://shopee.co.id/')
-    driver.implicitly_wait(5)
+    URL halaman hasil pencarian ke-`page` (mulai 1) untuk keyword. Parameter page
+    Shopee dimulai dari 0, mis. search_url('moringa tea', 3) ->
+    'https://shopee.co.id/search?keyword=moringa+tea&page=2'.
 
-    # Input pencarian dari user
-    keywords = input("Keywords: ")
-    pages = int(input("Pages: "))
+    Parameter:
+        keywords (str): Kata kunci pencarian.
+        page (int): Nomor halaman hasil pencarian.
+        sort (str): Key SORT_OPTIONS (sortBy/order), atau None untuk urutan default.
+    """
+    params = {'keyword': keywords, 'page': page - 1}
+    if sort is not None:
+        params.update(SORT_OPTIONS[sort])
+    return f"{SEARCH_URL}?{urlencode(params)}"
 
-    # Cari elemen input pencarian dan masukkan kata kunci
-    search = driver.find_element(
-        By.XPATH, '//input[@class="shopee-searchbar-input__input"]'
-    )
-    search.send_keys(keywords)
-    search.send_keys(Keys.ENTER)
+def go_to_next_page(driver):
+    """
+    Navigasi ke halaman hasil pencarian berikutnya.
 
+    Return:
+        bool: False jika tombol tidak ditemukan/disabled atau klik gagal.
+    """
+    try:
+        next_page = wait(driver, 20).until(
+            EC.element_to_be_clickable((
+                By.CSS_SELECTOR,
+                'nav.shopee-page-controller a.shopee-icon-button.shopee-icon-button--right[aria-disabled="false"]'
+            ))
+        )
+        next_page.click()
+    except TimeoutException:
+        print("Tombol halaman berikutnya tidak ditemukan atau sedang disabled.")
+        return False
+    except Exception as e:
+        print(f"Terjadi kesalahan saat klik halaman berikutnya: {e}")
+        return False
+    return True
 
-    driver.implicitly_wait(5)
+# Bagian khusus Shopee untuk loop halaman bersama (common/keyword_runner.py).
+# Shopee hanya punya jalur detail DOM (fetch_details).
+SITE = KeywordSite(
+    name='shopee',
+    label='Shopee',
+    output_name='Shopee_Moringa_capsule',
+    home_url='https://shopee.co.id/',
+    search_xpath='//input[@class="shopee-searchbar-input__input"]',
+    create_driver=build_driver,
+    scrolling=scrolling,
+    extract_data=extract_data,
+    search_url=search_url,
+    go_to_next_page=go_to_next_page,
+    detail_fetcher=lambda: fetch_details,
+    tab_detail=(TAB_DETAIL_JS, details_from_tab, TAB_DETAIL_ARGS),
+    detail_fields=DETAIL_FIELDS,
+    optional_fields=OPTIONAL_FIELDS,
+)
 
-    product_data = []
+def scrape_keyword(keywords, pages, checkpoint, start_page=1, browser=BROWSER_PROFILE,
+                   detail_workers=DETAIL_WORKERS):
+    """
+    Scraping satu keyword di Shopee (lihat common.keyword_runner.scrape_keyword).
+    Dipakai oleh main() dan oleh batch runner.
+    """
+    return run_keyword(SITE, keywords, pages, checkpoint, start_page, browser, detail_workers)
 
-    # Looping untuk memproses setiap halaman hasil pencarian
-    for page in range(1, pages + 1):
-        print(f"\n--- Halaman {page} ---")
-        extract_data(driver, product_data)
-        
-        # Navigasi ke halaman berikutnya
-        try:
-            next_page = wait(driver, 20).until(
-                EC.element_to_be_clickable((
-                    By.CSS_SELECTOR,
-                    'nav.shopee-page-controller a.shopee-icon-button.shopee-icon-button--right[aria-disabled="false"]'
-                ))
-            )
-            next_page.click()
-        except TimeoutException:
-            print("Tombol halaman berikutnya tidak ditemukan atau sedang disabled.")
-            break
-        except Exception as e:
-            print(f"Terjadi kesalahan saat klik halaman berikutnya: {e}")
-            break
-
-
-    # Tutup driver setelah proses scraping selesai
-    driver.quit()
-
-    # Simpan data yang telah di-scrape ke dalam file CSV dan Excel
-    df = pd.DataFrame(product_data)
-    now = datetime.datetime.today().strftime('%d-%m-%Y')
-    df.to_csv(f'Shopee_Moringa_capsule_{now}.csv', index=False)
-    df.to_excel(f'Shopee_Moringa_capsule_{now}.xlsx', index=False)
-    print(f"\nScraping selesai. File disimpan sebagai Shopee_{now}.csv dan Shopee_{now}.xlsx")
+def main(detail_workers=DETAIL_WORKERS):
+    """
+    Fungsi utama yang menginisiasi proses scraping data dari Shopee. Setiap
+    halaman yang selesai langsung ditulis ke checkpoint; jalankan dengan
+    --resume untuk melanjutkan run yang terhenti.
+    """
+    run_cli(SITE, detail_workers)
 
 if __name__ == "__main__":
     main()
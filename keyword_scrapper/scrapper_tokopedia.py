@@ -1,70 +1,321 @@
+import os
+import sys
+import json
 import time
-import datetime
-import pandas as pd
+from urllib.parse import urlencode
 from tqdm import tqdm
 
-from selenium import webdriver as wb
 from selenium.webdriver import ActionChains
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait as wait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, JavascriptException
+
+# Tambahkan root repo ke sys.path agar modul bersama di common/ dapat diimpor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.detail_pool import fetch_in_new_tab
+from common.js_extract import extract_cards_script
+from common.page_state import read_page_state, resolve, match_visible
+from common.scrolling import adaptive_scroll, format_report
+from common.fields import implicit_wait
+from common.browser import build_driver
+from common.metrics import metrics
+from common.keyword_runner import (
+    KeywordSite, run_cli, scrape_keyword as run_keyword, BROWSER_PROFILE, DETAIL_WORKERS,
+    IMPLICIT_WAIT, ZERO_IMPLICIT_WAIT, SCROLL_MAX_TIME, SEARCH_SORT,
+)
+
+# Field detail yang harus segar di cache detail agar halaman detail tidak dibuka lagi
+DETAIL_FIELDS = ('description', 'rating')
+
+# Field opsional kartu produk yang dihitung jika kosong
+OPTIONAL_FIELDS = ('discounted_price', 'discount', 'sold')
+
+# Mode ekstraksi kartu: 'state' (cache Apollo window.__cache dibaca sekali per
+# halaman, tanpa hover), 'script' (satu execute_script per halaman) atau
+# 'element' (find_element per field). Jika state tidak mencakup semua kartu yang
+# terlihat, ekstraksi kembali ke 'script', lalu 'element'.
+EXTRACT_MODE = 'state'
+
+# Sumber detail produk: 'state' (deskripsi dan rating dari window.__cache halaman
+# detail, tanpa menunggu elemen) atau 'dom'. Jalur state kembali ke 'dom' jika
+# deskripsi tidak ada di state.
+DETAIL_SOURCE = 'state'
+
+# Nama objek state JSON yang dibaca dari halaman
+STATE_NAMES = ('__cache',)
+
+# Halaman hasil pencarian dan nilai parameter urutan (ob) untuk search_url
+SEARCH_URL = 'https://www.tokopedia.com/search'
+SORT_OPTIONS = {'relevance': '23', 'review': '5', 'newest': '9', 'price_asc': '3', 'price_desc': '4'}
+
+# Selector kartu produk di halaman hasil pencarian
+CARD_XPATH = '//div[contains(@class, "css-5wh65g")]'
+CARD_SELECTORS = {
+    'name': './/span[@class="_0T8-iGxMpV6NEsYEhwkqEg=="]',
+    'discounted_price': './/div[contains(@class, "_67d6E1xDKIzw+i2D2L0tjw== ") and contains(@class, "t4jWW3NandT5hvCFAiotYg==")]',
+    'original_price': './/span[@class="q6wH9+Ht7LxnxrEgD22BCQ=="]',
+    'price': './/div[@class="_67d6E1xDKIzw+i2D2L0tjw== "]',
+    'discount': './/span[@class="vRrrC5GSv6FRRkbCqM7QcQ=="]',
+    'store': './/span[contains(@class,"T0rpy-LEwYNQifsgB-3SQw==")]',
+    'location': './/span[@class="pC8DMVkBZGW7-egObcWMFQ== flip"]',
+    'sold': './/span[@class="se8WAnkjbVXZNA8mT+Veuw=="]',
+    'details_link': './/a',
+}
+CARD_ATTRIBUTES = {'details_link': 'href'}
 
 def scrolling(driver):
-    scheight = 0.1
-    while scheight < 9.9:
-        driver.execute_script(
-            "window.scrollTo(0, document.body.scrollHeight / {});".format(scheight)
+    """
+    Scroll adaptif sampai jumlah kartu produk tidak bertambah lagi (maksimal
+    SCROLL_MAX_TIME detik), lalu mencetak jumlah langkah dan detik yang dibutuhkan.
+
+    Parameter:
+        driver (webdriver): Instance dari Selenium WebDriver.
+
+    Return:
+        ScrollReport: Ringkasan scroll untuk halaman ini.
+    """
+    report = adaptive_scroll(driver, (By.XPATH, CARD_XPATH), max_time=SCROLL_MAX_TIME)
+    print(format_report(report))
+    return report
+
+def fetch_details(driver):
+    """
+    Mengambil deskripsi dan rating dari halaman detail produk yang sedang terbuka.
+    """
+    details = {'description': None, 'rating': "0"}
+    try:
+        # Tunggu elemen detail
+        wait(driver, 10).until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, 'div.css-1wa8o67'))
         )
-        time.sleep(0.3)
-        scheight += 0.1
 
-def reverse_scrolling(driver):
-    body = driver.find_element(By.TAG_NAME, 'body')
-    for _ in range(25):
-        body.send_keys(Keys.PAGE_DOWN)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(0.5)
+        # Ambil deskripsi
+        try:
+            desc_element = driver.find_element(
+                By.CSS_SELECTOR,
+                'div.css-1wa8o67 span.css-11oczh8.eytdjj00'
+            )
+            details['description'] = desc_element.text
+        except (NoSuchElementException, TimeoutException):
+            pass
 
-def extract_data(driver, product_data):
-    max_retries = 3
-    for attempt in range(max_retries):
+        # Ambil rating
         try:
-            scrolling(driver)
-            data_items = wait(driver, 10).until(
-                EC.visibility_of_all_elements_located(
-                    (By.XPATH, '//div[contains(@class, "css-5wh65g")]')
-                )
+            rating_element = driver.find_element(
+                By.XPATH,
+                '//span[@class="main" and @data-testid="lblPDPDetailProductRatingNumber"]'
             )
-            break
-        except TimeoutException:
-            if attempt == max_retries - 1:
-                raise
-            driver.refresh()
-            time.sleep(3)
+            details['rating'] = rating_element.text
+        except NoSuchElementException:
+            details['rating'] = "0"
+
+    except (TimeoutException, NoSuchElementException):
+        # Gagal memuat halaman detail atau elemen rating
+        metrics.count('timeout', 'detail_fetch')
+    return details
+
+# Script detail untuk mesin tab (TabDetailPool): entri state Apollo halaman detail
+# yang dibaca details_from_state (konten 'Deskripsi' dan statistik rating) jika
+# sudah ada, plus teks deskripsi dan rating dari DOM sebagai cadangan. Hanya entri
+# itu yang di-serialize, bukan seluruh cache, karena script dipolling berulang
+# kali. null selama keduanya belum termuat sehingga tab terus dipolling.
+#   arguments[0]: nama objek state, arguments[1]: selector deskripsi,
+#   arguments[2]: selector rating
+TAB_DETAIL_JS = """
+var cache = window[arguments[0]] || {}, state = null;
+Object.keys(cache).forEach(function (key) {
+    var entry = cache[key];
+    if (!entry || typeof entry !== 'object') { return; }
+    if (entry.title === 'Deskripsi' && entry.subtitle) {
+        state = state || {};
+        state[key] = {title: entry.title, subtitle: entry.subtitle};
+    } else if ('countReview' in entry) {
+        state = state || {};
+        state[key] = {countReview: entry.countReview, rating: entry.rating};
+    }
+});
+var description = document.querySelector(arguments[1]);
+if (!state && !description) { return null; }
+var rating = document.querySelector(arguments[2]);
+return JSON.stringify({
+    state: state,
+    description: description ? description.innerText : null,
+    rating: rating ? rating.innerText : null
+});
+"""
+TAB_DETAIL_ARGS = (
+    STATE_NAMES[0],
+    'div.css-1wa8o67 span.css-11oczh8.eytdjj00',
+    'span.main[data-testid="lblPDPDetailProductRatingNumber"]',
+)
+
+def details_from_tab(raw):
+    """
+    Detail dari hasil TAB_DETAIL_JS: state lebih dulu, lalu teks DOM. Mengembalikan
+    None jika deskripsi belum ada (tab belum siap).
+    """
+    page = json.loads(raw)
+    details = details_from_state(page['state'] or {})
+    if details['description'] is None and page['description']:
+        details = {'description': page['description'], 'rating': page['rating'] or "0"}
+    return details if details['description'] is not None else None
+
+def details_from_state(cache):
+    """
+    Deskripsi dan rating dari cache Apollo halaman detail: konten berjudul
+    'Deskripsi' (komponen product_detail pdpGetLayout) dan statistik produk
+    (rating + countReview).
+    """
+    details = {'description': None, 'rating': "0"}
+    for entry in cache.values():
+        if not isinstance(entry, dict):
+            continue
+        if details['description'] is None and entry.get('title') == 'Deskripsi' and entry.get('subtitle'):
+            details['description'] = entry['subtitle']
+        elif 'countReview' in entry and entry.get('rating') not in (None, ''):
+            details['rating'] = str(entry['rating'])
+    return details
+
+def fetch_details_state(driver):
+    """
+    Mengambil deskripsi dan rating dari state JSON halaman detail yang sedang
+    terbuka dengan satu execute_script. Kembali ke fetch_details (DOM) jika
+    deskripsi tidak ada di state.
+    """
+    try:
+        cache = read_page_state(driver, STATE_NAMES).get('__cache') or {}
+    except JavascriptException:
+        cache = {}
+    details = details_from_state(cache)
+    if details['description'] is None:
+        metrics.count('fallback', 'detail_state')
+        return fetch_details(driver)
+    return details
+
+def state_to_rows(cache):
+    """
+    Menyusun baris produk dari cache Apollo halaman hasil pencarian
+    (window.__cache): entri produk punya name, url, price dan shop; shop, price
+    dan labelGroups bisa berupa referensi ke entri lain. Lokasi toko langsung
+    tersedia di shop.city sehingga tidak perlu hover.
+    """
+    rows = []
+    for entry in cache.values():
+        if not isinstance(entry, dict) or not all(entry.get(f) for f in ('name', 'url', 'shop', 'price')):
+            continue
+        shop = resolve(cache, entry['shop'])
+        price = resolve(cache, entry['price'])
+        if isinstance(price, dict):
+            # searchProductV5: price {text, original, discountPercentage}
+            text, original, discount = price.get('text'), price.get('original'), price.get('discountPercentage')
+        else:
+            # ace_search_product_v4: price, originalPrice, discountPercentage di entri produk
+            text, original, discount = price, entry.get('originalPrice'), entry.get('discountPercentage')
+        if not isinstance(shop, dict) or not (text and shop.get('name') and shop.get('city')):
+            continue
 
+        sold = None
+        for label in entry.get('labelGroups') or []:
+            label = resolve(cache, label)
+            title = label.get('title') or '' if isinstance(label, dict) else ''
+            if 'terjual' in title.lower():
+                sold = title
+                break
+
+        discounted = bool(discount) and bool(original) and original != text
+        rows.append({
+            'name': entry['name'],
+            'original_price': original if discounted else text,
+            'discounted_price' : text if discounted else None,
+            'discount' : f"{discount}%" if discounted else None,
+            'store': shop['name'],
+            'location': shop['city'],
+            'sold': sold,
+            'details_link': entry['url'],
+            'description': None,
+            'rating': "0"  # Default rating = 0 jika tidak ditemukan
+        })
+    return rows
+
+def iter_cards_state(driver):
+    """
+    Membaca kartu produk dari state JSON halaman (satu execute_script untuk state
+    dan satu untuk link kartu yang terlihat). Mengembalikan None jika state tidak
+    mencakup semua kartu (mis. state basi setelah pindah halaman client-side).
+    """
+    cache = read_page_state(driver, STATE_NAMES).get('__cache') or {}
+    rows = state_to_rows(cache)
+    if not rows:
+        return None
+    links = [card['details_link'] for card in extract_cards_script(
+        driver, CARD_XPATH, {'details_link': CARD_SELECTORS['details_link']}, CARD_ATTRIBUTES
+    ) if card['details_link']]
+    return match_visible(rows, links)
+
+def card_to_row(card):
+    """
+    Menyusun dict produk dari field mentah hasil extract_cards_script dengan aturan
+    yang sama seperti jalur per-elemen. Mengembalikan None jika field wajib kosong.
+    """
+    if any(card[field] is None for field in ('name', 'store', 'location', 'details_link')):
+        return None
+
+    if card['discounted_price'] is not None and card['original_price'] is not None:
+        discounted_price = card['discounted_price']
+        original_price = card['original_price']
+    elif card['price'] is not None:
+        # Jika tidak ada diskon, harga normal diambil dari <div>
+        original_price = card['price']
+        discounted_price = None
+    else:
+        return None
+
+    return {
+        'name': card['name'],
+        'original_price': original_price,
+        'discounted_price' : discounted_price,
+        'discount' : card['discount'],
+        'store': card['store'],
+        'location': card['location'],
+        'sold': card['sold'],
+        'details_link': card['details_link'],
+        'description': None,
+        'rating': "0"  # Default rating = 0 jika tidak ditemukan
+    }
+
+def iter_cards_script(driver):
+    """
+    Membaca seluruh kartu produk dengan satu panggilan execute_script.
+    """
+    cards = extract_cards_script(
+        driver, CARD_XPATH, CARD_SELECTORS, CARD_ATTRIBUTES, hover=CARD_SELECTORS['store']
+    )
+    for card in cards:
+        row = card_to_row(card)
+        if row is not None:
+            yield row
+
+def iter_cards_element(driver, data_items, product_index=None):
+    """
+    Membaca kartu produk satu per satu dengan find_element (jalur fallback).
+    Jika product_index diberikan, kartu produk yang sudah pernah diambil
+    dilewati sebelum hover.
+    """
     for item in tqdm(data_items, desc="Memproses produk"):
         try:
-            name = item.find_element(
-                By.XPATH, './/span[@class="_0T8-iGxMpV6NEsYEhwkqEg=="]'
-            ).text
+            name = item.find_element(By.XPATH, CARD_SELECTORS['name']).text
         except:
             continue
         
         try:
             # Coba ambil harga diskon
-            discounted_elem = item.find_element(
-                By.XPATH,
-                './/div[contains(@class, "_67d6E1xDKIzw+i2D2L0tjw== ") and contains(@class, "t4jWW3NandT5hvCFAiotYg==")]'
-            )
+            discounted_elem = item.find_element(By.XPATH, CARD_SELECTORS['discounted_price'])
             discounted_price = discounted_elem.text
 
             # Ambil harga normal dari elemen <span>
-            original_elem = item.find_element(
-                By.XPATH,
-                './/span[@class="q6wH9+Ht7LxnxrEgD22BCQ=="]'
-            )
+            original_elem = item.find_element(By.XPATH, CARD_SELECTORS['original_price'])
             original_price = original_elem.text
 
             # Gunakan harga diskon sebagai harga utama
@@ -72,102 +323,57 @@ def extract_data(driver, product_data):
 
         except NoSuchElementException:
             # Jika tidak ada diskon, ambil harga normal dari <div>
-            normal_elem = item.find_element(
-                By.XPATH,
-                './/div[@class="_67d6E1xDKIzw+i2D2L0tjw== "]'
-            )
+            normal_elem = item.find_element(By.XPATH, CARD_SELECTORS['price'])
             price = normal_elem.text
             original_price = price
             discounted_price = None
             
         try:
-            discount = item.find_element(
-                By.XPATH, './/span[@class="vRrrC5GSv6FRRkbCqM7QcQ=="]'
-            ).text
+            discount = item.find_element(By.XPATH, CARD_SELECTORS['discount']).text
         except:
             discount = None
 
         try:
-            store_element = wait(item, 5).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, './/span[contains(@class,"T0rpy-LEwYNQifsgB-3SQw==")]')
+            if ZERO_IMPLICIT_WAIT:
+                store_element = item.find_element(By.XPATH, CARD_SELECTORS['store'])
+            else:
+                store_element = wait(item, 5).until(
+                    EC.presence_of_element_located((By.XPATH, CARD_SELECTORS['store']))
                 )
-            )
             store = store_element.text
         except:
             continue
 
         try:
-            actions = ActionChains(driver)
-            actions.move_to_element(store_element).perform()
-            time.sleep(1)
+            link_element = item.find_element(By.XPATH, CARD_SELECTORS['details_link'])
+            details_link = link_element.get_attribute('href')
         except:
             continue
 
-        try:
-            location_element = item.find_element(
-                By.XPATH, './/span[@class="pC8DMVkBZGW7-egObcWMFQ== flip"]'
-            )
-            location = location_element.text
-        except:
+        if product_index is not None and not product_index.is_new(details_link):
+            product_index.count_duplicate()
             continue
 
         try:
-            sold = item.find_element(
-                By.XPATH, './/span[@class="se8WAnkjbVXZNA8mT+Veuw=="]'
-            ).text
+            with metrics.phase('hover'):
+                actions = ActionChains(driver)
+                actions.move_to_element(store_element).perform()
+                time.sleep(1)
         except:
-            sold = None
+            continue
 
         try:
-            link_element = item.find_element(By.XPATH, './/a')
-            details_link = link_element.get_attribute('href')
+            location_element = item.find_element(By.XPATH, CARD_SELECTORS['location'])
+            location = location_element.text
         except:
             continue
 
-        # --- BAGIAN BUKA DETAIL PRODUK ---
-        description = None
-        rating = "0"  # Default rating = 0 jika tidak ditemukan
-        main_window = driver.current_window_handle
-
         try:
-            driver.execute_script(f"window.open('{details_link}','_blank');")
-            driver.switch_to.window(driver.window_handles[-1])
-
-            # Tunggu elemen detail
-            wait(driver, 10).until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, 'div.css-1wa8o67'))
-            )
-
-            # Ambil deskripsi
-            try:
-                desc_element = driver.find_element(
-                    By.CSS_SELECTOR,
-                    'div.css-1wa8o67 span.css-11oczh8.eytdjj00'
-                )
-                description = desc_element.text
-            except (NoSuchElementException, TimeoutException):
-                pass
-
-            # Ambil rating
-            try:
-                rating_element = driver.find_element(
-                    By.XPATH,
-                    '//span[@class="main" and @data-testid="lblPDPDetailProductRatingNumber"]'
-                )
-                rating = rating_element.text
-            except NoSuchElementException:
-                rating = "0"
-
-        except (TimeoutException, NoSuchElementException):
-            # Gagal memuat halaman detail atau elemen rating
-            pass
-        finally:
-            driver.close()
-            driver.switch_to.window(main_window)
-        # --- SELESAI BAGIAN DETAIL ---
+            sold = item.find_element(By.XPATH, CARD_SELECTORS['sold']).text
+        except:
+            sold = None
 
-        data = {
+        yield {
             'name': name,
             'original_price': original_price,
             'discounted_price' : discounted_price,
@@ -176,33 +382,112 @@ def extract_data(driver, product_data):
             'location': location,
             'sold': sold,
             'details_link': details_link,
-            'description': description,
-            'rating': rating
+            'description': None,
+            'rating': "0"  # Default rating = 0 jika tidak ditemukan
         }
-        product_data.append(data)
 
-def main():
-    driver = wb.Chrome()
-    driver.get('https://www.tokopedia.com/')
-    driver.implicitly_wait(5)
+def detail_fetcher():
+    """
+    Fungsi pengambil detail sesuai DETAIL_SOURCE.
+    """
+    return fetch_details_state if DETAIL_SOURCE == 'state' else fetch_details
 
-    keywords = input("Keywords: ")
-    pages = int(input("Pages: "))
+def extract_data(driver, product_data, detail_pool=None, mode=EXTRACT_MODE, missing_fields=None,
+                 detail_cache=None, product_index=None):
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            scrolling(driver)
+            with metrics.phase('list_wait'):
+                data_items = wait(driver, 10).until(
+                    EC.visibility_of_all_elements_located((By.XPATH, CARD_XPATH))
+                )
+            break
+        except TimeoutException:
+            metrics.count('timeout', 'list_wait')
+            if attempt == max_retries - 1:
+                raise
+            metrics.count('retry', 'list_wait')
+            driver.refresh()
+            time.sleep(3)
 
-    search = driver.find_element(
-        By.XPATH,
-        '//*[@id="header-main-wrapper"]/div[2]/div[2]/div/div/div/div/input'
-    )
-    search.send_keys(keywords)
-    search.send_keys(Keys.ENTER)
-    driver.implicitly_wait(5)
+    # Setelah gate eksplisit di atas, field opsional yang tidak ada langsung gagal
+    extraction_wait = 0 if ZERO_IMPLICIT_WAIT else IMPLICIT_WAIT
+    with implicit_wait(driver, extraction_wait):
+        rows = None
+        with metrics.phase('extract_cards'):
+            if mode == 'state':
+                try:
+                    rows = iter_cards_state(driver)
+                except JavascriptException as e:
+                    print(f"Ekstraksi state gagal ({e.msg}).")
+                    metrics.count('error', 'extract_state')
+                if rows is None:
+                    print("State halaman tidak mencakup semua kartu, kembali ke mode script.")
+                    metrics.count('fallback', 'extract_state')
+            if rows is None and mode in ('state', 'script'):
+                try:
+                    rows = list(iter_cards_script(driver))
+                except JavascriptException as e:
+                    print(f"Ekstraksi script gagal ({e.msg}), kembali ke mode per-elemen.")
+                    metrics.count('error', 'extract_script')
+            if rows is None:
+                rows = list(iter_cards_element(driver, data_items, product_index))
+        metrics.count('skip', 'card', len(data_items) - len(rows))
 
-    product_data = []
+        # Produk yang sudah diambil di halaman sebelumnya tidak dibuka lagi
+        if product_index is not None:
+            rows = product_index.filter_new(rows)
 
-    for page in range(1, pages + 1):
-        print(f"\n--- Halaman {page} ---")
-        extract_data(driver, product_data)
+        futures = []
+        for data in rows:
+            product_data.append(data)
+            if missing_fields is not None:
+                missing_fields.record(data)
 
+            # --- BAGIAN BUKA DETAIL PRODUK ---
+            if detail_pool is not None:
+                # Detail diambil oleh worker browser, baris diisi saat selesai
+                futures.append(detail_pool.submit(data, data['details_link']))
+            else:
+                data.update(fetch_in_new_tab(
+                    driver, data['details_link'], detail_fetcher(), detail_cache, DETAIL_FIELDS
+                ))
+            # --- SELESAI BAGIAN DETAIL ---
+    return futures
+
+def search_url(keywords, page=1, sort=SEARCH_SORT):
+    """
+    URL halaman hasil pencarian ke-`page` (mulai 1) untuk keyword, mis.
+    search_url('moringa tea', 3) ->
+    'https://www.tokopedia.com/search?st=product&q=moringa+tea&page=3'.
+
+    Parameter:
+        keywords (str): Kata kunci pencarian.
+        page (int): Nomor halaman hasil pencarian.
+        sort (str): Key SORT_OPTIONS (parameter ob), atau None untuk urutan default.
+    """
+    params = {'st': 'product', 'q': keywords, 'page': page}
+    if sort is not None:
+        params['ob'] = SORT_OPTIONS[sort]
+    return f"{SEARCH_URL}?{urlencode(params)}"
+
+def go_to_next_page(driver):
+    """
+    Klik tombol halaman berikutnya. Mengembalikan False jika gagal berpindah halaman.
+    """
+    try:
+        next_page = wait(driver, 20).until(
+            EC.element_to_be_clickable(
+                (By.CSS_SELECTOR, '[aria-label="Laman berikutnya"]')
+            )
+        )
+        next_page.click()
+    except TimeoutException:
+        print("Tombol halaman berikutnya tidak ditemukan, mencoba ulang...")
+        driver.refresh()
+        time.sleep(2)
+        scrolling(driver)
         try:
             next_page = wait(driver, 20).until(
                 EC.element_to_be_clickable(
@@ -210,32 +495,42 @@ def main():
                 )
             )
             next_page.click()
-        except TimeoutException:
-            print("Tombol halaman berikutnya tidak ditemukan, mencoba ulang...")
-            driver.refresh()
-            time.sleep(2)
-            reverse_scrolling(driver)
-            try:
-                next_page = wait(driver, 20).until(
-                    EC.element_to_be_clickable(
-                        (By.CSS_SELECTOR, '[aria-label="Laman berikutnya"]')
-                    )
-                )
-                next_page.click()
-            except:
-                print("Tidak dapat berpindah ke halaman berikutnya.")
-                break
         except:
-            print("Terjadi kesalahan saat mencoba pindah halaman.")
-            break
+            print("Tidak dapat berpindah ke halaman berikutnya.")
+            return False
+    except:
+        print("Terjadi kesalahan saat mencoba pindah halaman.")
+        return False
+    return True
+
+# Bagian khusus Tokopedia untuk loop halaman bersama (common/keyword_runner.py)
+SITE = KeywordSite(
+    name='tokopedia',
+    label='Tokopedia',
+    output_name='Tokopedia_Moringa',
+    home_url='https://www.tokopedia.com/',
+    search_xpath='//*[@id="header-main-wrapper"]/div[2]/div[2]/div/div/div/div/input',
+    create_driver=build_driver,
+    scrolling=scrolling,
+    extract_data=extract_data,
+    search_url=search_url,
+    go_to_next_page=go_to_next_page,
+    detail_fetcher=detail_fetcher,
+    tab_detail=(TAB_DETAIL_JS, details_from_tab, TAB_DETAIL_ARGS),
+    detail_fields=DETAIL_FIELDS,
+    optional_fields=OPTIONAL_FIELDS,
+)
 
-    driver.quit()
+def scrape_keyword(keywords, pages, checkpoint, start_page=1, browser=BROWSER_PROFILE,
+                   detail_workers=DETAIL_WORKERS):
+    """
+    Scraping satu keyword di Tokopedia (lihat common.keyword_runner.scrape_keyword).
+    Dipakai oleh main() dan oleh batch runner.
+    """
+    return run_keyword(SITE, keywords, pages, checkpoint, start_page, browser, detail_workers)
 
-    df = pd.DataFrame(product_data)
-    now = datetime.datetime.today().strftime('%d-%m-%Y')
-    df.to_csv(f'Tokopedia_Moringa_{now}.csv', index=False)
-    df.to_excel(f'Tokopedia_Moringa_{now}.xlsx', index=False)
-    print(f"\nScraping selesai. File disimpan sebagai Tokopedia_Moringa_{now}.csv dan Tokopedia_Moringa_{now}.xlsx")
+def main(detail_workers=DETAIL_WORKERS):
+    run_cli(SITE, detail_workers)
 
 if __name__ == "__main__":
     main()
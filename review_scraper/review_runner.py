@@ -0,0 +1,336 @@
+import os
+import sys
+import time
+import queue
+import argparse
+import datetime
+import threading
+from functools import partial
+
+# Tambahkan root repo ke sys.path agar modul bersama di common/ dapat diimpor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.checkpoint import Checkpoint
+from common.output import add_output_arguments, output_formats, export_jsonl
+from common.browser import add_browser_arguments, build_driver
+from common.driver_pool import ManagedDriver
+from common.network_capture import NetworkCapture
+from common.metrics import metrics
+from common.history import HistoryStore
+from common.work_queue import Lease, add_queue_arguments, open_queue, default_owner, worker_checkpoint_name
+
+import review_scraper
+import review_scraper2
+
+# Jumlah worker (masing-masing satu browser) yang mengambil produk dari antrean bersama
+REVIEW_WORKERS = 3
+
+# Batas waktu per produk (detik): pagination berhenti setelah batas ini, review yang
+# sudah terkumpul tetap ditulis. Jika worker masih macet HANG_GRACE detik setelahnya
+# (mis. driver.get tidak kembali), browsernya ditutup paksa dan dibuat ulang.
+PRODUCT_TIMEOUT = 300
+HANG_GRACE = 60
+
+# Implicit wait driver worker, sama dengan scraper review
+IMPLICIT_WAIT = 5
+
+# Simpan review run ini ke database riwayat (common/history.py)
+RECORD_HISTORY = True
+
+# Jenis item produk review di antrean kerja bersama (common/work_queue.py)
+QUEUE_KIND = 'review'
+
+def make_scraper(name, source, driver, watermarks=None):
+    """
+    Membuat fungsi scrape(url, deadline) untuk satu driver worker.
+
+    Parameter:
+        name (str): 'review_scraper' atau 'review_scraper2'.
+        source (str): Sumber review untuk review_scraper2 ('network' atau 'dom').
+        driver (webdriver): Driver milik worker.
+        watermarks (HistoryStore): Mode inkremental review_scraper2 (opsional).
+    """
+    if name == 'review_scraper':
+        return partial(review_scraper.scrape_product_reviews, driver)
+    if source == 'network':
+        capture = NetworkCapture(driver, review_scraper2.REVIEW_API_PATTERN)
+        return partial(review_scraper2.scrape_product_reviews_network, driver, capture=capture,
+                       watermarks=watermarks)
+    return partial(review_scraper2.scrape_product_reviews, driver, watermarks=watermarks)
+
+class ReviewRunner:
+    """
+    Menjalankan scraping review banyak produk secara paralel dengan sejumlah
+    worker thread, masing-masing dengan satu browser, yang mengambil URL dari
+    antrean bersama. Review setiap produk langsung ditulis ke checkpoint begitu
+    produk selesai, sehingga produk dengan ribuan review tidak menahan produk lain
+    dan run bisa dilanjutkan dengan --resume.
+
+    Sebelum mengambil produk berikutnya, worker mengecek sesi browsernya lewat
+    ManagedDriver dan menggantinya jika sudah mati atau sudah memuat terlalu
+    banyak halaman review; paginasi satu produk tidak pernah terpotong recycle.
+
+    Parameter:
+        scraper_factory (callable): Fungsi (driver) -> scrape(url, deadline=...).
+        driver_factory (callable): Fungsi pembuat WebDriver baru (menerima user_data_dir).
+        checkpoint (Checkpoint): Tujuan penulisan review.
+        workers (int): Jumlah worker browser.
+        product_timeout (float): Batas waktu per produk (detik).
+        slot (str): Nama slot profil persisten worker (lihat common/driver_pool.py).
+        work_queue (WorkQueue): Jika diisi, URL diklaim dari antrean kerja bersama
+            (bisa dibagi dengan proses/host lain) alih-alih dari product_links.
+    """
+
+    def __init__(self, scraper_factory, driver_factory, checkpoint, workers=REVIEW_WORKERS,
+                 product_timeout=PRODUCT_TIMEOUT, slot='review', work_queue=None):
+        self.scraper_factory = scraper_factory
+        self.driver_factory = driver_factory
+        self.checkpoint = checkpoint
+        self.workers = workers
+        self.product_timeout = product_timeout
+        self.slot = slot
+        self.work_queue = work_queue
+        self.done = set()
+        self.failed = set()
+        self.results = []
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._active = {}
+
+    def _record(self, worker, url, reviews, seconds, status):
+        with self._lock:
+            # Hanya produk yang selesai normal masuk done_links; produk timeout/error
+            # dicatat di failed_links dan diambil ulang oleh --resume
+            if status == 'ok':
+                self.done.add(url)
+                self.failed.discard(url)
+            else:
+                self.failed.add(url)
+            self.checkpoint.append(reviews, done_links=sorted(self.done),
+                                   failed_links=sorted(self.failed), last_link=url)
+            self.results.append({
+                'worker': worker,
+                'url': url,
+                'reviews': len(reviews),
+                'seconds': round(seconds, 1),
+                'status': status,
+            })
+
+    def _next(self, worker):
+        # URL berikutnya dari antrean lokal, atau klaim dari antrean kerja bersama
+        # beserta lease yang di-heartbeat selama produk dikerjakan
+        if self.work_queue is None:
+            try:
+                return self._queue.get_nowait(), None
+            except queue.Empty:
+                return None, None
+        item = self.work_queue.claim(QUEUE_KIND, owner=default_owner(worker))
+        if item is None:
+            return None, None
+        return item['key'], Lease(self.work_queue, item).start()
+
+    def _work(self, worker):
+        managed = ManagedDriver(self.driver_factory, self.slot, implicit_wait=IMPLICIT_WAIT)
+        driver = None
+        scrape = None
+        while True:
+            url, lease = self._next(worker)
+            if url is None:
+                break
+            start = time.monotonic()
+            deadline = start + self.product_timeout
+            try:
+                # Antar produk adalah titik aman untuk cek kesehatan/recycle browser
+                if managed.checkout() is not driver:
+                    driver = managed.driver
+                    scrape = self.scraper_factory(driver)
+                with self._lock:
+                    self._active[worker] = (driver, url, deadline)
+                reviews = scrape(url, deadline=deadline)
+                status = 'timeout' if time.monotonic() > deadline else 'ok'
+                managed.page_done(max((r.get('page') or 1 for r in reviews), default=1))
+            except Exception as e:
+                # Browser mati atau ditutup paksa oleh watchdog (request ke chromedriver
+                # putus di tengah jalan): buat ulang untuk produk berikutnya
+                print(f"[{worker}] gagal pada {url}: {e.__class__.__name__}")
+                metrics.count('error', 'product')
+                managed.quit('error')
+                driver = None
+                reviews = []
+                status = 'error'
+            with self._lock:
+                self._active.pop(worker, None)
+            if lease is not None and lease.lost:
+                # Produk sudah diklaim worker lain setelah lease habis: hasil ini dibuang
+                print(f"[{worker}] lease {url} hilang, review tidak disimpan.")
+                metrics.count('skip', 'lease_lost')
+                lease.stop()
+                continue
+            self._record(worker, url, reviews or [], time.monotonic() - start, status)
+            if lease is not None:
+                # Produk timeout tetap selesai (review yang terkumpul sudah ditulis)
+                if status == 'error':
+                    lease.fail('browser error')
+                else:
+                    lease.complete()
+
+        managed.quit()
+
+    def _watchdog(self):
+        # Menutup paksa browser worker yang macet melewati deadline + HANG_GRACE
+        now = time.monotonic()
+        with self._lock:
+            hung = [(worker, driver, url) for worker, (driver, url, deadline) in self._active.items()
+                    if now > deadline + HANG_GRACE]
+            for worker, _, _ in hung:
+                self._active.pop(worker, None)
+        for worker, driver, url in hung:
+            print(f"[{worker}] macet pada {url}, browser ditutup paksa.")
+            metrics.count('timeout', 'product_hang')
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def run(self, product_links, skip=()):
+        """
+        Memproses seluruh URL (kecuali yang ada di skip) dan menunggu semua worker.
+
+        Return:
+            float: Durasi run (detik).
+        """
+        self.done.update(skip)
+        if self.work_queue is None:
+            for url in product_links:
+                if url not in self.done:
+                    self._queue.put(url)
+            total = self._queue.qsize()
+        else:
+            # Perkiraan: proses lain bisa ikut mengklaim dari antrean yang sama
+            total = self.work_queue.pending(QUEUE_KIND)
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=self._work, args=(f'worker-{i + 1}',), name=f'review-{i + 1}')
+            for i in range(min(self.workers, total))
+        ]
+        for thread in threads:
+            thread.start()
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+            self._watchdog()
+            with self._lock:
+                finished = len(self.results)
+            print(f"\r{finished}/{total} produk selesai", end='', flush=True)
+        print()
+        return time.monotonic() - start
+
+    def report(self, seconds):
+        """
+        Tabel review per menit untuk setiap worker dan keseluruhan run.
+        """
+        lines = [f"{'worker':<10} {'produk':>7} {'review':>7} {'timeout':>8} {'error':>6} "
+                 f"{'detik':>8} {'review/mnt':>11}"]
+        for worker in sorted({r['worker'] for r in self.results}):
+            rows = [r for r in self.results if r['worker'] == worker]
+            reviews = sum(r['reviews'] for r in rows)
+            busy = sum(r['seconds'] for r in rows)
+            lines.append(
+                f"{worker:<10} {len(rows):>7} {reviews:>7} "
+                f"{sum(1 for r in rows if r['status'] == 'timeout'):>8} "
+                f"{sum(1 for r in rows if r['status'] == 'error'):>6} {busy:>8.1f} "
+                f"{(reviews / busy * 60 if busy else 0):>11.1f}"
+            )
+        total_reviews = sum(r['reviews'] for r in self.results)
+        lines.append(
+            f"Total: {total_reviews} review dari {len(self.results)} produk dalam {seconds:.1f} detik "
+            f"({total_reviews / seconds * 60 if seconds else 0:.1f} review/menit)"
+        )
+        return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Scraping review banyak produk dari products.csv secara paralel."
+    )
+    parser.add_argument('--products', default='products.csv', help="File CSV berisi kolom 'url'.")
+    parser.add_argument('--scraper', choices=('review_scraper', 'review_scraper2'), default='review_scraper2',
+                        help="Jalur scraping per produk (default: review_scraper2).")
+    parser.add_argument('--source', choices=('network', 'dom'), default=review_scraper2.REVIEW_SOURCE,
+                        help="Sumber review untuk review_scraper2.")
+    parser.add_argument('--workers', type=int, default=REVIEW_WORKERS,
+                        help=f"Jumlah worker browser (default: {REVIEW_WORKERS}).")
+    parser.add_argument('--product-timeout', type=float, default=PRODUCT_TIMEOUT,
+                        help=f"Batas waktu per produk dalam detik (default: {PRODUCT_TIMEOUT}).")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Hanya ambil review yang lebih baru dari watermark run sebelumnya "
+                             "(review_scraper2).")
+    parser.add_argument('--resume', action='store_true',
+                        help="Lanjutkan run terakhir dari checkpoint.")
+    add_browser_arguments(parser, review_scraper2.BROWSER_PROFILE)
+    add_output_arguments(parser)
+    add_queue_arguments(parser)
+    args = parser.parse_args()
+    formats = output_formats(args)
+    if args.incremental and args.scraper != 'review_scraper2':
+        parser.error("--incremental hanya tersedia untuk --scraper review_scraper2")
+    work_queue = open_queue(args)
+
+    if work_queue is None or args.enqueue:
+        product_links = review_scraper2.load_product_links(args.products)
+        if not product_links:
+            print("Tidak ada link produk ditemukan. Periksa file CSV Anda.")
+            return
+    if args.enqueue:
+        added = work_queue.enqueue_many(QUEUE_KIND, [(url, None) for url in product_links], args.refresh)
+        print(f"{added} produk ditambahkan ke antrean {work_queue.path}: {work_queue.stats()}")
+        work_queue.close()
+        return
+    if work_queue is not None:
+        product_links = []
+
+    # Worker antrean memakai checkpoint sendiri per proses (tidak pernah di-reset);
+    # antrean yang menjadi catatan progres, jadi --resume tidak berlaku
+    if work_queue is not None:
+        checkpoint = Checkpoint(worker_checkpoint_name('review_runner'))
+        state = {}
+    else:
+        checkpoint = Checkpoint('review_runner')
+        state = checkpoint.load_state() if args.resume else {}
+        if args.resume and not state:
+            print("Checkpoint tidak ditemukan, memulai dari awal.")
+        if not state:
+            checkpoint.reset()
+
+    network = args.scraper == 'review_scraper2' and args.source == 'network'
+    watermarks = HistoryStore() if args.incremental else None
+    runner = ReviewRunner(
+        partial(make_scraper, args.scraper, args.source, watermarks=watermarks),
+        partial(build_driver, args.browser, performance_log=network),
+        checkpoint, args.workers, args.product_timeout, slot=f'review-{args.browser}',
+        work_queue=work_queue,
+    )
+    seconds = runner.run(product_links, skip=state.get('done_links', []))
+    print(runner.report(seconds))
+    if watermarks is not None:
+        watermarks.close()
+    if work_queue is not None:
+        print(f"Antrean {work_queue.path}: {work_queue.stats()}")
+        work_queue.close()
+
+    # Simpan hasil scraping dari checkpoint ke format output yang dipilih
+    now = datetime.datetime.today().strftime('%d-%m-%Y')
+    written = export_jsonl(checkpoint.rows_path, f'Product_Reviews_{now}', formats)
+    print(f"Scraping selesai. File disimpan sebagai {', '.join(written)}.")
+    if RECORD_HISTORY:
+        history = HistoryStore()
+        count = history.ingest_jsonl(checkpoint.rows_path, reviews=True)
+        history.close()
+        print(f"{count} review disimpan ke riwayat {history.path}")
+
+    # Ringkasan durasi per fase dan penghitung retry/timeout/skip
+    print(metrics.format_summary())
+    json_path, prom_path = metrics.write('review_runner')
+    print(f"Metrik disimpan ke {json_path} dan {prom_path}")
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,52 @@
+import os
+import sys
 import time
+import argparse
 import datetime
+from functools import partial
 import pandas as pd
 from tqdm import tqdm
 
-from selenium import webdriver as wb
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait as wait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
-def scrolling(driver):
-    """
-    Metode scroll yang membagi tinggi halaman secara bertahap.
-    Pendekatan: Menggunakan document.body.scrollHeight dibagi dengan nilai yang meningkat.
-    """
-    scheight = 0.1
-    while scheight < 9.9:
-        driver.execute_script(
-            "window.scrollTo(0, document.body.scrollHeight / {});".format(scheight)
-        )
-        time.sleep(0.3)
-        scheight += 0.1
-
-def reverse_scrolling(driver):
-    """
-    Metode scroll tambahan dengan mengirimkan perintah keyboard PAGE_DOWN 
-    untuk memastikan halaman bergulir ke bagian bawah.
-    """
-    body = driver.find_element(By.TAG_NAME, 'body')
-    for _ in range(25):
-        body.send_keys(Keys.PAGE_DOWN)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(0.5)
+# Tambahkan root repo ke sys.path agar modul bersama di common/ dapat diimpor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.scrolling import adaptive_scroll, format_report, wait_for_replacement
+from common.checkpoint import Checkpoint
+from common.output import add_output_arguments, output_formats, export_jsonl
+from common.browser import add_browser_arguments, build_driver
+from common.driver_pool import ManagedDriver
+from common.metrics import metrics
+from common.history import HistoryStore
+
+# Selector elemen review dan batas waktu scroll adaptif per halaman review (detik)
+REVIEW_CSS = "article.css-15m2bcr"
+SCROLL_MAX_TIME = 20
 
-def full_scrolling(driver):
+# Jalur cepat paginasi: setelah klik "Laman X", tunggu daftar review diganti
+# (elemen lama stale) dan baca tanpa scroll; scroll adaptif hanya jika jumlah
+# review lebih sedikit dari halaman pertama. False = sleep 2 detik + scroll ulang.
+FAST_PAGINATION = True
+
+# Profil browser (lihat common/browser.py): 'fast' memblokir gambar/media/font dan
+# tracker pihak ketiga dengan pageLoadStrategy eager; bisa diganti lewat --browser
+BROWSER_PROFILE = 'fast'
+
+# Simpan review run ini ke database riwayat (common/history.py)
+RECORD_HISTORY = True
+
+def scrolling(driver):
     """
-    Fungsi untuk menggabungkan kedua metode scrolling agar lebih maksimal.
+    Scroll adaptif: berhenti segera setelah jumlah elemen review tidak bertambah
+    lagi (maksimal SCROLL_MAX_TIME detik), lalu mencetak langkah dan detik yang dibutuhkan.
     """
-    scrolling(driver)
-    reverse_scrolling(driver)
+    report = adaptive_scroll(driver, (By.CSS_SELECTOR, REVIEW_CSS), max_time=SCROLL_MAX_TIME)
+    print(format_report(report))
+    return report
 
 def load_product_links(csv_file='products.csv'):
     """
@@ -53,50 +60,71 @@ def load_product_links(csv_file='products.csv'):
         print("Error reading product URLs:", e)
         return []
 
-def scrape_product_reviews(driver, product_url, timeout=10):
+def extract_reviews(driver, product_url, page):
+    """
+    Mengekstrak review dari halaman review yang sedang terbuka.
+    Mengembalikan None jika tidak ada elemen review sama sekali.
+    """
+    review_elements = driver.find_elements(By.CSS_SELECTOR, REVIEW_CSS)
+    if not review_elements:
+        return None
+
+    reviews = []
+    for elem in review_elements:
+        try:
+            text_elem = elem.find_element(By.CSS_SELECTOR, "p.css-cvmev1-unf-heading.e1qvo2ff8")
+            review_text = text_elem.text.strip()
+            if review_text:
+                reviews.append({
+                    'product_url': product_url,
+                    'page': page,
+                    'review': review_text
+                })
+        except NoSuchElementException:
+            continue
+    return reviews
+
+def scrape_product_reviews(driver, product_url, timeout=10, deadline=None):
     """
     Melakukan scraping review untuk satu produk berdasarkan URL yang diberikan.
     
     Proses:
       1. Buka URL produk dan tunggu kemunculan elemen review (<article class="css-15m2bcr">).
-      2. Lakukan full_scrolling() untuk memastikan semua elemen review termuat.
+      2. Lakukan scrolling() adaptif untuk memastikan semua elemen review termuat.
       3. Ekstrak review dengan selector <p class="css-cvmev1-unf-heading e1qvo2ff8">.
       4. Navigasi ke halaman review berikutnya melalui tombol 
-         <button class="css-5p3bh2-unf-pagination-item" aria-label="Laman X">.
+         <button class="css-5p3bh2-unf-pagination-item" aria-label="Laman X">
+         (lihat FAST_PAGINATION).
+    Jika deadline (time.monotonic()) terlewati, pagination berhenti dan review
+    yang sudah terkumpul dikembalikan.
     """
     reviews = []
     try:
-        driver.get(product_url)
-        wait(driver, timeout).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "article.css-15m2bcr"))
-        )
+        with metrics.phase('review_load'):
+            driver.get(product_url)
+            wait(driver, timeout).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, REVIEW_CSS))
+            )
     except TimeoutException:
         print(f"Timeout loading reviews for {product_url}")
+        metrics.count('timeout', 'review_load')
         return reviews
 
+    # Scroll adaptif untuk memuat seluruh elemen review halaman pertama
+    page_size = scrolling(driver).count
+
     page = 1
     while True:
-        # Lakukan gabungan metode scroll untuk memuat seluruh elemen review
-        full_scrolling(driver)
-        time.sleep(1)  # Beri waktu stabilisasi halaman
-
-        review_elements = driver.find_elements(By.CSS_SELECTOR, "article.css-15m2bcr")
-        if not review_elements:
+        with metrics.phase('review_extract'):
+            page_reviews = extract_reviews(driver, product_url, page)
+        if page_reviews is None:
             print("Tidak ditemukan review pada halaman ini.")
             break
-
-        for elem in review_elements:
-            try:
-                text_elem = elem.find_element(By.CSS_SELECTOR, "p.css-cvmev1-unf-heading.e1qvo2ff8")
-                review_text = text_elem.text.strip()
-                if review_text:
-                    reviews.append({
-                        'product_url': product_url,
-                        'page': page,
-                        'review': review_text
-                    })
-            except NoSuchElementException:
-                continue
+        reviews.extend(page_reviews)
+        if deadline is not None and time.monotonic() > deadline:
+            print(f"Batas waktu produk tercapai untuk {product_url} di halaman {page}.")
+            metrics.count('timeout', 'product')
+            break
 
         # Coba navigasi ke halaman review selanjutnya jika tombol "Laman X" ada
         try:
@@ -106,9 +134,17 @@ def scrape_product_reviews(driver, product_url, timeout=10):
                 f"button.css-5p3bh2-unf-pagination-item[aria-label='Laman {next_page}']"
             )
             if next_button:
-                next_button.click()
+                with metrics.phase('review_next_page'):
+                    if FAST_PAGINATION:
+                        review_count = len(wait_for_replacement(
+                            driver, (By.CSS_SELECTOR, REVIEW_CSS), next_button.click
+                        ))
+                    else:
+                        next_button.click()
+                        time.sleep(2)  # Tunggu konten halaman baru termuat
+                if not FAST_PAGINATION or review_count < page_size:
+                    scrolling(driver)
                 page += 1
-                time.sleep(2)  # Tunggu konten halaman baru termuat
             else:
                 break
         except Exception as e:
@@ -117,31 +153,57 @@ def scrape_product_reviews(driver, product_url, timeout=10):
     return reviews
 
 def main():
+    parser = argparse.ArgumentParser(description="Scraper review produk Tokopedia dari products.csv.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Lanjutkan run terakhir dari checkpoint.")
+    add_browser_arguments(parser, BROWSER_PROFILE)
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    formats = output_formats(args)
+
     # Memuat URL produk dari CSV
     product_links = load_product_links()
     if not product_links:
         print("No product links found. Please check your CSV file.")
         return
 
-    driver = wb.Chrome()
-    driver.implicitly_wait(5)
-    all_reviews = []
-
-    # Iterasi tiap URL produk dan lakukan scraping review
-    for url in tqdm(product_links, desc="Scraping product reviews", unit="product"):
-        product_reviews = scrape_product_reviews(driver, url)
-        all_reviews.extend(product_reviews)
-
-    driver.quit()
-
-    # Simpan hasil scraping ke file CSV dan Excel
-    df = pd.DataFrame(all_reviews)
+    checkpoint = Checkpoint('review_scraper')
+    state = checkpoint.load_state() if args.resume else {}
+    if args.resume and not state:
+        print("Checkpoint tidak ditemukan, memulai dari awal.")
+    products_done = state.get('products_done', 0)
+    if not state:
+        checkpoint.reset()
+
+    # Browser dengan profil persisten, dicek dan di-recycle di antara produk
+    managed = ManagedDriver(partial(build_driver, args.browser), f'review-{args.browser}', implicit_wait=5)
+
+    # Iterasi tiap URL produk dan lakukan scraping review; hasil per produk
+    # langsung ditulis ke checkpoint
+    for index, url in enumerate(
+        tqdm(product_links[products_done:], desc="Scraping product reviews", unit="product"),
+        start=products_done
+    ):
+        product_reviews = scrape_product_reviews(managed.checkout(), url)
+        managed.page_done(max((r['page'] for r in product_reviews), default=1))
+        checkpoint.append(product_reviews, products_done=index + 1, last_link=url)
+
+    managed.quit()
+
+    # Simpan hasil scraping dari checkpoint ke format output yang dipilih
     now = datetime.datetime.today().strftime('%d-%m-%Y')
-    csv_filename = f'Product_Reviews_{now}.csv'
-    excel_filename = f'Product_Reviews_{now}.xlsx'
-    df.to_csv(csv_filename, index=False)
-    df.to_excel(excel_filename, index=False)
-    print(f"Scraping selesai. File disimpan sebagai {csv_filename} dan {excel_filename}.")
+    written = export_jsonl(checkpoint.rows_path, f'Product_Reviews_{now}', formats)
+    print(f"Scraping selesai. File disimpan sebagai {', '.join(written)}.")
+    if RECORD_HISTORY:
+        history = HistoryStore()
+        count = history.ingest_jsonl(checkpoint.rows_path, reviews=True)
+        history.close()
+        print(f"{count} review disimpan ke riwayat {history.path}")
+
+    # Ringkasan durasi per fase dan penghitung retry/timeout/skip
+    print(metrics.format_summary())
+    json_path, prom_path = metrics.write('review_scraper')
+    print(f"Metrik disimpan ke {json_path} dan {prom_path}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,36 +1,73 @@
+import os
+import sys
+import json
 import time
+import argparse
 import datetime
+from functools import partial
 import pandas as pd
 from tqdm import tqdm
 
-from selenium import webdriver as wb
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
-def scrolling(driver):
-    """
-    Lakukan scroll secara bertahap untuk memicu lazy-loading.
-    """
-    scheight = 0.1
-    while scheight < 9.9:
-        driver.execute_script(
-            "window.scrollTo(0, document.body.scrollHeight / {});".format(scheight)
-        )
-        time.sleep(0.3)
-        scheight += 0.1
+# Tambahkan root repo ke sys.path agar modul bersama di common/ dapat diimpor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.scrolling import adaptive_scroll, format_report, wait_for_replacement
+from common.checkpoint import Checkpoint
+from common.output import add_output_arguments, output_formats, export_jsonl
+from common.browser import add_browser_arguments, build_driver
+from common.driver_pool import ManagedDriver
+from common.metrics import metrics
+from common.history import HistoryStore, review_hash
+from common.network_capture import NetworkCapture
+
+# Selector elemen review dan batas waktu scroll adaptif per halaman review (detik)
+REVIEW_CSS = "article.css-15m2bcr"
+SCROLL_MAX_TIME = 20
+
+# Tombol paginasi review (diformat dengan nomor halaman tujuan)
+NEXT_PAGE_XPATH = "//*[contains(@class, 'unf-pagination-item')]//button[contains(@aria-label, 'Laman {page}')]"
+
+# Jalur cepat paginasi DOM: setelah klik, tunggu daftar review diganti (elemen
+# lama stale) lalu baca langsung tanpa scroll. Scroll adaptif hanya dipakai jika
+# jumlah review lebih sedikit dari halaman pertama (lazy-load belum lengkap).
+# False = scroll ulang setiap halaman seperti sebelumnya.
+FAST_PAGINATION = True
+
+# Sumber review:
+#   - 'network': membaca JSON GraphQL productReviewList yang sudah diminta halaman
+#                (lewat log performa Chrome), tanpa scroll ulang dan find_element
+#   - 'dom'    : scroll adaptif lalu membaca elemen article per review
+REVIEW_SOURCE = 'network'
+REVIEW_API_PATTERN = r'graphql/productReviewList'
+REVIEW_API_TIMEOUT = 10
+
+# Mode inkremental (--incremental): review diurutkan dari yang terbaru lalu
+# pagination berhenti begitu review watermark produk (review terbaru run
+# sebelumnya, disimpan di database riwayat) muncul lagi: dicocokkan lewat ID
+# review jika ada, selain itu lewat beberapa review berurutan (hash + waktu)
+SORT_BUTTON_CSS = 'button[data-testid="reviewSorting"]'
+SORT_NEWEST_XPATH = "//*[@role='option' or @role='menuitem' or self::li][contains(normalize-space(.), 'Terbaru')]"
+
+# Profil browser (lihat common/browser.py): 'fast' memblokir gambar/media/font dan
+# tracker pihak ketiga dengan pageLoadStrategy eager; bisa diganti lewat --browser
+BROWSER_PROFILE = 'fast'
+
+# Simpan review run ini ke database riwayat (common/history.py)
+RECORD_HISTORY = True
 
-def reverse_scrolling(driver):
+def scrolling(driver):
     """
-    Lakukan reverse scrolling dengan mengirim perintah PAGE_DOWN agar memicu loading elemen secara natural.
+    Scroll adaptif untuk memicu lazy-loading review. Berhenti segera setelah jumlah
+    elemen review tidak bertambah (maksimal SCROLL_MAX_TIME detik).
     """
-    body = driver.find_element(By.TAG_NAME, 'body')
-    for _ in range(25):
-        body.send_keys(Keys.PAGE_DOWN)
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(0.5)
+    report = adaptive_scroll(driver, (By.CSS_SELECTOR, REVIEW_CSS), max_time=SCROLL_MAX_TIME)
+    print(format_report(report))
+    return report
 
 def load_product_links(csv_file='products.csv'):
     """
@@ -44,135 +81,470 @@ def load_product_links(csv_file='products.csv'):
         print("Error reading product URLs:", e)
         return []
 
-def scrape_product_reviews(driver, product_url):
+def sort_newest_first(driver):
+    """
+    Mengurutkan review dari yang terbaru lewat dropdown urutan ulasan.
+    Return True jika berhasil; tanpa urutan ini watermark tidak dipakai.
+    """
+    try:
+        with metrics.phase('review_sort'):
+            sort_button = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, SORT_BUTTON_CSS))
+            )
+            driver.execute_script("arguments[0].click();", sort_button)
+            newest = WebDriverWait(driver, 5).until(
+                EC.element_to_be_clickable((By.XPATH, SORT_NEWEST_XPATH))
+            )
+            driver.execute_script("arguments[0].click();", newest)
+            time.sleep(0.5)
+        return True
+    except Exception as e:
+        print(f"Urutan review terbaru tidak dapat dipilih, semua halaman diambil. Exception: {e.__class__.__name__}")
+        metrics.count('fallback', 'review_sort')
+        return False
+
+class WatermarkMatcher:
+    """
+    Memotong review urut terbaru, halaman demi halaman, pada watermark produk.
+
+    Jika watermark dan review sama-sama punya review_id (jalur network), review
+    dicocokkan lewat ID. Selain itu seluruh run watermark (pasangan hash +
+    review_time, lihat WATERMARK_RUN di common/history.py) harus cocok
+    berturut-turut; review yang baru cocok sebagian ditahan dulu (bisa berlanjut
+    ke halaman berikutnya). Jika urutannya putus, awal kecocokan digeser ke
+    akhiran terpanjang review yang ditahan yang masih cocok dengan awal run
+    (review identik berurutan umum di Tokopedia), sisanya dilepas sebagai review baru.
+    Waktu relatif jalur DOM ('3 bulan lalu') bisa berubah antar run; watermark
+    lalu tidak ditemukan dan semua halaman diambil, tanpa ada review yang hilang.
+
+    Parameter:
+        watermark (dict): Hasil HistoryStore.review_watermark (boleh None).
+    """
+
+    def __init__(self, watermark):
+        self.review_id = (watermark or {}).get('review_id')
+        self.run = [tuple(key) for key in (watermark or {}).get('run') or []]
+        self.pending = []
+
+    def cut(self, page_reviews):
+        """
+        Return:
+            tuple: (review yang lebih baru dari watermark, apakah watermark ditemukan).
+        """
+        new = []
+        for row in page_reviews:
+            if self.review_id and row.get('review_id'):
+                if row['review_id'] == self.review_id:
+                    return new, True
+                new.append(row)
+                continue
+            if not self.run:
+                new.append(row)
+                continue
+            self.pending.append(((review_hash(row), row.get('review_time')), row))
+            # Urutan putus: review terdepan yang ditahan ternyata baru
+            while self.pending and [key for key, _ in self.pending] != self.run[:len(self.pending)]:
+                new.append(self.pending.pop(0)[1])
+            if len(self.pending) == len(self.run):
+                self.pending = []
+                return new, True
+        return new, False
+
+    def release(self):
+        """
+        Review yang masih ditahan saat pagination berakhir tanpa menemukan watermark.
+        """
+        rows = [row for _, row in self.pending]
+        self.pending = []
+        return rows
+
+def _update_watermark(watermarks, product_url, reviews, page, watermark, seen, complete):
+    # Review teratas hasil urut terbaru menjadi watermark run berikutnya, tetapi
+    # hanya jika seluruh review di atas watermark lama sudah terambil. Pada run
+    # yang terpotong (deadline, pagination gagal) watermark lama dipertahankan
+    # agar review di antara titik potong dan watermark lama diambil run berikutnya.
+    if seen or complete:
+        watermarks.set_review_watermark(product_url, reviews, watermark if seen else None)
+        print(f"{len(reviews)} review baru dari {page} halaman untuk {product_url}")
+    else:
+        print(f"{len(reviews)} review baru dari {page} halaman untuk {product_url} "
+              f"(terpotong, watermark tidak digeser)")
+        metrics.count('skip', 'review_watermark_update')
+
+def extract_reviews(driver, product_url, page, product_name=None):
+    """
+    Mengekstrak rating, waktu review dan teks review dari halaman review yang
+    sedang terbuka. Mengembalikan None jika tidak ada elemen review sama sekali.
+    """
+    review_elements = driver.find_elements(By.CSS_SELECTOR, REVIEW_CSS)
+    if not review_elements:
+        return None
+
+    reviews = []
+    # Looping setiap review dan ambil data
+    for elem in review_elements:
+        rating_value = None
+        review_time = None
+        review_text = None
+
+        # Ambil rating (misal: "bintang 5")
+        try:
+            rating_elem = elem.find_element(By.CSS_SELECTOR, 'div[data-testid="icnStarRating"]')
+            rating_aria = rating_elem.get_attribute("aria-label")
+            if rating_aria and "bintang" in rating_aria:
+                # Contoh: "bintang 5" -> ambil angka "5"
+                parts = rating_aria.split()
+                if len(parts) > 1:
+                    rating_value = parts[1]
+        except NoSuchElementException:
+            pass
+
+        # Ambil waktu review (misal: "6 bulan lalu")
+        try:
+            time_elem = elem.find_element(By.CSS_SELECTOR, "p.css-vqrjg4-unf-heading.e1qvo2ff8")
+            review_time = time_elem.text.strip()
+        except NoSuchElementException:
+            pass
+
+        # Ambil teks review
+        try:
+            text_elem = elem.find_element(By.CSS_SELECTOR, "p.css-cvmev1-unf-heading.e1qvo2ff8")
+            review_text = text_elem.text.strip()
+        except NoSuchElementException:
+            pass
+
+        # Simpan data review
+        if any([rating_value, review_time, review_text]):
+            reviews.append({
+                'product_name': product_name,  # pakai nama produk yang diambil di awal
+                'page': page,
+                'rating': rating_value,
+                'review_time': review_time,
+                'review_text': review_text,
+                'product_url': product_url
+            })
+    return reviews
+
+def scrape_product_reviews(driver, product_url, deadline=None, watermarks=None):
     """
     Melakukan scraping review untuk satu produk berdasarkan URL yang diberikan.
     
     Proses:
       1. Buka URL produk.
       2. Ambil nama produk sekali di awal (jika elemen tersedia).
-      3. Lakukan scroll dan reverse scrolling untuk memicu lazy-loading review.
+      3. Lakukan scroll adaptif untuk memicu lazy-loading review.
       4. Ekstrak informasi review: rating, waktu review, dan teks review.
-      5. Navigasi ke halaman review selanjutnya menggunakan tombol paginasi.
+      5. Navigasi ke halaman review selanjutnya menggunakan tombol paginasi
+         (lihat FAST_PAGINATION).
+    Jika deadline (time.monotonic()) terlewati, pagination berhenti dan review
+    yang sudah terkumpul dikembalikan.
+
+    Jika watermarks (HistoryStore) diberikan, review diurutkan dari yang terbaru
+    dan pagination berhenti pada watermark produk; watermark lalu digeser ke
+    review terbaru, kecuali pagination terpotong sebelum watermark atau halaman
+    terakhir tercapai.
     """
     reviews = []
-    driver.get(product_url)
+    with metrics.phase('review_load'):
+        driver.get(product_url)
     
     # 1) Ambil nama produk sekali di awal
     try:
         # Tunggu sampai elemen h1 dengan data-testid lblPDPDetailProductName muncul
-        product_name_elem = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, 'h1.css-j63za0[data-testid="lblPDPDetailProductName"]')
+        with metrics.phase('product_name_wait'):
+            product_name_elem = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, 'h1.css-j63za0[data-testid="lblPDPDetailProductName"]')
+                )
             )
-        )
         product_name = product_name_elem.text
     except (TimeoutException, NoSuchElementException):
         product_name = None
+        metrics.count('timeout', 'product_name_wait')
 
     # 2) Lakukan scroll agar review diload
-    scrolling(driver)
-    reverse_scrolling(driver)
-    time.sleep(1)  # Delay untuk memastikan halaman sudah stabil
+    report = scrolling(driver)
+
+    # Mode inkremental: urutkan terbaru dulu lalu scroll ulang daftar yang baru
+    watermark = None
+    incremental = watermarks is not None and sort_newest_first(driver)
+    if incremental:
+        watermark = watermarks.review_watermark(product_url)
+        report = scrolling(driver)
+    matcher = WatermarkMatcher(watermark)
+    page_size = report.count
 
     page = 1
+    seen = complete = False
     while True:
-        # 3) Ambil seluruh elemen review di halaman ini
-        review_elements = driver.find_elements(By.CSS_SELECTOR, "article.css-15m2bcr")
-        if not review_elements:
+        # 3) Ambil seluruh review di halaman ini
+        with metrics.phase('review_extract'):
+            page_reviews = extract_reviews(driver, product_url, page, product_name)
+        if page_reviews is None:
             print(f"Tidak ada review ditemukan pada {product_url} di halaman {page}.")
             break
+        page_reviews, seen = matcher.cut(page_reviews)
+        reviews.extend(page_reviews)
+        if seen:
+            metrics.count('skip', 'review_watermark')
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            print(f"Batas waktu produk tercapai untuk {product_url} di halaman {page}.")
+            metrics.count('timeout', 'product')
+            break
 
-        # 4) Looping setiap review dan ambil data
-        for elem in review_elements:
-            rating_value = None
-            review_time = None
-            review_text = None
-
-            # Ambil rating (misal: "bintang 5")
-            try:
-                rating_elem = elem.find_element(By.CSS_SELECTOR, 'div[data-testid="icnStarRating"]')
-                rating_aria = rating_elem.get_attribute("aria-label")
-                if rating_aria and "bintang" in rating_aria:
-                    # Contoh: "bintang 5" -> ambil angka "5"
-                    parts = rating_aria.split()
-                    if len(parts) > 1:
-                        rating_value = parts[1]
-            except NoSuchElementException:
-                pass
-
-            # Ambil waktu review (misal: "6 bulan lalu")
-            try:
-                time_elem = elem.find_element(By.CSS_SELECTOR, "p.css-vqrjg4-unf-heading.e1qvo2ff8")
-                review_time = time_elem.text.strip()
-            except NoSuchElementException:
-                pass
-
-            # Ambil teks review
-            try:
-                text_elem = elem.find_element(By.CSS_SELECTOR, "p.css-cvmev1-unf-heading.e1qvo2ff8")
-                review_text = text_elem.text.strip()
-            except NoSuchElementException:
-                pass
-
-            # Simpan data review
-            if any([rating_value, review_time, review_text]):
-                reviews.append({
-                    'product_name': product_name,  # pakai nama produk yang diambil di awal
-                    'page': page,
-                    'rating': rating_value,
-                    'review_time': review_time,
-                    'review_text': review_text,
-                    'product_url': product_url
-                })
-
-        # 5) Pagination untuk halaman review selanjutnya
+        # 4) Pagination untuk halaman review selanjutnya
         next_page = page + 1
-        xpath_next = f"//*[contains(@class, 'unf-pagination-item')]//button[contains(@aria-label, 'Laman {next_page}')]"
+        xpath_next = NEXT_PAGE_XPATH.format(page=next_page)
 
         try:
-            next_button = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable((By.XPATH, xpath_next))
-            )
-            driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
-            time.sleep(0.3)
-            driver.execute_script("arguments[0].click();", next_button)
-            time.sleep(0.5)
-            scrolling(driver)
-            reverse_scrolling(driver)
-            time.sleep(1)
+            with metrics.phase('review_next_page'):
+                try:
+                    next_button = WebDriverWait(driver, 10).until(
+                        EC.element_to_be_clickable((By.XPATH, xpath_next))
+                    )
+                except TimeoutException:
+                    # Tidak ada tombol halaman berikutnya: halaman terakhir
+                    complete = True
+                    break
+                if FAST_PAGINATION:
+                    review_count = len(wait_for_replacement(
+                        driver, (By.CSS_SELECTOR, REVIEW_CSS),
+                        lambda: driver.execute_script("arguments[0].click();", next_button),
+                    ))
+                else:
+                    driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
+                    time.sleep(0.3)
+                    driver.execute_script("arguments[0].click();", next_button)
+                    time.sleep(0.5)
+            if not FAST_PAGINATION or review_count < page_size:
+                scrolling(driver)
             page += 1
         except Exception as e:
             print(f"Pagination selesai/terhenti untuk {product_url} di halaman {page}. Exception: {e}")
             break
 
+    reviews.extend(matcher.release())
+    if incremental:
+        _update_watermark(watermarks, product_url, reviews, page, watermark, seen, complete)
+    return reviews
+
+def _review_list(payload):
+    # Mencari objek productrevGetProductReviewList di response GraphQL (response
+    # bisa berupa list batch query atau satu objek)
+    for item in payload if isinstance(payload, list) else [payload]:
+        data = (item or {}).get('data') or {}
+        for value in data.values():
+            if isinstance(value, dict) and 'list' in value:
+                return value
+    return None
+
+def parse_review_payload(payload, product_url, page, product_name=None):
+    """
+    Mengubah response JSON GraphQL productReviewList menjadi baris review dengan
+    kolom yang sama seperti jalur DOM (ditambah review_id). Bisa dipakai offline
+    dengan JSON hasil rekaman.
+
+    Parameter:
+        payload (str | bytes | list | dict): Body response atau hasil json.loads.
+
+    Return:
+        tuple: (list baris review, apakah masih ada halaman berikutnya).
+            Baris bernilai None jika payload bukan response daftar review.
+    """
+    if isinstance(payload, (str, bytes)):
+        payload = json.loads(payload)
+    review_list = _review_list(payload)
+    if review_list is None:
+        return None, False
+
+    reviews = []
+    for item in review_list.get('list') or []:
+        rating = item.get('productRating')
+        reviews.append({
+            'product_name': product_name,
+            'page': page,
+            'rating': str(rating) if rating is not None else None,
+            'review_time': item.get('reviewCreateTime'),
+            'review_text': (item.get('message') or '').strip() or None,
+            'product_url': product_url,
+            'review_id': str(item.get('feedbackID') or item.get('id') or '') or None,
+        })
+    return reviews, bool(review_list.get('hasNext'))
+
+def scrape_product_reviews_network(driver, product_url, capture, deadline=None, watermarks=None):
+    """
+    Scraping review satu produk dari response JSON productReviewList.
+
+    Proses:
+      1. Buka URL produk dan ambil nama produk.
+      2. Scroll sekali ke bawah agar komponen review meminta halaman pertama.
+      3. Baca JSON review dari log performa; klik tombol halaman berikutnya
+         (tanpa scroll) dan tunggu response berikutnya selama hasNext.
+    Jika response tidak tertangkap, produk ini diambil ulang lewat jalur DOM.
+    Pagination berhenti jika deadline (time.monotonic()) terlewati, atau pada
+    watermark produk jika watermarks (HistoryStore) diberikan (mode inkremental,
+    lihat scrape_product_reviews).
+    """
+    capture.clear()
+    with metrics.phase('review_load'):
+        driver.get(product_url)
+
+    try:
+        with metrics.phase('product_name_wait'):
+            product_name = WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, 'h1.css-j63za0[data-testid="lblPDPDetailProductName"]')
+                )
+            ).text
+    except (TimeoutException, NoSuchElementException):
+        product_name = None
+        metrics.count('timeout', 'product_name_wait')
+
+    driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+
+    # Mode inkremental: response halaman 1 urutan default dibuang, lalu daftar
+    # diurutkan terbaru dulu sehingga komponen review meminta halaman 1 lagi
+    # Jika pengurutan gagal, response urutan default itu dipakai sebagai halaman 1.
+    watermark = None
+    incremental = False
+    first_bodies = None
+    if watermarks is not None:
+        with metrics.phase('review_api_wait'):
+            first_bodies = capture.wait_for(REVIEW_API_TIMEOUT)
+        incremental = sort_newest_first(driver)
+        if incremental:
+            watermark = watermarks.review_watermark(product_url)
+            first_bodies = None
+    matcher = WatermarkMatcher(watermark)
+
+    reviews = []
+    page = 1
+    seen = complete = False
+    while True:
+        if first_bodies is not None:
+            bodies, first_bodies = first_bodies, None
+        else:
+            with metrics.phase('review_api_wait'):
+                bodies = capture.wait_for(REVIEW_API_TIMEOUT)
+        page_reviews, has_next = None, False
+        with metrics.phase('review_extract'):
+            for _, body in bodies:
+                try:
+                    page_reviews, has_next = parse_review_payload(body, product_url, page, product_name)
+                except ValueError:
+                    continue
+                if page_reviews is not None:
+                    break
+
+        if page_reviews is None:
+            metrics.count('timeout', 'review_api_wait')
+            if page == 1:
+                print(f"Response review tidak tertangkap untuk {product_url}, memakai jalur DOM.")
+                metrics.count('fallback', 'review_api')
+                return scrape_product_reviews(driver, product_url, deadline, watermarks)
+            print(f"Response review halaman {page} tidak tertangkap untuk {product_url}.")
+            break
+        page_size = len(page_reviews)
+        page_reviews, seen = matcher.cut(page_reviews)
+        reviews.extend(page_reviews)
+        if seen:
+            metrics.count('skip', 'review_watermark')
+            break
+        if not has_next or not page_size:
+            complete = True
+            break
+        if deadline is not None and time.monotonic() > deadline:
+            print(f"Batas waktu produk tercapai untuk {product_url} di halaman {page}.")
+            metrics.count('timeout', 'product')
+            break
+
+        try:
+            with metrics.phase('review_next_page'):
+                next_button = WebDriverWait(driver, 10).until(
+                    EC.element_to_be_clickable((By.XPATH, NEXT_PAGE_XPATH.format(page=page + 1)))
+                )
+                driver.execute_script("arguments[0].click();", next_button)
+            page += 1
+        except Exception as e:
+            print(f"Pagination selesai/terhenti untuk {product_url} di halaman {page}. Exception: {e}")
+            break
+
+    reviews.extend(matcher.release())
+    if incremental:
+        _update_watermark(watermarks, product_url, reviews, page, watermark, seen, complete)
     return reviews
 
 def main():
+    parser = argparse.ArgumentParser(description="Scraper review produk Tokopedia dari products.csv.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Lanjutkan run terakhir dari checkpoint.")
+    parser.add_argument('--source', choices=('network', 'dom'), default=REVIEW_SOURCE,
+                        help=f"Sumber data review (default: {REVIEW_SOURCE}).")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Hanya ambil review yang lebih baru dari watermark run sebelumnya.")
+    add_browser_arguments(parser, BROWSER_PROFILE)
+    add_output_arguments(parser)
+    args = parser.parse_args()
+    formats = output_formats(args)
+
     # Muat URL produk dari file CSV
     product_links = load_product_links()
     if not product_links:
         print("Tidak ada link produk ditemukan. Periksa file CSV Anda.")
         return
 
-    driver = wb.Chrome()  # Pastikan chromedriver sudah tersedia dan sesuai PATH
-    driver.implicitly_wait(5)
-    all_reviews = []
+    checkpoint = Checkpoint('review_scraper2')
+    state = checkpoint.load_state() if args.resume else {}
+    if args.resume and not state:
+        print("Checkpoint tidak ditemukan, memulai dari awal.")
+    products_done = state.get('products_done', 0)
+    if not state:
+        checkpoint.reset()
 
-    for url in tqdm(product_links, desc="Scraping review produk", unit="produk"):
-        product_reviews = scrape_product_reviews(driver, url)
-        all_reviews.extend(product_reviews)
+    # Browser dengan profil persisten, dicek dan di-recycle di antara produk
+    managed = ManagedDriver(
+        partial(build_driver, args.browser, performance_log=args.source == 'network'),
+        f'review-{args.browser}', implicit_wait=5
+    )
+    watermarks = HistoryStore() if args.incremental else None
+    driver = None
 
-    driver.quit()
+    # Review setiap produk langsung ditulis ke checkpoint setelah selesai
+    for index, url in enumerate(
+        tqdm(product_links[products_done:], desc="Scraping review produk", unit="produk"),
+        start=products_done
+    ):
+        if managed.checkout() is not driver:
+            # Driver baru (pertama kali atau hasil recycle): capture dipasang ulang
+            driver = managed.driver
+            if args.source == 'network':
+                capture = NetworkCapture(driver, REVIEW_API_PATTERN)
+                scrape = partial(scrape_product_reviews_network, capture=capture, watermarks=watermarks)
+            else:
+                scrape = partial(scrape_product_reviews, watermarks=watermarks)
+        product_reviews = scrape(driver, url)
+        managed.page_done(max((r['page'] for r in product_reviews), default=1))
+        checkpoint.append(product_reviews, products_done=index + 1, last_link=url)
 
-    # Simpan hasil scraping ke file CSV dan Excel
-    df = pd.DataFrame(all_reviews)
+    managed.quit()
+    if watermarks is not None:
+        watermarks.close()
+
+    # Simpan hasil scraping dari checkpoint ke format output yang dipilih
     now = datetime.datetime.today().strftime('%d-%m-%Y')
-    csv_filename = f'Product_Reviews_{now}.csv'
-    excel_filename = f'Product_Reviews_{now}.xlsx'
-    df.to_csv(csv_filename, index=False)
-    df.to_excel(excel_filename, index=False)
-    print(f"Scraping selesai. File disimpan sebagai {csv_filename} dan {excel_filename}.")
+    written = export_jsonl(checkpoint.rows_path, f'Product_Reviews_{now}', formats)
+    print(f"Scraping selesai. File disimpan sebagai {', '.join(written)}.")
+    if RECORD_HISTORY:
+        history = HistoryStore()
+        count = history.ingest_jsonl(checkpoint.rows_path, reviews=True)
+        history.close()
+        print(f"{count} review disimpan ke riwayat {history.path}")
+
+    # Ringkasan durasi per fase dan penghitung retry/timeout/skip
+    print(metrics.format_summary())
+    json_path, prom_path = metrics.write('review_scraper2')
+    print(f"Metrik disimpan ke {json_path} dan {prom_path}")
 
 if __name__ == "__main__":
     main()
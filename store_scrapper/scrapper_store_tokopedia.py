@@ -1,23 +1,106 @@
+import os
+import sys
 import time
 import random
 import json
+import argparse
 import re
 import urllib3
+from functools import partial
 import pandas as pd
 from datetime import datetime
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from tqdm import tqdm
 
-from selenium import webdriver as wb
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait as wait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+# Tambahkan root repo ke sys.path agar modul bersama di common/ dapat diimpor
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.http_detail import HttpDetailFetcher
+from common.detail_cache import DetailCache
+from common.checkpoint import Checkpoint
+from common.output import add_output_arguments, output_formats, export_dataframe, write_excel_per_group
+from common.browser import add_browser_arguments, build_driver, profile_blocked_patterns
+from common.tab_engine import TabEngine
+from common.pipeline import Pipeline, Stage
+from common.driver_pool import ManagedDriver
+from common.metrics import metrics
+from common.normalize import normalize_dataframe
+from common.history import HistoryStore
+from common.work_queue import Lease, add_queue_arguments, open_queue, default_owner, worker_checkpoint_name
+
 # Nonaktifkan peringatan urllib3
 urllib3.disable_warnings()
 
+# Backend pengambilan deskripsi produk: 'http' (urllib3 + BeautifulSoup, fallback
+# ke Selenium jika deskripsi tidak ada di HTML) atau 'selenium' (tab Chrome per produk)
+DETAIL_BACKEND = 'http'
+HTTP_WORKERS = 8
+
+# Deskripsi yang harus dibuka di browser dimuat DESCRIPTION_TABS tab sekaligus di
+# browser driver utama lewat CDP (common/tab_engine.py). 0 = satu per satu
+# dengan get_product_description. Tab yang belum menampilkan deskripsi setelah
+# TAB_DESCRIPTION_TIMEOUT detik dianggap TIMEOUT (produk di-skip).
+DESCRIPTION_TABS = 4
+TAB_DESCRIPTION_TIMEOUT = 10
+
+# Proses toko sebagai pipeline (common/pipeline.py): listing (buka + scroll + parse
+# kartu), deskripsi, dan penulisan checkpoint berjalan bersamaan dengan antrean
+# terbatas PIPELINE_QUEUE_SIZE toko di antaranya. Tahap deskripsi memakai browser
+# sendiri yang baru dibuat jika ada deskripsi yang tidak didapat dari cache/HTTP.
+# False = toko diproses satu per satu.
+PIPELINE = True
+PIPELINE_QUEUE_SIZE = 2
+
+# Jenis item URL toko di antrean kerja bersama (common/work_queue.py). Dengan
+# --queue, setiap proses scraper mengklaim toko satu per satu dari antrean, jadi
+# daftar toko bisa dibagi ke beberapa proses/host yang memakai config.json sama.
+QUEUE_KIND = 'shop'
+
+# Cache deskripsi di disk (dibagi dengan keyword scraper). CACHE_HTML ikut
+# menyimpan HTML halaman detail (terkompresi) dari backend HTTP.
+USE_DETAIL_CACHE = True
+CACHE_HTML = False
+
+# Selain file utama, tulis juga *_per_store.xlsx (satu sheet per toko, streaming)
+PER_STORE_EXCEL = True
+
+# Simpan snapshot harga/terjual/rating run ini ke database riwayat (common/history.py)
+RECORD_HISTORY = True
+
+# Profil browser (lihat common/browser.py): 'fast' memblokir gambar/media/font dan
+# tracker pihak ketiga dengan pageLoadStrategy eager; bisa diganti lewat --browser.
+# URL gambar produk tetap terbaca dari atribut src walaupun gambarnya tidak diunduh.
+BROWSER_PROFILE = 'fast'
+
+# Parsing halaman list toko: hanya kartu produk yang dibangun menjadi tree
+# BeautifulSoup (lihat benchmarks/ untuk perbandingan dengan parsing penuh)
+PARSE_ONLY_CARDS = True
+
+# Selector deskripsi di halaman detail produk (dipakai Selenium dan BeautifulSoup)
+DESCRIPTION_CSS = 'div.css-1wa8o67 span.css-11oczh8.eytdjj00'
+
+# Script deskripsi untuk mesin tab, setara get_product_description: null selama
+# kontainer deskripsi belum tampil.
+#   arguments[0]: selector kontainer, arguments[1]: DESCRIPTION_CSS
+TAB_DESCRIPTION_JS = """
+if (!document.querySelector(arguments[0])) { return null; }
+var description = document.querySelector(arguments[1]);
+return JSON.stringify({description: description ? description.innerText : null});
+"""
+TAB_DESCRIPTION_ARGS = ('div.css-1wa8o67', DESCRIPTION_CSS)
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Firefox/119.0',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:102.0) Gecko/20100101 Firefox/102.0'
+]
+
 def load_keyword(json_file_path):
     """
     Memuat keyword pencarian dari file konfigurasi JSON.
@@ -48,21 +131,13 @@ def get_shop_name(url):
     parts = url.split('/')
     return parts[3].split('?')[0]
 
-def setup_driver():
+def setup_driver(profile=BROWSER_PROFILE, **kwargs):
     """
-    Menginisialisasi Selenium Chrome WebDriver dengan waktu tunggu implisit dan
-    User-Agent yang di-random.
+    Menginisialisasi Selenium Chrome WebDriver sesuai profil browser, dengan waktu
+    tunggu implisit dan User-Agent yang di-random. Argumen lain (mis.
+    user_data_dir) diteruskan ke build_driver.
     """
-    USER_AGENTS = [
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/15.1 Safari/605.1.15',
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Firefox/119.0',
-        'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:102.0) Gecko/20100101 Firefox/102.0'
-    ]
-    
-    options = wb.ChromeOptions()
-    options.add_argument(f'user-agent={random.choice(USER_AGENTS)}')
-    driver = wb.Chrome(options=options)
+    driver = build_driver(profile, user_agent=random.choice(USER_AGENTS), **kwargs)
     driver.implicitly_wait(5)
     return driver
 
@@ -101,21 +176,22 @@ def get_product_description(driver, product_url, timeout=5):
     main_window = driver.current_window_handle
     timed_out = False
     try:
-        driver.execute_script(f"window.open('{product_url}', '_blank');")
-        driver.switch_to.window(driver.window_handles[-1])
+        with metrics.phase('detail_open'):
+            driver.execute_script(f"window.open('{product_url}', '_blank');")
+            driver.switch_to.window(driver.window_handles[-1])
         try:
             # Gunakan timeout lebih pendek untuk menghindari RTO
-            wait(driver, timeout).until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, 'div.css-1wa8o67'))
-            )
+            with metrics.phase('detail_wait'):
+                wait(driver, timeout).until(
+                    EC.visibility_of_element_located((By.CSS_SELECTOR, 'div.css-1wa8o67'))
+                )
         except TimeoutException:
             timed_out = True
+            metrics.count('timeout', 'detail_wait')
 
         if not timed_out:
             try:
-                desc_element = driver.find_element(
-                    By.CSS_SELECTOR, 'div.css-1wa8o67 span.css-11oczh8.eytdjj00'
-                )
+                desc_element = driver.find_element(By.CSS_SELECTOR, DESCRIPTION_CSS)
                 description = desc_element.text
             except (NoSuchElementException, TimeoutException):
                 description = None
@@ -128,23 +204,121 @@ def get_product_description(driver, product_url, timeout=5):
         driver.switch_to.window(main_window)
     return description
 
-def parse_page_source(driver, html, shop_name):
+def create_tab_engine(driver, profile=BROWSER_PROFILE):
     """
-    Memparsing halaman list produk dan mengambil data dari masing-masing produk,
-    termasuk mengambil deskripsi dari halaman detail produk.
-    Produk yang mengalami timeout saat memuat halaman detail akan di-skip.
-    Dilengkapi dengan progress bar untuk setiap produk di toko tersebut.
+    Membuat dan menjalankan TabEngine deskripsi di browser driver. Mengembalikan
+    None jika koneksi CDP tidak tersedia (deskripsi dibuka satu per satu).
+    """
+    try:
+        return TabEngine(
+            driver, TAB_DESCRIPTION_JS, json.loads, TAB_DESCRIPTION_ARGS,
+            tabs=DESCRIPTION_TABS, timeout=TAB_DESCRIPTION_TIMEOUT,
+            blocked_urls=profile_blocked_patterns(profile)
+        ).start()
+    except Exception as e:
+        print(f"Mesin tab deskripsi tidak tersedia ({e.__class__.__name__}), memakai tab sekuensial.")
+        metrics.count('fallback', 'description_tabs')
+        return None
+
+def fetch_descriptions_tabs(tab_engine, product_urls, shop_name):
+    """
+    Memuat halaman detail bersamaan di beberapa tab dan mengambil deskripsinya.
+    Hasilnya sama dengan get_product_description: "TIMEOUT" jika deskripsi
+    tidak tampil dalam batas waktu.
+    """
+    print(f"---> Memuat {len(product_urls)} deskripsi {shop_name} di {tab_engine.tabs} tab")
+    with metrics.phase('detail_tabs'):
+        results = tab_engine.fetch_many(product_urls)
+    return {
+        url: "TIMEOUT" if result is None else result['description']
+        for url, result in results.items()
+    }
+
+def parse_description(html):
+    """
+    Mengambil deskripsi produk dari HTML halaman detail dengan BeautifulSoup,
+    memakai selector yang sama dengan jalur Selenium. Mengembalikan None jika
+    deskripsi tidak ada di HTML (mis. dirender oleh JavaScript).
     """
     soup = BeautifulSoup(html, 'html.parser')
+    desc_elem = soup.select_one(DESCRIPTION_CSS)
+    if desc_elem is None:
+        return None
+    for br in desc_elem.find_all('br'):
+        br.replace_with('\n')
+    return desc_elem.get_text().strip() or None
+
+def create_http_fetcher(cache=None):
+    """
+    Membuat HttpDetailFetcher untuk halaman detail produk Tokopedia.
+    """
+    on_html = None
+    if cache is not None and CACHE_HTML:
+        on_html = lambda url, html: cache.put(url, {}, html=html)
+    return HttpDetailFetcher(
+        parse_description,
+        max_workers=HTTP_WORKERS,
+        headers={'User-Agent': random.choice(USER_AGENTS)},
+        on_html=on_html
+    )
+
+def fetch_descriptions(driver, product_urls, shop_name, fetcher=None, cache=None, tab_engine=None,
+                       browser=None):
+    """
+    Mengambil deskripsi untuk daftar URL produk.
+    URL dengan deskripsi segar di cache tidak diambil lagi. Jika fetcher (HTTP)
+    tersedia, sisa URL diambil bersamaan lewat HTTP terlebih dahulu; hanya URL
+    yang deskripsinya tidak ada di respon HTTP yang dibuka dengan Selenium,
+    bersamaan di beberapa tab jika tab_engine diberikan.
+    Nilai "TIMEOUT" menandakan produk harus di-skip.
+
+    Jika browser (callable) diberikan, driver dan tab_engine baru diminta lewat
+    browser(jumlah halaman) saat memang ada URL yang harus dibuka di browser.
+    """
+    descriptions = {}
+    if cache is not None:
+        for url in product_urls:
+            cached = cache.get(url, ('description',))
+            if cached is not None:
+                descriptions[url] = cached['description']
+    pending = [url for url in product_urls if url not in descriptions]
+
+    if fetcher is not None and pending:
+        descriptions.update(fetcher.fetch_many(pending))
+    missing = [url for url in pending if descriptions.get(url) is None]
+    if fetcher is not None and missing:
+        print(f"{len(missing)} deskripsi dari {shop_name} tidak ada di HTML, memakai Selenium.")
+    if browser is not None and missing:
+        driver, tab_engine = browser(len(missing))
+    if tab_engine is not None and missing:
+        descriptions.update(fetch_descriptions_tabs(tab_engine, missing, shop_name))
+        missing = []
+    for product_url in tqdm(
+        missing,
+        desc=f"---> Scrapping {shop_name} products",
+        leave=False,
+        unit="produk"
+    ):
+        descriptions[product_url] = get_product_description(driver, product_url, timeout=5)
+
+    if cache is not None:
+        for url in pending:
+            if descriptions.get(url) not in (None, "TIMEOUT"):
+                cache.put(url, {'description': descriptions[url]})
+    return descriptions
+
+def parse_product_cards(html, shop_name, parse_only=PARSE_ONLY_CARDS):
+    """
+    Memparsing kartu produk di HTML halaman list toko dengan BeautifulSoup (tanpa
+    deskripsi). Dengan parse_only=True, hanya elemen kartu produk yang dibangun
+    menjadi tree (SoupStrainer), sisa halaman dilewati.
+    """
+    strainer = SoupStrainer('div', class_='css-1sn1xa2') if parse_only else None
+    soup = BeautifulSoup(html, 'html.parser', parse_only=strainer)
     products = []
     
     product_containers = soup.find_all('div', class_='css-1sn1xa2')
-    for container in tqdm(
-        product_containers, 
-        desc=f"---> Scrapping {shop_name} products", 
-        leave=False, 
-        unit="produk"
-    ):
+    for container in product_containers:
         try:
             # Mengambil nama produk
             name_elem = container.find('div', {'class': 'prd_link-product-name'})
@@ -174,18 +348,7 @@ def parse_page_source(driver, html, shop_name):
             img_elem = container.find('img', {'class': 'css-1q90pod'})
             image_url = img_elem['src'] if img_elem and img_elem.has_attr('src') else None
 
-            
-            # Jika ada URL produk, ambil deskripsi dengan timeout
-            if product_url:
-                description = get_product_description(driver, product_url, timeout=5)
-                # Jika terjadi timeout, skip produk ini
-                if description == "TIMEOUT":
-                    print(f"Skipping product from {shop_name} due to load timeout.")
-                    continue
-            else:
-                description = None
-            
-            product = {
+            products.append({
                 'shop': shop_name,
                 'name': name,
                 'price': price,
@@ -193,70 +356,290 @@ def parse_page_source(driver, html, shop_name):
                 'sales': sales,
                 'url': product_url,
                 'image_url': image_url,
-                'description': description
-            }
-            products.append(product)
+                'description': None
+            })
         except Exception as e:
             print(f"Error processing product in {shop_name}: {e}")
     return products
 
-def scrape_shop(driver, shop_url, query):
+def parse_page_source(driver, html, shop_name, fetcher=None, cache=None, tab_engine=None):
     """
-    Mengunjungi halaman produk suatu toko, melakukan scrolling, dan mengambil data produk.
+    Memparsing halaman list produk dan mengambil data dari masing-masing produk,
+    termasuk mengambil deskripsi dari halaman detail produk.
+    Produk yang mengalami timeout saat memuat halaman detail akan di-skip.
+    Dilengkapi dengan progress bar untuk setiap produk di toko tersebut.
+    """
+    with metrics.phase('parse_cards'):
+        products = parse_product_cards(html, shop_name)
+    return add_descriptions(driver, products, shop_name, fetcher, cache, tab_engine)
+
+def add_descriptions(driver, products, shop_name, fetcher=None, cache=None, tab_engine=None, browser=None):
+    """
+    Mengisi deskripsi produk hasil parse_product_cards. Produk yang halaman
+    detailnya timeout di-skip.
+    """
+    # Ambil deskripsi seluruh produk yang memiliki URL
+    product_urls = [product['url'] for product in products if product['url']]
+    with metrics.phase('descriptions'):
+        descriptions = fetch_descriptions(driver, product_urls, shop_name, fetcher, cache, tab_engine,
+                                          browser)
+
+    results = []
+    for product in products:
+        if product['url']:
+            product['description'] = descriptions.get(product['url'])
+            # Jika terjadi timeout, skip produk ini
+            if product['description'] == "TIMEOUT":
+                print(f"Skipping product from {shop_name} due to load timeout.")
+                metrics.count('skip', 'product')
+                continue
+        results.append(product)
+    return results
+
+def load_shop_page(driver, shop_url, query):
+    """
+    Membuka halaman produk suatu toko, scroll sampai seluruh produk termuat, dan
+    mengembalikan page_source-nya.
     """
     final_url = shop_url + "/product" + query
-    driver.get(final_url)
+    with metrics.phase('shop_load'):
+        driver.get(final_url)
     
     # Lakukan scrolling untuk memastikan seluruh produk termuat
-    dynamic_scroll(driver, pause_time=1.0, max_iter=20)
-    driver.execute_script("window.scrollTo(0, 0);")
-    time.sleep(1)
-    
-    html = driver.page_source
+    with metrics.phase('scroll'):
+        dynamic_scroll(driver, pause_time=1.0, max_iter=20)
+        driver.execute_script("window.scrollTo(0, 0);")
+        time.sleep(1)
+    return driver.page_source
+
+def scrape_shop(driver, shop_url, query, fetcher=None, cache=None, tab_engine=None):
+    """
+    Mengunjungi halaman produk suatu toko, melakukan scrolling, dan mengambil data produk.
+    """
+    html = load_shop_page(driver, shop_url, query)
     shop_name = get_shop_name(shop_url)
-    products = parse_page_source(driver, html, shop_name)
+    products = parse_page_source(driver, html, shop_name, fetcher, cache, tab_engine)
     print(f"{len(products)} products scraped from {shop_name}")
     return products
 
-def clean_sales_column(df):
+def scrape_shops_sequential(shop_urls, start, query, keyword, checkpoint, browser, fetcher=None, cache=None):
     """
-    Membersihkan kolom 'sales' agar siap digunakan untuk analisis.
-    Proses:
-      - Menghapus karakter '+' dan '.' serta kata 'terjual'
-      - Mengganti 'rb' dengan '000'
-      - Mengkonversi nilai ke integer
-    """
-    df['sales'] = df['sales'].astype(str)\
-        .str.replace('+', '', regex=False)\
-        .str.replace('.', '', regex=False)\
-        .str.replace('terjual', '', regex=False)
-    df['sales'] = df['sales'].str.replace('rb', '000', regex=False)
-    df['sales'] = pd.to_numeric(df['sales'], errors='coerce').fillna(0).astype(int)
-    return df
+    Memproses toko satu per satu dengan satu driver: listing, deskripsi, lalu
+    tulis ke checkpoint sebelum toko berikutnya dibuka.
+    """
+    # Driver dengan profil persisten; di-recycle di antara toko setelah
+    # RECYCLE_PAGES halaman atau jika memori Chrome melewati batas
+    managed = ManagedDriver(partial(setup_driver, browser), f'tokopedia-store-{browser}')
+    tab_engine = None
+    tab_driver = None
+    
+    # Progress bar untuk setiap toko; hasil setiap toko langsung ditulis ke checkpoint
+    for index, shop_url in enumerate(
+        tqdm(shop_urls[start:], desc="Scraping shops", unit="toko"), start=start
+    ):
+        driver = managed.checkout()
+        # Mesin tab terikat ke browser; dibuat ulang jika driver di-recycle
+        if DESCRIPTION_TABS > 0 and driver is not tab_driver:
+            if tab_engine is not None:
+                tab_engine.close()
+            tab_engine, tab_driver = create_tab_engine(driver, browser), driver
+        products = scrape_shop(driver, shop_url, query, fetcher, cache, tab_engine)
+        # Halaman toko + paling banyak satu tab detail per produk
+        managed.page_done(1 + len(products))
+        checkpoint.append(products, keyword=keyword, shops_done=index + 1, last_link=shop_url)
+    
+    if tab_engine is not None:
+        tab_engine.close()
+    managed.quit()
+
+class DetailBrowser:
+    """
+    Browser milik tahap deskripsi pipeline (terpisah dari browser listing)
+    beserta mesin tab-nya. Baru dibuat saat pertama kali ada deskripsi yang tidak
+    didapat dari cache/HTTP; setiap pemanggilan adalah titik aman untuk recycle.
+    """
+
+    def __init__(self, profile=BROWSER_PROFILE):
+        self.profile = profile
+        self.managed = ManagedDriver(partial(setup_driver, profile), f'tokopedia-store-{profile}-detail')
+        self.tab_engine = None
+        self._tab_driver = None
+
+    def __call__(self, pages):
+        driver = self.managed.checkout()
+        # Mesin tab terikat ke browser; dibuat ulang jika driver di-recycle
+        if DESCRIPTION_TABS > 0 and driver is not self._tab_driver:
+            if self.tab_engine is not None:
+                self.tab_engine.close()
+            self.tab_engine, self._tab_driver = create_tab_engine(driver, self.profile), driver
+        self.managed.page_done(pages)
+        return driver, self.tab_engine
+
+    def close(self):
+        if self.tab_engine is not None:
+            self.tab_engine.close()
+        self.managed.quit()
+
+def scrape_shops_pipeline(shop_urls, start, query, keyword, checkpoint, browser, fetcher=None, cache=None):
+    """
+    Memproses toko sebagai pipeline tiga tahap yang berjalan bersamaan: listing
+    (buka, scroll, dan parse kartu toko berikutnya), deskripsi (cache, HTTP, lalu
+    tab browser detail), dan sink (tulis ke checkpoint sesuai urutan toko).
+    Kedalaman antrean dan utilisasi tahap dicetak selama berjalan.
+    """
+    listing_driver = ManagedDriver(partial(setup_driver, browser), f'tokopedia-store-{browser}')
+    detail_browser = DetailBrowser(browser)
+
+    def listing(job):
+        index, shop_url = job
+        # Antar toko adalah titik aman untuk recycle browser listing
+        html = load_shop_page(listing_driver.checkout(), shop_url, query)
+        listing_driver.page_done()
+        shop_name = get_shop_name(shop_url)
+        with metrics.phase('parse_cards'):
+            products = parse_product_cards(html, shop_name)
+        return index, shop_url, shop_name, products
+
+    def describe(job):
+        index, shop_url, shop_name, products = job
+        products = add_descriptions(None, products, shop_name, fetcher, cache, browser=detail_browser)
+        return index, shop_url, shop_name, products
+
+    def sink(job):
+        index, shop_url, shop_name, products = job
+        checkpoint.append(products, keyword=keyword, shops_done=index + 1, last_link=shop_url)
+        print(f"{len(products)} products scraped from {shop_name} ({index + 1}/{len(shop_urls)})")
+
+    pipeline = Pipeline([
+        Stage('listing', listing, close=listing_driver.quit),
+        Stage('deskripsi', describe, close=detail_browser.close),
+        Stage('sink', sink),
+    ], queue_size=PIPELINE_QUEUE_SIZE)
+    try:
+        pipeline.run(enumerate(shop_urls[start:], start=start))
+    finally:
+        print(pipeline.report())
+
+def scrape_shops_queue(work_queue, query, keyword, checkpoint, browser, fetcher=None, cache=None):
+    """
+    Worker antrean: mengklaim URL toko dari antrean kerja bersama satu per satu,
+    memprosesnya seperti scrape_shops_sequential, lalu menandainya selesai setelah
+    hasilnya tertulis ke checkpoint. Lease toko di-heartbeat selama toko diproses;
+    toko yang gagal dikembalikan ke antrean untuk dicoba lagi oleh worker mana pun.
+    """
+    managed = ManagedDriver(partial(setup_driver, browser), f'tokopedia-store-{browser}')
+    tab_engine = None
+    tab_driver = None
+    shops_done = checkpoint.load_state().get('shops_done', 0)
+    
+    while True:
+        item = work_queue.claim(QUEUE_KIND, owner=default_owner())
+        if item is None:
+            break
+        shop_url = item['key']
+        lease = Lease(work_queue, item).start()
+        try:
+            driver = managed.checkout()
+            # Mesin tab terikat ke browser; dibuat ulang jika driver di-recycle
+            if DESCRIPTION_TABS > 0 and driver is not tab_driver:
+                if tab_engine is not None:
+                    tab_engine.close()
+                tab_engine, tab_driver = create_tab_engine(driver, browser), driver
+            products = scrape_shop(driver, shop_url, query, fetcher, cache, tab_engine)
+            managed.page_done(1 + len(products))
+        except Exception as e:
+            print(f"Gagal memproses toko {shop_url}: {e.__class__.__name__}")
+            metrics.count('error', 'shop')
+            managed.quit('error')
+            lease.fail(f"{e.__class__.__name__}: {e}")
+            continue
+        if lease.lost:
+            # Toko sudah diklaim worker lain setelah lease habis: hasil ini dibuang
+            print(f"Lease toko {shop_url} hilang, hasil tidak disimpan.")
+            metrics.count('skip', 'lease_lost')
+            lease.stop()
+            continue
+        shops_done += 1
+        checkpoint.append(products, keyword=keyword, shops_done=shops_done, last_link=shop_url)
+        lease.complete()
+    
+    if tab_engine is not None:
+        tab_engine.close()
+    managed.quit()
 
 def main():
+    parser = argparse.ArgumentParser(description="Scraper produk per toko Tokopedia.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Lanjutkan run terakhir dari checkpoint.")
+    add_browser_arguments(parser, BROWSER_PROFILE)
+    add_output_arguments(parser, default='xlsx')
+    add_queue_arguments(parser)
+    args = parser.parse_args()
+    formats = output_formats(args)
+    work_queue = open_queue(args)
+    if args.enqueue:
+        shop_urls = load_shop_urls()
+        added = work_queue.enqueue_many(QUEUE_KIND, [(url, None) for url in shop_urls], args.refresh)
+        print(f"{added} toko ditambahkan ke antrean {work_queue.path}: {work_queue.stats()}")
+        work_queue.close()
+        return
+
+    # Worker antrean memakai checkpoint sendiri per proses; antrean yang menjadi
+    # catatan progres, jadi --resume tidak berlaku
+    if work_queue is not None:
+        checkpoint = Checkpoint(worker_checkpoint_name('tokopedia_store'))
+        state = {}
+    else:
+        checkpoint = Checkpoint('tokopedia_store')
+        state = checkpoint.load_state() if args.resume else {}
+        if args.resume and not state:
+            print("Checkpoint tidak ditemukan, memulai dari awal.")
+
     # Memuat keyword dan URL toko
-    keyword = load_keyword("config.json")
+    if state:
+        keyword = state['keyword']
+        shops_done = state['shops_done']
+        print(f"Melanjutkan dari toko ke-{shops_done + 1} (toko terakhir: {state.get('last_link')})")
+    else:
+        checkpoint.reset()
+        keyword = load_keyword("config.json")
+        shops_done = 0
     shop_urls = load_shop_urls()
     query = f"?q={keyword}"
     
-    driver = setup_driver()
-    all_products = []
-    
-    # Progress bar untuk setiap toko
-    for shop_url in tqdm(shop_urls, desc="Scraping shops", unit="toko"):
-        products = scrape_shop(driver, shop_url, query)
-        all_products.extend(products)
-    
-    driver.quit()
+    cache = DetailCache() if USE_DETAIL_CACHE else None
+    fetcher = create_http_fetcher(cache) if DETAIL_BACKEND == 'http' else None
+    if work_queue is not None:
+        scrape_shops_queue(work_queue, query, keyword, checkpoint, args.browser, fetcher, cache)
+        print(f"Antrean {work_queue.path}: {work_queue.stats()}")
+        work_queue.close()
+    else:
+        scrape_shops = scrape_shops_pipeline if PIPELINE else scrape_shops_sequential
+        scrape_shops(shop_urls, shops_done, query, keyword, checkpoint, args.browser, fetcher, cache)
+    if fetcher is not None:
+        fetcher.close()
+    if cache is not None:
+        print(cache.summary())
+        cache.close()
     
-    # Membuat DataFrame dan membersihkan kolom 'sales'
-    df = pd.DataFrame(all_products)
-    df = clean_sales_column(df)
+    # Membuat DataFrame dari checkpoint dan mengubah 'sales' ('1rb+ terjual',
+    # '1,5rb', ...) menjadi angka; produk tanpa label terjual dihitung 0
+    df = normalize_dataframe(checkpoint.to_dataframe())
+    if 'sales' in df.columns:
+        df['sales'] = df['sales'].fillna(0)
     
-    # Menyimpan data ke file Excel (.xlsx)
-    file_name = f"tokopedia_products_{keyword}_{datetime.now().strftime('%Y-%m-%d_%H.%M.%S')}.xlsx"
-    df.to_excel(file_name, index=False)
+    # Menyimpan data ke format output yang dipilih (default: .xlsx)
+    base_name = f"tokopedia_products_{keyword}_{datetime.now().strftime('%Y-%m-%d_%H.%M.%S')}"
+    written = export_dataframe(df, base_name, formats)
+    if PER_STORE_EXCEL and 'xlsx' in formats and not df.empty:
+        write_excel_per_group(df, f"{base_name}_per_store.xlsx", 'shop')
+        written.append(f"{base_name}_per_store.xlsx")
+    print(f"File disimpan sebagai {', '.join(written)}")
+    if RECORD_HISTORY and not df.empty:
+        history = HistoryStore()
+        count = history.upsert_snapshots(df, 'tokopedia', keyword, source=base_name)
+        history.close()
+        print(f"{count} snapshot disimpan ke riwayat {history.path}")
     
     # Ringkasan hasil scraping
     if df.empty:
@@ -268,5 +651,10 @@ def main():
         print(f"Total sales: {df['sales'].sum()}")
         print(f"Average rating: {df['rating'].mean():.2f}")
 
+    # Ringkasan durasi per fase dan penghitung retry/timeout/skip
+    print(metrics.format_summary())
+    json_path, prom_path = metrics.write('tokopedia_store')
+    print(f"Metrik disimpan ke {json_path} dan {prom_path}")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file